@@ -0,0 +1,161 @@
+# scripts/_clustering.py
+"""
+TF-IDF 聚类的公共部分：模式选择、拟合、二维投影、质心高频词，以及 k 值扫描
+
+k 值扫描（sweep_k）：
+- TF-IDF 矩阵只算一次，CSR 的三个数组写到临时目录的 .npy，worker 进程用 mmap 打开，
+  不会每个进程各拷一份
+- 每一轮并行拟合 workers 个 k（从小到大），每个 k 记录 inertia 和抽样 silhouette
+- silhouette 连续 patience 个 k 都没有比目前最好的高出 tol，就提前停止
+- 返回每个 k 的得分表、最好的 k 和它的模型 / 标签
+"""
+
+import math
+import multiprocessing as mp
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.decomposition import PCA, TruncatedSVD
+from sklearn.metrics import silhouette_score
+from threadpoolctl import threadpool_limits
+
+# 超过这么多行就走大语料模式：X 全程保持稀疏，
+# 聚类用 MiniBatchKMeans，降维用 TruncatedSVD（不用 toarray + PCA）
+LARGE_CORPUS_ROWS = 50_000
+MINIBATCH_SIZE = 4096
+
+# k 扫描：silhouette 抽样行数 / 提升小于 tol 算没有提升 / 连续几个 k 没提升就停
+SILHOUETTE_SAMPLE = 5000
+SWEEP_TOL = 0.005
+SWEEP_PATIENCE = 2
+
+
+def pick_mode(n_rows, mode="auto"):
+    if mode != "auto":
+        return mode
+    return "large" if n_rows > LARGE_CORPUS_ROWS else "small"
+
+
+def fit_clusters(X, k, mode):
+    """small：原来的 KMeans(n_init=10)；large：稀疏矩阵上的 MiniBatchKMeans"""
+    if mode == "small":
+        model = KMeans(n_clusters=k, random_state=42, n_init=10)
+    else:
+        model = MiniBatchKMeans(
+            n_clusters=k, random_state=42, n_init=3, batch_size=MINIBATCH_SIZE
+        )
+    labels = model.fit_predict(X)
+    return model, labels
+
+
+def project_2d(X, mode):
+    """small：toarray + PCA；large：TruncatedSVD 直接吃稀疏矩阵"""
+    if mode == "small":
+        # 小数据可以 toarray，大规模就走下面的 TruncatedSVD
+        return PCA(n_components=2, random_state=42).fit_transform(X.toarray())
+    return TruncatedSVD(n_components=2, random_state=42).fit_transform(X)
+
+
+def cluster_top_terms(model, terms, topn=20):
+    """每个簇质心权重最高的 topn 个词"""
+    return [
+        [terms[i] for i in centroid.argsort()[::-1][:topn]] for centroid in model.cluster_centers_
+    ]
+
+
+# ------------------- k 值扫描 -------------------
+
+_X = None
+_LIMITS = None
+
+
+def _share_csr(X, folder):
+    X = sparse.csr_matrix(X)
+    for name in ("data", "indices", "indptr"):
+        np.save(Path(folder) / f"{name}.npy", getattr(X, name))
+    np.save(Path(folder) / "shape.npy", np.array(X.shape))
+
+
+def _open_csr(folder):
+    # copy-on-write 映射：sklearn 的部分 Cython 代码要求缓冲区可写，但实际不会写，
+    # 页面仍然由各进程共享
+    load = partial(np.load, mmap_mode="c")
+    shape = tuple(np.load(Path(folder) / "shape.npy"))
+    parts = [load(Path(folder) / f"{n}.npy") for n in ("data", "indices", "indptr")]
+    return sparse.csr_matrix(tuple(parts), shape=shape, copy=False)
+
+
+def _init_sweep_worker(folder, threads):
+    global _X, _LIMITS
+    # 子进程导入本模块时 sklearn 和 OpenMP 运行时已经加载，改 OMP_NUM_THREADS 不再生效；
+    # 直接限制已加载的 OpenMP / BLAS 线程池，避免每个 worker 都占满所有核
+    _LIMITS = threadpool_limits(limits=threads)
+    _X = _open_csr(folder)
+
+
+def _score_k(k, mode, sample_size):
+    t0 = time.perf_counter()
+    model, labels = fit_clusters(_X, k, mode)
+    n = _X.shape[0]
+    sil = float("nan")
+    if 1 < len(set(labels)) < n:
+        sil = silhouette_score(
+            _X, labels, sample_size=min(sample_size, n) if sample_size else None, random_state=42
+        )
+    return k, model, labels, float(model.inertia_), sil, time.perf_counter() - t0
+
+
+def sweep_k(
+    X,
+    ks,
+    mode="small",
+    workers=None,
+    sample_size=SILHOUETTE_SAMPLE,
+    tol=SWEEP_TOL,
+    patience=SWEEP_PATIENCE,
+):
+    """
+    在同一个 X 上并行拟合 ks 里的每个 k，返回 (table, best_k, best_model, best_labels)。
+    table 是 DataFrame：k / inertia / silhouette / seconds，按 k 排序。
+    """
+    ks = sorted(k for k in set(ks) if 2 <= k < X.shape[0])
+    if not ks:
+        raise ValueError("no valid k: need 2 <= k < n_rows")
+    workers = min(workers or os.cpu_count() or 1, len(ks))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    rows, best_fit = [], None
+    best_k, best_sil, stale = None, -math.inf, 0
+    with tempfile.TemporaryDirectory(prefix="ksweep-") as folder:
+        _share_csr(X, folder)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_sweep_worker,
+            initargs=(folder, threads),
+        ) as pool:
+            for start in range(0, len(ks), workers):
+                wave = ks[start:start + workers]
+                results = pool.map(_score_k, wave, [mode] * len(wave), [sample_size] * len(wave))
+                for k, model, labels, inertia, sil, seconds in results:
+                    rows.append({"k": k, "inertia": inertia, "silhouette": sil, "seconds": seconds})
+                    # 只留目前最好的那个模型，其余的用完就丢
+                    if best_fit is None or sil > best_sil + tol:
+                        best_k, best_fit = k, (model, labels)
+                        best_sil, stale = (sil if sil == sil else -math.inf), 0
+                    else:
+                        stale += 1
+                if stale >= patience:
+                    print(f"[info] silhouette plateaued after k={wave[-1]}, stopping early")
+                    break
+
+    table = pd.DataFrame(rows).sort_values("k").reset_index(drop=True)
+    return table, best_k, best_fit[0], best_fit[1]
@@ -0,0 +1,158 @@
+# scripts/_crawl_pipeline.py
+"""
+抓取流水线：下载和解析分成两级并行，互不等待
+
+    URL ──► [I/O 级] 线程池 fetch ──► 有界队列 ──► [CPU 级] 进程池 parse ──► 调用方（写盘级）
+
+- I/O 级：fetch_workers 个线程，抓到的 HTML 放进容量 queue_size 的队列，
+  队列满了线程就阻塞，不会无限制地把 HTML 堆在内存里（背压）
+- CPU 级：ProcessPoolExecutor 在多核上跑 parse_fn；结果放进容量 queue_size 的输出队列。
+  调度线程每派一个任务先占一个名额，调用方取走结果才归还，
+  所以 在途的解析任务 + 还没被取走的结果 不超过 queue_size，调用方写盘慢也不会堆积
+- 写盘级就是调用方自己：iter_pipeline 是生成器，按完成顺序产出 (url, info)，
+  抓取失败或解析出错时 info 为 None
+- 生成器被关闭 / Ctrl-C 时，停止派发新任务、取消排队任务、关闭两个池
+"""
+
+import os
+import queue
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+_POLL = 0.1
+
+
+def _noop() -> None:
+    return None
+
+
+def iter_pipeline(
+    urls: Iterable[str],
+    fetch_fn: Callable[[str], str],
+    parse_fn: Callable[[str, str], dict],
+    fetch_workers: int = 16,
+    parse_workers: Optional[int] = None,
+    queue_size: int = 64,
+) -> Iterator[Tuple[str, Optional[dict]]]:
+    """
+    parse_fn 必须是模块顶层函数（要能 pickle 到子进程）。
+    parse_workers: None = CPU 核数；0 = 不开进程池，在调度线程里直接解析（小任务 / 调试用）
+    """
+    urls = list(urls)
+    if not urls:
+        return
+    if parse_workers is None:
+        parse_workers = os.cpu_count() or 1
+
+    stop = threading.Event()
+    html_q: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    out_q: "queue.Queue" = queue.Queue(maxsize=queue_size)
+    # 名额：派任务时占用，调用方从 out_q 取走结果时归还（占着名额才能往 out_q 放，放的时候不会阻塞）
+    out_slots = threading.BoundedSemaphore(queue_size)
+    in_flight = [0]  # 已派给进程池、还没回来的解析任务数
+    in_flight_lock = threading.Lock()
+
+    parse_pool = None
+    if parse_workers > 0:
+        parse_pool = ProcessPoolExecutor(max_workers=parse_workers)
+        # 先把子进程拉起来，再启动抓取线程：避免在多线程状态下 fork
+        parse_pool.submit(_noop).result()
+    fetch_pool = ThreadPoolExecutor(max_workers=fetch_workers)
+
+    def put_html(item) -> None:
+        while not stop.is_set():
+            try:
+                html_q.put(item, timeout=_POLL)
+                return
+            except queue.Full:
+                continue
+
+    def fetch_one(url: str) -> None:
+        if stop.is_set():
+            return
+        try:
+            html = fetch_fn(url)
+        except Exception:
+            traceback.print_exc()
+            html = ""
+        put_html((url, html))
+
+    def parse_inline(url: str, html: str) -> Optional[dict]:
+        try:
+            return parse_fn(url, html)
+        except Exception:
+            traceback.print_exc()
+            return None
+
+    def on_parsed(fut, url: str) -> None:
+        if fut.cancelled():
+            # 没有结果要交给调用方，名额直接还掉
+            out_slots.release()
+        else:
+            err = fut.exception()
+            if err is not None:
+                print(f"[error] parse failed for {url}: {err!r}")
+                out_q.put((url, None))
+            else:
+                out_q.put((url, fut.result()))
+        with in_flight_lock:
+            in_flight[0] -= 1
+
+    def dispatch() -> None:
+        """解析调度线程：从 HTML 队列取任务派给进程池"""
+        for _ in range(len(urls)):
+            item = None
+            while item is None and not stop.is_set():
+                try:
+                    item = html_q.get(timeout=_POLL)
+                except queue.Empty:
+                    continue
+            if item is None:
+                return
+            url, html = item
+            while not out_slots.acquire(timeout=_POLL):
+                if stop.is_set():
+                    return
+            if not html:
+                out_q.put((url, None))
+            elif parse_pool is None:
+                out_q.put((url, parse_inline(url, html)))
+            else:
+                with in_flight_lock:
+                    in_flight[0] += 1
+                try:
+                    fut = parse_pool.submit(parse_fn, url, html)
+                except RuntimeError:
+                    # 池已经关了（正在退出）
+                    with in_flight_lock:
+                        in_flight[0] -= 1
+                    out_slots.release()
+                    return
+                fut.add_done_callback(lambda f, u=url: on_parsed(f, u))
+
+    dispatcher = threading.Thread(target=dispatch, name="parse-dispatch", daemon=True)
+    dispatcher.start()
+    for url in urls:
+        fetch_pool.submit(fetch_one, url)
+
+    try:
+        for _ in range(len(urls)):
+            while True:
+                try:
+                    item = out_q.get(timeout=_POLL)
+                except queue.Empty:
+                    # 调度线程意外退出且没有在途任务：不会再有结果了
+                    if not dispatcher.is_alive() and in_flight[0] == 0 and out_q.empty():
+                        return
+                    continue
+                out_slots.release()
+                yield item
+                break
+    finally:
+        stop.set()
+        fetch_pool.shutdown(wait=False, cancel_futures=True)
+        if parse_pool is not None:
+            parse_pool.shutdown(wait=True, cancel_futures=True)
+        dispatcher.join(timeout=1)
@@ -0,0 +1,137 @@
+# scripts/_crawl_state.py
+"""
+增量 / 可续跑抓取用到的两个小工具：
+
+- CrawlState: 每个 URL 的抓取状态（ok / failed + 重试次数），存成追加写的 jsonl，
+  后写的记录覆盖先写的，所以每次只追加本轮变化的 URL，不重写整个文件
+- CsvBatchWriter: 攒够一批行就追加写到 csv 并 flush，中途崩溃 / Ctrl-C 最多丢一批
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+
+
+class CrawlState:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._states: Dict[str, dict] = {}
+        self._pending: List[dict] = []
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 上次写到一半被打断的最后一行，忽略
+                        continue
+                    self._states[rec["url"]] = rec
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def is_done(self, url: str) -> bool:
+        rec = self._states.get(url)
+        return rec is not None and rec["status"] == STATUS_OK
+
+    def retries(self, url: str) -> int:
+        rec = self._states.get(url)
+        return rec.get("retries", 0) if rec else 0
+
+    def _record(self, url: str, status: str, retries: int, country: str = "") -> None:
+        rec = {
+            "url": url,
+            "status": status,
+            "retries": retries,
+            "country": country,
+            "updated": time.time(),
+        }
+        self._states[url] = rec
+        self._pending.append(rec)
+
+    def mark_done(self, url: str, country: str = "") -> None:
+        self._record(url, STATUS_OK, self.retries(url), country)
+
+    def mark_failed(self, url: str, country: str = "") -> None:
+        self._record(url, STATUS_FAILED, self.retries(url) + 1, country)
+
+    def seed_done(self, urls, country: str = "") -> int:
+        """把已在 news_raw.csv 里的 URL 直接记为 ok（第一次启用增量模式时用）"""
+        n = 0
+        for url in urls:
+            if not self.is_done(url):
+                self.mark_done(url, country)
+                n += 1
+        return n
+
+    def failed_urls(self) -> List[str]:
+        return [u for u, r in self._states.items() if r["status"] == STATUS_FAILED]
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            for rec in self._pending:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            f.flush()
+        self._pending = []
+
+    def reset(self) -> None:
+        """全量重抓时清空旧状态"""
+        self._states = {}
+        self._pending = []
+        self.path.unlink(missing_ok=True)
+
+
+class CsvBatchWriter:
+    """
+    按固定列顺序把行追加写进 csv（utf-8-sig，与原来的输出一致），每 batch_size 行落一次盘。
+    append=False 时先清空文件重新写表头。
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        columns: List[str],
+        batch_size: int = 20,
+        append: bool = True,
+        on_flush: Optional[callable] = None,
+    ):
+        self.path = Path(path)
+        self.columns = columns
+        self.batch_size = batch_size
+        self.on_flush = on_flush
+        self.written = 0
+        self._rows: List[dict] = []
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not append or not self.path.exists() or self.path.stat().st_size == 0:
+            pd.DataFrame(columns=columns).to_csv(
+                self.path, index=False, encoding="utf-8-sig"
+            )
+
+    def add(self, row: dict) -> None:
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._rows:
+            df = pd.DataFrame(self._rows).reindex(columns=self.columns)
+            df.to_csv(
+                self.path, index=False, header=False, mode="a", encoding="utf-8-sig"
+            )
+            self.written += len(self._rows)
+            self._rows = []
+        # 行先落盘，状态后落盘：就算状态没写进去，下次也只是多抓一遍
+        if self.on_flush is not None:
+            self.on_flush()
@@ -0,0 +1,137 @@
+# scripts/_cube.py
+"""
+统计用的 group-by 立方体：country × source_type × cluster × sentiment_label 的计数只算一次
+
+以前 cal.py / cal2.py / cal_us.py / sent_stats.py 各读一遍数据集，
+再用一串布尔掩码按 country / source_type 切片、每片 value_counts 一次。
+现在：
+    cube = Cube.load()                       # 只读这四列（分类类型），一次 groupby 得到全部组合的计数
+    cube.slice(["cluster"], where={"country": "CN"})
+    cube.slice(["source_type", "cluster"], where={"country": "CN"}, normalize=True)
+    weekly = Cube.load(period="W")
+    weekly.slice(["period", "sentiment_label"], where={"country": "CN"}, normalize=True)
+
+任何新的切片都只是在立方体（最多几百行）上做一次求和，不再碰原始数据。
+normalize=True 时按 by 的最后一维归一化：前面几维的每个组合内部加起来是 1
+（和 groupby(...)[最后一维].value_counts(normalize=True) 一样）。
+立方体里缺失值单独成一组，但切片和 value_counts 一样不计 by 里有缺失值的组合，
+计数里没有它们，占比的分母也不算它们（比如还没打上情感标签的行）。
+
+cluster 来自 all_with_clusters，sentiment_label 来自 all_with_sentiment；
+两个数据集都是 all_texts_clean 按原顺序加一列，行数和 country 对得上才拼在一起，
+对不上（或者还没跑）就只用能拿到的维度。
+给了 period（pandas 的频率，比如 D / W / M）时再加一维 period：published_at 所在的时间段，
+按时间看情感 / 聚类走势也只是立方体上的一次切片。
+给了 dataset 就只从那个数据集读 country / source_type（它有 cluster 也读），不拼情感：
+cal 报表按 all_texts 计数（包括预处理时因为清洗后为空被丢掉的行）。
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from _store import dataset_columns, exists, read_dataset
+
+DIMENSIONS = ("country", "source_type", "cluster", "sentiment_label", "period")
+
+
+def load_frame(period: Optional[str] = None, dataset: Optional[str] = None) -> pd.DataFrame:
+    """读出各维度（都转成 category），缺的维度不出现在返回的列里"""
+    if dataset is not None:
+        base = dataset
+        columns = [c for c in ("country", "source_type", "cluster") if c in dataset_columns(base)]
+    elif exists("all_with_clusters"):
+        base, columns = "all_with_clusters", ["country", "source_type", "cluster"]
+    elif exists("all_texts_clean"):
+        base, columns = "all_texts_clean", ["country", "source_type"]
+    else:
+        base, columns = "all_texts", ["country", "source_type"]
+    with_dates = period is not None and "published_at" in dataset_columns(base)
+    if period is not None and not with_dates:
+        print(f"[warn] {base} has no published_at (rerun build_dataset), no period dimension")
+    df = read_dataset(base, columns=columns + (["published_at"] if with_dates else []))
+    if with_dates:
+        df["period"] = df.pop("published_at").dt.to_period(period).astype("string")
+
+    if dataset is None and exists("all_with_sentiment"):
+        sent = read_dataset("all_with_sentiment", columns=["country", "sentiment_label"])
+        aligned = len(sent) == len(df) and (
+            sent["country"].astype("string").equals(df["country"].astype("string"))
+        )
+        if aligned:
+            df["sentiment_label"] = sent["sentiment_label"].array
+        else:
+            print("[warn] all_with_sentiment rows do not line up with the cluster data, "
+                  "sentiment_label left out of the cube")
+
+    for col in df.columns:
+        if not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
+
+
+class Cube:
+    def __init__(self, counts: pd.Series, n_rows: int):
+        # MultiIndex（每个维度一层）-> 行数，只含真实出现过的组合，缺失值单独成一组
+        self.counts = counts
+        self.n_rows = n_rows
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, dims: Optional[Sequence[str]] = None) -> "Cube":
+        dims = [d for d in (dims or DIMENSIONS) if d in df.columns]
+        counts = df.groupby(dims, observed=True, dropna=False).size()
+        return cls(counts.rename("count"), len(df))
+
+    @classmethod
+    def load(cls, period: Optional[str] = None, dataset: Optional[str] = None) -> "Cube":
+        return cls.from_frame(load_frame(period, dataset))
+
+    def add(self, other: "Cube") -> "Cube":
+        """两个同维度立方体的计数相加（增量累加用）"""
+        counts = self.counts.add(other.counts, fill_value=0).astype("int64")
+        return Cube(counts.rename("count"), self.n_rows + other.n_rows)
+
+    @property
+    def dims(self) -> List[str]:
+        return list(self.counts.index.names)
+
+    def has(self, *dims: str) -> bool:
+        return all(d in self.dims for d in dims)
+
+    def slice(
+        self,
+        by: Sequence[str] = (),
+        where: Optional[Dict[str, object]] = None,
+        normalize: bool = False,
+    ) -> pd.Series:
+        """
+        where 里的值按字符串比较（命令行传进来的 "1" 能匹配 cluster=1）。
+        by 为空时返回只有一个值的 Series（总数，normalize 时为 1.0）。
+        by 里任一维是缺失值的组合不计入（同 value_counts 的 dropna=True）。
+        """
+        missing = [d for d in list(by) + list(where or {}) if d not in self.dims]
+        if missing:
+            raise KeyError(f"dimension(s) {missing} not in cube, available: {self.dims}")
+
+        counts = self.counts
+        for dim, value in (where or {}).items():
+            level = counts.index.get_level_values(dim).astype("string")
+            counts = counts[(level == str(value)).fillna(False)]
+
+        by = list(by)
+        if not by:
+            total = counts.sum()
+            return pd.Series([1.0 if normalize else total], index=["total"], name="count")
+        notna = counts.index.to_frame(index=False)[by].notna().all(axis=1).to_numpy()
+        out = counts[notna].groupby(level=by, observed=True).sum()
+        if normalize:
+            out = out.astype("float64")
+            if len(by) > 1:
+                out = out / out.groupby(level=by[:-1], observed=True).transform("sum")
+            else:
+                out = out / out.sum()
+            out = out.rename("proportion")
+        return out.sort_index()
+
+    def to_frame(self) -> pd.DataFrame:
+        return self.counts.reset_index()
@@ -0,0 +1,276 @@
+# scripts/_dates.py
+"""
+date 列（自由文本）→ datetime64
+
+抓下来的 date 五花八门：
+    2025-11-22 08:45:43 字号： A- A A+ 来源：观察者网
+    2025-11-23T15:09:55+08:00 / 2025-05-21T05:25:16.000Z
+    2025年01月11日 / November 24, 2025 / 21 Nov 2025
+    03-31 20:43 / 05.1511:37（没有年份）
+    5分钟前 / 今天 08:59 / 昨天 12:00（微博相对时间）
+
+做法：
+- FORMATS 里每种格式一个预编译正则（命名分组 y/m/d/H/M/S 等），整列 str.extract 一次，
+  再用 pd.to_datetime(年月日时分秒的 DataFrame) 组装；不逐行调 dateutil
+- 按 source 分组，先试这个来源以前匹配过的格式（FormatCache，存在 date_formats.json），
+  一般一个正则就把整组解析完，剩下没匹配上的行才继续试后面的格式。
+  缓存只调整“精确”格式之间的先后；会丢信息的格式（no_year 要猜年份、loose 不认时分秒）
+  永远排在最后，解析结果只取决于数据本身，跟缓存里的命中次数无关
+- 英文时间后面的 AM / PM 换算成 24 小时制
+- 带时区的时间只保留写在页面上的当地时间（不换算时区）
+- 没有年份的按参考时间补年份（补完比参考时间还晚就退一年）；相对时间按参考时间推算
+- 年份不在 MIN_YEAR ~ 参考时间次年之间的当作解析失败
+"""
+
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from _paths import PROCESSED_DIR
+
+FORMAT_CACHE_PATH = PROCESSED_DIR / "date_formats.json"
+MIN_YEAR = 2000
+
+_MONTHS = {
+    m: i + 1
+    for i, m in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+    )
+}
+_MON = r"(?P<mon>(?i:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?)"
+_TIME = (
+    r"(?:[T\s]*(?P<H>\d{1,2}):(?P<M>\d{2})(?::(?P<S>\d{2}))?"
+    r"(?:\s*(?P<ap>[AaPp])\.?[Mm]\b\.?)?)?"
+)
+
+
+@dataclass(frozen=True)
+class DateFormat:
+    name: str
+    regex: re.Pattern
+    # absolute：正则里有年月日；no_year：只有月日；relative：相对参考时间
+    kind: str = "absolute"
+    # 会丢信息（猜年份 / 丢时分秒）的格式，只在精确格式都没匹配上时才试
+    lossy: bool = False
+
+
+FORMATS: Tuple[DateFormat, ...] = (
+    DateFormat(
+        "iso",
+        re.compile(r"(?P<y>\d{4})-(?P<m>\d{1,2})-(?P<d>\d{1,2})" + _TIME),
+    ),
+    DateFormat(
+        "cn",
+        re.compile(r"(?P<y>\d{4})\s*年\s*(?P<m>\d{1,2})\s*月\s*(?P<d>\d{1,2})\s*日?" + _TIME),
+    ),
+    DateFormat(
+        "slash",
+        re.compile(r"(?P<y>\d{4})[/.](?P<m>\d{1,2})[/.](?P<d>\d{1,2})" + _TIME),
+    ),
+    DateFormat("en_mdy", re.compile(_MON + r"\s+(?P<d>\d{1,2}),?\s+(?P<y>\d{4})" + _TIME)),
+    DateFormat("en_dmy", re.compile(r"(?P<d>\d{1,2})\s+" + _MON + r",?\s+(?P<y>\d{4})" + _TIME)),
+    DateFormat(
+        "relative",
+        re.compile(
+            r"(?P<just>刚刚)|(?P<n>\d+)\s*(?P<unit>秒|分钟|小时|天)前"
+            r"|(?P<day>今天|昨天|前天)\s*(?P<H>\d{1,2}):(?P<M>\d{2})"
+        ),
+        kind="relative",
+    ),
+    DateFormat(
+        "no_year",
+        re.compile(
+            r"(?<![\d./年-])(?P<m>\d{1,2})\s*[-./月]\s*(?P<d>\d{1,2})\s*日?\s*"
+            r"(?P<H>\d{1,2}):(?P<M>\d{2})"
+        ),
+        kind="no_year",
+        lossy=True,
+    ),
+    # 兜底：乱码页面（比如 "2025å¹´01æ14æ¥"）里年月日之间夹着别的字符
+    DateFormat(
+        "loose",
+        re.compile(r"(?P<y>(?:19|20)\d{2})\D{1,4}?(?P<m>\d{1,2})\D{1,4}?(?P<d>\d{1,2})(?!\d)"),
+        lossy=True,
+    ),
+)
+_BY_NAME = {f.name: f for f in FORMATS}
+_UNIT = {"秒": "s", "分钟": "min", "小时": "h", "天": "D"}
+_DAY_OFFSET = {"今天": 0, "昨天": 1, "前天": 2}
+
+
+def _num(s: pd.Series, default=None) -> pd.Series:
+    out = pd.to_numeric(s, errors="coerce")
+    return out if default is None else out.fillna(default)
+
+
+def _clock(parts: pd.DataFrame, col: str):
+    """时 / 分 / 秒：格式里没有这一组或者没写，就是 0"""
+    return _num(parts[col], 0) if col in parts else 0
+
+
+def _hour(parts: pd.DataFrame):
+    """时；带 AM / PM 的换算成 24 小时制（12 AM → 0，1~11 PM → 13~23）"""
+    hour = _clock(parts, "H")
+    if "ap" not in parts:
+        return hour
+    ap = parts["ap"].str.lower()
+    hour = hour.where(~((ap == "p") & (hour < 12)).fillna(False), hour + 12)
+    return hour.where(~((ap == "a") & (hour == 12)).fillna(False), 0)
+
+
+def _assemble(parts: pd.DataFrame, year: pd.Series) -> pd.Series:
+    return pd.to_datetime(
+        pd.DataFrame(
+            {
+                "year": year,
+                "month": parts["month"],
+                "day": _num(parts["d"]),
+                "hour": _hour(parts),
+                "minute": _clock(parts, "M"),
+                "second": _clock(parts, "S"),
+            },
+            index=parts.index,
+        ),
+        errors="coerce",
+    )
+
+
+def _parse(fmt: DateFormat, texts: pd.Series, ref: pd.Timestamp) -> pd.Series:
+    """对 texts 整列套一种格式，返回 datetime64（匹配不上 / 日期不合法为 NaT）"""
+    parts = texts.str.extract(fmt.regex)
+    hit = parts.notna().any(axis=1)
+    parts = parts[hit]
+    out = pd.Series(pd.NaT, index=texts.index, dtype="datetime64[ns]")
+    if parts.empty:
+        return out
+
+    if fmt.kind == "relative":
+        today = ref.normalize()
+        res = pd.Series(pd.NaT, index=parts.index, dtype="datetime64[ns]")
+        res[parts["just"].notna()] = ref
+        ago = parts["n"].notna()
+        if ago.any():
+            deltas = pd.to_timedelta(
+                _num(parts.loc[ago, "n"]).astype("int64").astype(str)
+                + parts.loc[ago, "unit"].map(_UNIT)
+            )
+            res[ago] = ref - deltas
+        on_day = parts["day"].notna()
+        if on_day.any():
+            days = pd.to_timedelta(parts.loc[on_day, "day"].map(_DAY_OFFSET), unit="D")
+            clock = pd.to_timedelta(_num(parts.loc[on_day, "H"]), unit="h") + pd.to_timedelta(
+                _num(parts.loc[on_day, "M"]), unit="min"
+            )
+            res[on_day] = today - days + clock
+        out[res.index] = res
+        return out
+
+    if "m" in parts:
+        parts["month"] = _num(parts["m"])
+    else:
+        parts["month"] = parts["mon"].str[:3].str.lower().map(_MONTHS)
+    if fmt.kind == "no_year":
+        res = _assemble(parts, pd.Series(ref.year, index=parts.index))
+        # 补了今年还比参考时间晚一天以上，说明是去年的
+        late = res > ref + pd.Timedelta(days=1)
+        if late.any():
+            res[late] = _assemble(parts[late], pd.Series(ref.year - 1, index=parts[late].index))
+    else:
+        res = _assemble(parts, _num(parts["y"]))
+        res[(res.dt.year < MIN_YEAR) | (res.dt.year > ref.year + 1)] = pd.NaT
+    out[res.index] = res
+    return out
+
+
+class FormatCache:
+    """
+    source -> {格式名: 匹配行数}；下次同一来源的精确格式按命中次数从多到少先试，
+    会丢信息的格式不参与排序，始终按 FORMATS 里的顺序排在最后
+    """
+
+    def __init__(self, path: Optional[Path] = FORMAT_CACHE_PATH):
+        self.path = Path(path) if path else None
+        self.data: Dict[str, dict] = {}
+        if self.path and self.path.exists():
+            try:
+                self.data = json.loads(self.path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                self.data = {}
+
+    def order(self, source: str) -> List[DateFormat]:
+        seen = self.data.get(source, {}).get("formats", {})
+        exact = [f for f in FORMATS if not f.lossy]
+        # sorted 是稳定的：命中次数相同（或没见过）的保持 FORMATS 里的顺序
+        exact.sort(key=lambda f: seen.get(f.name, 0), reverse=True)
+        return exact + [f for f in FORMATS if f.lossy]
+
+    def record(self, source: str, counts: Dict[str, int], rows: int, failed: int) -> None:
+        entry = self.data.setdefault(source, {"formats": {}})
+        for name, n in counts.items():
+            entry["formats"][name] = entry["formats"].get(name, 0) + n
+        entry["rows"], entry["failed"] = rows, failed
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.data, ensure_ascii=False, indent=1), encoding="utf-8")
+        tmp.replace(self.path)
+
+
+def normalize_dates(
+    dates: pd.Series,
+    sources: Optional[pd.Series] = None,
+    ref: Optional[pd.Timestamp] = None,
+    cache: Optional[FormatCache] = None,
+) -> Tuple[pd.Series, pd.DataFrame]:
+    """
+    返回 (datetime64 列, 每个来源的解析报告)。
+    报告列：source / rows（非空的 date 行数）/ failed / fail_rate / formats（命中的格式）。
+    """
+    ref = pd.Timestamp.now().floor("s") if ref is None else pd.Timestamp(ref)
+    cache = cache if cache is not None else FormatCache(None)
+    texts = dates.astype("string").str.strip()
+    if sources is None:
+        sources = pd.Series("", index=dates.index)
+    sources = sources.astype("string").fillna("")
+
+    out = pd.Series(pd.NaT, index=dates.index, dtype="datetime64[ns]")
+    report = []
+    present = texts.notna() & (texts != "")
+    for source, idx in texts[present].groupby(sources[present], observed=True).groups.items():
+        group = texts.loc[idx]
+        # 同一来源里重复的字符串（微博精确到分钟，重复很多）只解析一次
+        todo = pd.Series(group.unique(), dtype="string")
+        parsed = pd.Series(pd.NaT, index=todo.array, dtype="datetime64[ns]")
+        matched_by = pd.Series(pd.NA, index=todo.array, dtype="string")
+        for fmt in cache.order(source):
+            if todo.empty:
+                break
+            res = _parse(fmt, todo, ref)
+            ok = res.notna()
+            if ok.any():
+                parsed[todo[ok].array] = res[ok].to_numpy()
+                matched_by[todo[ok].array] = fmt.name
+                todo = todo[~ok]
+        out[idx] = group.map(parsed).to_numpy()
+        counts = group.map(matched_by).value_counts().to_dict()
+        failed = int(out[idx].isna().sum())
+        cache.record(source, counts, len(idx), failed)
+        report.append(
+            {
+                "source": source,
+                "rows": len(idx),
+                "failed": failed,
+                "fail_rate": failed / len(idx),
+                "formats": ",".join(counts),
+            }
+        )
+    cache.save()
+    report = pd.DataFrame(report, columns=["source", "rows", "failed", "fail_rate", "formats"])
+    return out, report
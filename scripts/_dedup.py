@@ -0,0 +1,137 @@
+# scripts/_dedup.py
+"""
+近重复检测：字符 shingle + MinHash 签名 + LSH 分桶
+
+- shingle：小写、去掉所有空白后，取连续 SHINGLE_SIZE 个字符；中英文一样处理
+- MinHash：shingle 的 32 位哈希经过 NUM_PERM 个 (a*x + b) mod p 置换，每个置换取最小值
+- LSH：签名切成 bands 段、每段 rows 个值，任意一段完全相同就是候选对；
+  (bands, rows) 按阈值自动选，使 S 曲线的拐点 (1/b)^(1/r) 尽量贴近 threshold
+- 候选对再用签名估计一次 Jaccard，>= threshold 才合并（并查集）
+- 每个签名只进每个 band 的桶一次，总耗时随行数线性增长，不做两两比较
+
+返回每行的簇号 dup_cluster（0..n_clusters-1）和每簇保留的那一行：
+默认是簇里最早出现的行，给了 rank（比如发布时间）就保留 rank 最小的行。
+"""
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+DEDUP_THRESHOLD = 0.8
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_POLY = np.uint64(1_000_003)
+
+
+def lsh_params(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """选 bands × rows <= num_perm，让 (1/bands)^(1/rows) 最接近 threshold"""
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        err = abs((1 / bands) ** (1 / rows) - threshold)
+        if best is None or err < best[0]:
+            best = (err, bands, rows)
+    return best[1], best[2]
+
+
+def shingle_hashes(text: str, k: int = SHINGLE_SIZE) -> np.ndarray:
+    """文本 → 去重后的 shingle 哈希（uint64，值域 32 位）"""
+    text = "".join(str(text).lower().split())
+    cps = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    if len(cps) < k:
+        # 太短的文本整段当一个 shingle
+        k = max(len(cps), 1)
+        if len(cps) == 0:
+            return np.zeros(1, dtype=np.uint64)
+    # 多项式滚动哈希：h = sum(cp[i+j] * P^(k-1-j))，uint64 自然溢出
+    h = np.zeros(len(cps) - k + 1, dtype=np.uint64)
+    for j in range(k):
+        h = h * _POLY + cps[j:len(cps) - k + 1 + j]
+    return np.unique(h & _MAX_HASH)
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = NUM_PERM, k: int = SHINGLE_SIZE, seed: int = 1):
+        rng = np.random.RandomState(seed)
+        self.k = k
+        self.num_perm = num_perm
+        # a, b < 2^32、哈希值 < 2^32：a*x + b 不会超过 uint64
+        self.a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, 1 << 31, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        hv = shingle_hashes(text, self.k)
+        perm = (hv[:, None] * self.a + self.b) % _MERSENNE & _MAX_HASH
+        return perm.min(axis=0).astype(np.uint32)
+
+    def signatures(self, texts) -> np.ndarray:
+        return np.vstack([self.signature(t) for t in texts]) if len(texts) else np.empty(
+            (0, self.num_perm), dtype=np.uint32
+        )
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def cluster_signatures(sigs: np.ndarray, threshold: float = DEDUP_THRESHOLD) -> np.ndarray:
+    """LSH 分桶 + 签名 Jaccard 复核，返回每行的簇号（按首次出现的顺序编号）"""
+    n, num_perm = sigs.shape
+    bands, rows = lsh_params(threshold, num_perm)
+    parent = np.arange(n)
+    for b in range(bands):
+        band = np.ascontiguousarray(sigs[:, b * rows:(b + 1) * rows])
+        # 同一段签名 → 同一个桶号
+        _, bucket = np.unique(band.view(np.dtype((np.void, band.dtype.itemsize * rows))),
+                              return_inverse=True)
+        bucket = bucket.ravel()
+        order = np.argsort(bucket, kind="stable")
+        sorted_b = bucket[order]
+        starts = np.r_[0, np.flatnonzero(np.diff(sorted_b)) + 1]
+        # 桶内每一行只和桶里最早的一行、以及排在它前面的一行比，
+        # 候选对数最多 2n，随行数线性增长（不做桶内两两比较）
+        first = np.repeat(order[starts], np.diff(np.r_[starts, n]))
+        same = np.r_[False, sorted_b[1:] == sorted_b[:-1]]
+        prev = np.r_[order[:1], order[:-1]]
+        a = np.r_[first[same], prev[same]]
+        c = np.r_[order[same], order[same]]
+        if len(a) == 0:
+            continue
+        est = (sigs[a] == sigs[c]).mean(axis=1)
+        ok = est >= threshold
+        for i, j in zip(a[ok], c[ok]):
+            ri, rj = _find(parent, i), _find(parent, j)
+            if ri != rj:
+                # 根取更早的行，这样根就是簇里最早出现的那一行
+                parent[max(ri, rj)] = min(ri, rj)
+    roots = np.array([_find(parent, i) for i in range(n)])
+    _, cluster = np.unique(roots, return_inverse=True)
+    return cluster.ravel()
+
+
+def near_duplicates(texts, threshold: float = DEDUP_THRESHOLD, num_perm: int = NUM_PERM,
+                    k: int = SHINGLE_SIZE,
+                    rank: Optional[Sequence] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    返回 (cluster, keep)：cluster 是每行的簇号，keep 是布尔数组，每个簇只有一行为 True。
+    rank 为 None 时保留簇里最早出现的行；否则保留 rank 最小的行（相同的取最早出现的），
+    rank 可以是 datetime64，NaT 排在最后
+    """
+    texts = list(texts)
+    sigs = MinHasher(num_perm, k).signatures(texts)
+    cluster = cluster_signatures(sigs, threshold)
+    keep = np.zeros(len(texts), dtype=bool)
+    if rank is None:
+        _, first = np.unique(cluster, return_index=True)
+    else:
+        # 按 (簇号, rank, 行号) 排序，每簇排在最前的就是要保留的行
+        order = np.lexsort((np.arange(len(texts)), np.asarray(rank), cluster))
+        first = order[np.r_[True, cluster[order][1:] != cluster[order][:-1]]]
+    keep[first] = True
+    return cluster, keep
@@ -0,0 +1,336 @@
+# scripts/_extract.py
+"""
+正文抽取引擎（lxml），替代原来每个站点各建一棵 BeautifulSoup 树的 parse_* 链：
+
+- 按域名后缀查注册表选站点规则（people.com.cn、globaltimes.cn、reuters.com ...），
+  查不到就走通用规则，不再写 if/elif
+- 所有 XPath 和正则在 import 时编译好
+- 通用候选（h1/h2/title、<time>、<meta>、class 含 time/date 的元素、全部 <p>、
+  整页文本）在一次树遍历里收集完，兜底日期不再反复 find 整棵树
+
+用法:
+    from _extract import extract_article
+    info = extract_article(url, html)   # {"title", "date", "content", "source", "url"}
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import lxml.html
+from lxml import etree
+
+_WS_RE = re.compile(r"\s+")
+
+# 兜底日期：在整页文本里找
+_DATE_TIME_RE = re.compile(
+    r"\d{4}[-/年]\d{1,2}[-/月]\d{1,2}(日)?\s*\d{0,2}:?\d{0,2}:?\d{0,2}?"
+)
+_DATE_RE = re.compile(r"\d{4}[-/年]\d{1,2}[-/月]\d{1,2}(日)?")
+_EN_DATE_RE = re.compile(
+    r"(January|February|March|April|May|June|July|August|September|October|November|December)"
+    r"\s+\d{1,2},\s+\d{4}"
+)
+
+_META_PROPERTIES = ("article:published_time", "og:published_time", "article:modified_time")
+_META_NAMES = ("pubdate", "publishdate", "publish_time", "ptime", "date", "sailthru.date")
+
+# class 名里含这些词的元素可能是发布时间；顺序即优先级
+_CLASS_PATTERNS = (
+    "time",
+    "date",
+    "pubtime",
+    "pub_time",
+    "publish",
+    "article-time",
+    "news-time",
+    "time-source",
+)
+_CLASS_PATTERN_RES = tuple(re.compile(p, re.I) for p in _CLASS_PATTERNS)
+
+# 不参与文本抽取的标签
+_SKIP_TEXT_TAGS = {"script", "style", "noscript", "template"}
+
+_PARSER = lxml.html.HTMLParser(remove_comments=True, remove_pis=True)
+_BYTES_PARSER = lxml.html.HTMLParser(
+    encoding="utf-8", remove_comments=True, remove_pis=True
+)
+
+
+def clean_text(text: str) -> str:
+    return _WS_RE.sub(" ", text).strip()
+
+
+def _strings(el) -> List[str]:
+    """元素内所有非空文本片段（去首尾空白），跳过 script/style"""
+    out = []
+    if el.tag in _SKIP_TEXT_TAGS:
+        return out
+    if el.text:
+        s = el.text.strip()
+        if s:
+            out.append(s)
+    for child in el:
+        if isinstance(child.tag, str):
+            out.extend(_strings(child))
+        if child.tail:
+            s = child.tail.strip()
+            if s:
+                out.append(s)
+    return out
+
+
+def text_of(el, sep: str = "") -> str:
+    """等价于 BeautifulSoup 的 get_text(sep, strip=True)"""
+    return sep.join(_strings(el))
+
+
+def _xpath(expr: str) -> etree.XPath:
+    return etree.XPath(expr)
+
+
+def _has_class(tag: str, cls: str) -> etree.XPath:
+    """tag.cls：class 属性里含这个完整的 class 名"""
+    return _xpath(
+        f"(//{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')])[1]"
+    )
+
+
+@dataclass
+class SiteExtractor:
+    """
+    一个站点的抽取规则：每个字段一串 XPath，按顺序取第一个命中的。
+    title/date 取元素文本，body 取元素下所有 <p> 的文本；没有日期就走通用兜底。
+    """
+
+    source: str
+    title: Tuple[etree.XPath, ...] = ()
+    date: Tuple[etree.XPath, ...] = ()
+    body: Tuple[etree.XPath, ...] = ()
+    # <time> 这类标签：文本为空时再看 datetime 属性
+    date_attr: Optional[str] = None
+
+
+_P_XPATH = _xpath(".//p")
+_FIRST = {tag: _xpath(f"(//{tag})[1]") for tag in ("h1", "h2", "title", "time")}
+
+
+def _first(tree, xpaths) -> Optional[etree._Element]:
+    for xp in xpaths:
+        res = xp(tree)
+        if res:
+            return res[0]
+    return None
+
+
+def _join_paragraphs(ps) -> str:
+    return clean_text(" ".join(text_of(p, " ") for p in ps))
+
+
+@dataclass
+class _PageScan:
+    """一次遍历收集到的通用候选"""
+
+    h1: Optional[etree._Element] = None
+    title: Optional[etree._Element] = None
+    time: Optional[etree._Element] = None
+    meta_property: Dict[str, str] = field(default_factory=dict)
+    meta_name: Dict[str, str] = field(default_factory=dict)
+    by_class: List[Optional[etree._Element]] = field(
+        default_factory=lambda: [None] * len(_CLASS_PATTERNS)
+    )
+    paragraphs: List[etree._Element] = field(default_factory=list)
+
+
+def _scan(tree) -> _PageScan:
+    scan = _PageScan()
+    n_missing = len(_CLASS_PATTERNS)
+    for el in tree.iter():
+        tag = el.tag
+        if not isinstance(tag, str):
+            continue
+        if tag == "p":
+            scan.paragraphs.append(el)
+        elif tag == "h1":
+            if scan.h1 is None:
+                scan.h1 = el
+        elif tag == "title":
+            if scan.title is None:
+                scan.title = el
+        elif tag == "time":
+            if scan.time is None:
+                scan.time = el
+        elif tag == "meta":
+            content = el.get("content")
+            if content:
+                prop = el.get("property")
+                if prop in _META_PROPERTIES:
+                    scan.meta_property.setdefault(prop, content)
+                name = el.get("name")
+                if name in _META_NAMES:
+                    scan.meta_name.setdefault(name, content)
+        if n_missing:
+            cls = el.get("class")
+            if cls:
+                for i, pat in enumerate(_CLASS_PATTERN_RES):
+                    if scan.by_class[i] is None and pat.search(cls):
+                        scan.by_class[i] = el
+                        n_missing -= 1
+    return scan
+
+
+def _page_text(tree) -> str:
+    body = tree.find("body")
+    return text_of(body if body is not None else tree, " ")
+
+
+def _generic_date(tree, scan: _PageScan) -> str:
+    """
+    兜底日期抽取（优先级与原 extract_date_generic 一致）：
+    1) <time> 标签  2) 常见 <meta>  3) class 含 time/date 的元素  4) 整页文本正则
+    """
+    if scan.time is not None:
+        dt = scan.time.get("datetime")
+        if dt:
+            return dt.strip()
+        txt = text_of(scan.time)
+        if txt:
+            return txt
+
+    for prop in _META_PROPERTIES:
+        if prop in scan.meta_property:
+            return scan.meta_property[prop].strip()
+    for name in _META_NAMES:
+        if name in scan.meta_name:
+            return scan.meta_name[name].strip()
+
+    for el in scan.by_class:
+        if el is not None:
+            txt = text_of(el, " ")
+            if txt:
+                return txt
+
+    full_text = _page_text(tree)
+    for pat in (_DATE_TIME_RE, _DATE_RE, _EN_DATE_RE):
+        m = pat.search(full_text)
+        if m:
+            return m.group(0)
+    return ""
+
+
+# ------------------- 站点注册表 -------------------
+
+EXTRACTORS: Dict[str, SiteExtractor] = {}
+
+
+def register(domain: str, extractor: SiteExtractor) -> None:
+    """domain 按后缀匹配：注册 people.com.cn 即覆盖 world.people.com.cn 等子域名"""
+    EXTRACTORS[domain.lower()] = extractor
+
+
+register(
+    "people.com.cn",
+    SiteExtractor(
+        source="people",
+        title=(_FIRST["h1"], _FIRST["h2"]),
+        date=(
+            _has_class("span", "publish-time"),
+            _has_class("span", "date"),
+            _has_class("div", "sou"),
+        ),
+        body=(
+            _xpath("(//div[@id='rwb_zw'])[1]"),
+            _has_class("div", "rm_txt_con"),
+            _has_class("div", "article"),
+        ),
+    ),
+)
+register(
+    "globaltimes.cn",
+    SiteExtractor(
+        source="globaltimes_cn",
+        title=(_FIRST["h1"],),
+        date=(_has_class("span", "pub_time"), _has_class("span", "time")),
+        body=(_has_class("div", "article-content"), _has_class("div", "artical-content")),
+    ),
+)
+register(
+    "reuters.com",
+    SiteExtractor(
+        source="reuters",
+        title=(_FIRST["h1"],),
+        date=(_FIRST["time"],),
+        date_attr="datetime",
+        body=(_xpath("(//div[@data-testid='article-body'])[1]"),),
+    ),
+)
+
+
+def lookup(netloc: str) -> Optional[SiteExtractor]:
+    """按域名后缀查注册表：a.b.people.com.cn → b.people.com.cn → people.com.cn → ..."""
+    host = netloc.lower().split(":", 1)[0]
+    while host:
+        ext = EXTRACTORS.get(host)
+        if ext is not None:
+            return ext
+        dot = host.find(".")
+        if dot < 0:
+            break
+        host = host[dot + 1:]
+    return None
+
+
+def parse_html(html):
+    """str / bytes → lxml 文档树；空文档返回 None"""
+    if not html:
+        return None
+    try:
+        if isinstance(html, bytes):
+            return lxml.html.document_fromstring(html, parser=_BYTES_PARSER)
+        return lxml.html.document_fromstring(html, parser=_PARSER)
+    except ValueError:
+        # 带 <?xml encoding=...?> 声明的 str 不能直接解析，转成 bytes 再来
+        return lxml.html.document_fromstring(html.encode("utf-8"), parser=_BYTES_PARSER)
+    except etree.ParserError:
+        return None
+
+
+def extract(tree, site: Optional[SiteExtractor]) -> Dict:
+    """从已解析的树里抽 title / date / content"""
+    if tree is None:
+        return {"title": "", "date": "", "content": ""}
+
+    if site is None:
+        # 通用规则：第一个 <h1> / <title> + 所有 <p> 文本，并尽量猜测日期
+        scan = _scan(tree)
+        title_el = scan.h1 if scan.h1 is not None else scan.title
+        title = text_of(title_el) if title_el is not None else ""
+        content = _join_paragraphs(scan.paragraphs)
+        return {"title": title, "date": _generic_date(tree, scan), "content": content}
+
+    title_el = _first(tree, site.title)
+    title = text_of(title_el) if title_el is not None else ""
+
+    date = ""
+    date_el = _first(tree, site.date)
+    if date_el is not None:
+        date = text_of(date_el)
+        if not date and site.date_attr:
+            date = date_el.get(site.date_attr, "")
+    if not date:
+        date = _generic_date(tree, _scan(tree))
+
+    body_el = _first(tree, site.body)
+    content = _join_paragraphs(_P_XPATH(body_el)) if body_el is not None else ""
+    return {"title": title, "date": date, "content": content}
+
+
+def extract_article(url: str, html) -> Dict:
+    """按域名选规则抽正文；source 是站点名，通用规则下记录原始域名方便后面分组分析"""
+    netloc = urlparse(url).netloc
+    site = lookup(netloc)
+    data = extract(parse_html(html), site)
+    data["source"] = site.source if site is not None else netloc
+    data["url"] = url
+    return data
@@ -0,0 +1,175 @@
+# scripts/_features.py
+"""
+TF-IDF 特征库（默认 data/processed/features/<名字>/）
+
+聚类脚本不再各自从头 fit TfidfVectorizer，而是：
+    fs = load_features("clusters", texts, {"max_features": 5000})
+    fs.X, fs.terms              # 稀疏矩阵 / 列对应的词
+    fs.transform(new_texts)     # 新文本直接用保存的词表 + IDF 变换，不用重新 fit
+
+每个特征集保存：
+- matrix.npz      稀疏矩阵（scipy.sparse.save_npz）
+- vocabulary.json 按列顺序的词表（hashing 模式没有）
+- idf.npy         IDF 向量
+- meta.json       参数、文档数、语料指纹
+
+语料指纹 = 所有文本 + 向量化参数的哈希；文本或参数一变就自动重建，没变就直接读盘。
+
+hashing=True 时走 HashingVectorizer：列是词的哈希桶，没有词表，
+以后任何新文本都能直接 transform（只用保存的 IDF），永远不需要重新 fit；代价是拿不到词名。
+"""
+
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import (
+    HashingVectorizer,
+    TfidfTransformer,
+    TfidfVectorizer,
+)
+
+from _paths import PROCESSED_DIR
+
+FEATURE_DIR = PROCESSED_DIR / "features"
+HASHING_FEATURES = 2 ** 18
+
+
+def corpus_fingerprint(texts, params: Dict) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+    for t in texts:
+        h.update(t.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _vectorizer_params(params: Dict) -> Dict:
+    """json 里 ngram_range 会变成 list，还原成 tuple"""
+    params = dict(params)
+    if "ngram_range" in params:
+        params["ngram_range"] = tuple(params["ngram_range"])
+    return params
+
+
+@dataclass
+class FeatureSet:
+    name: str
+    X: sparse.csr_matrix
+    idf: np.ndarray
+    params: Dict
+    fingerprint: str
+    terms: Optional[List[str]] = None  # hashing 模式为 None
+
+    @property
+    def hashing(self) -> bool:
+        return self.terms is None
+
+    def transform(self, texts) -> sparse.csr_matrix:
+        """用保存的词表 / IDF 变换新文本，不重新 fit"""
+        params = _vectorizer_params(self.params)
+        if self.hashing:
+            counts = _hashing_vectorizer(params).transform(texts)
+            tfidf = TfidfTransformer()
+            tfidf.idf_ = self.idf
+            return tfidf.transform(counts)
+        params.pop("max_features", None)
+        vec = TfidfVectorizer(**params, vocabulary=self.terms)
+        vec.idf_ = self.idf
+        return vec.transform(texts)
+
+
+def _hashing_vectorizer(params: Dict) -> HashingVectorizer:
+    params = {k: v for k, v in params.items() if k != "max_features"}
+    return HashingVectorizer(
+        n_features=HASHING_FEATURES, alternate_sign=False, norm=None, **params
+    )
+
+
+def _fit(name, texts, params, fingerprint, hashing) -> FeatureSet:
+    vparams = _vectorizer_params(params)
+    if hashing:
+        tfidf = TfidfTransformer()
+        X = tfidf.fit_transform(_hashing_vectorizer(vparams).transform(texts))
+        return FeatureSet(name, X.tocsr(), tfidf.idf_, params, fingerprint)
+    vec = TfidfVectorizer(**vparams)
+    X = vec.fit_transform(texts)
+    terms = vec.get_feature_names_out().tolist()
+    return FeatureSet(name, X.tocsr(), vec.idf_, params, fingerprint, terms)
+
+
+def save_features(fs: FeatureSet, root: Path = FEATURE_DIR) -> Path:
+    out_dir = Path(root) / fs.name
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # 先删 meta、最后再写：读的时候以 meta 为准，写到一半中断不会读到新旧混在一起的特征
+    (out_dir / "meta.json").unlink(missing_ok=True)
+    # 不压缩：读盘速度优先
+    sparse.save_npz(out_dir / "matrix.npz", fs.X, compressed=False)
+    np.save(out_dir / "idf.npy", fs.idf)
+    vocab_path = out_dir / "vocabulary.json"
+    if fs.terms is not None:
+        vocab_path.write_text(json.dumps(fs.terms, ensure_ascii=False), encoding="utf-8")
+    else:
+        vocab_path.unlink(missing_ok=True)
+    meta = {
+        "fingerprint": fs.fingerprint,
+        "params": fs.params,
+        "hashing": fs.hashing,
+        "n_docs": fs.X.shape[0],
+        "n_features": fs.X.shape[1],
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    (out_dir / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    return out_dir
+
+
+def read_features(name: str, root: Path = FEATURE_DIR) -> Optional[FeatureSet]:
+    """按名字读盘，没有就返回 None（不校验指纹）"""
+    d = Path(root) / name
+    meta_path = d / "meta.json"
+    if not meta_path.exists():
+        return None
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    terms = None
+    if not meta["hashing"]:
+        terms = json.loads((d / "vocabulary.json").read_text(encoding="utf-8"))
+    return FeatureSet(
+        name,
+        sparse.load_npz(d / "matrix.npz").tocsr(),
+        np.load(d / "idf.npy"),
+        meta["params"],
+        meta["fingerprint"],
+        terms,
+    )
+
+
+def load_features(
+    name: str,
+    texts,
+    params: Dict,
+    hashing: bool = False,
+    refit: bool = False,
+    root: Path = FEATURE_DIR,
+) -> FeatureSet:
+    """
+    语料指纹和参数都没变就直接读盘，否则重新 fit 并保存。
+    params 是 TfidfVectorizer 的参数（要能 json 序列化）。
+    """
+    texts = list(texts)
+    params = dict(params, _hashing=hashing)
+    fingerprint = corpus_fingerprint(texts, params)
+    params.pop("_hashing")
+    if not refit:
+        fs = read_features(name, root)
+        if fs is not None and fs.fingerprint == fingerprint:
+            print(f"[info] features {name!r}: loaded {fs.X.shape} from cache")
+            return fs
+    fs = _fit(name, texts, params, fingerprint, hashing)
+    save_features(fs, root)
+    print(f"[info] features {name!r}: fitted {fs.X.shape}, saved to {Path(root) / name}")
+    return fs
@@ -0,0 +1,229 @@
+# scripts/_fetcher.py
+"""
+并发抓取引擎：
+- 全局并发上限（线程池大小）
+- 每个域名一个令牌桶，代替原来每次请求后固定 sleep
+- 遇到 429 / 5xx / 网络错误时，按域名做指数退避（优先尊重 Retry-After）
+- 可选挂一个 _http_cache.ResponseCache：新鲜的缓存直接返回，过期的发条件请求
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/124.0 Safari/537.36"
+    )
+}
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+# 这些状态码说明对方在限流或临时故障，值得退避后重试
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """经典令牌桶：rate 个/秒匀速补充，最多攒 burst 个"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.capacity = max(1, int(burst))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """预订一个令牌，返回需要等待的秒数（令牌可以“透支”，等待时间由调用方去睡）"""
+        with self.lock:
+            now = time.monotonic()
+            if self.rate > 0:
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0 or self.rate <= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class HostLimiter:
+    """按域名（netloc）管理令牌桶与退避状态"""
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        burst: int = 2,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._failures: Dict[str, int] = {}
+        self._blocked_until: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def wait(self, host: str) -> None:
+        """阻塞到该域名允许发下一个请求为止"""
+        with self._lock:
+            blocked = self._blocked_until.get(host, 0.0) - time.monotonic()
+        if blocked > 0:
+            time.sleep(blocked)
+        delay = self._bucket(host).reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def penalize(self, host: str, retry_after: Optional[float] = None) -> float:
+        """记一次失败，返回本次退避秒数"""
+        with self._lock:
+            n = self._failures.get(host, 0) + 1
+            self._failures[host] = n
+            delay = min(self.backoff_max, self.backoff_base * (2 ** (n - 1)))
+            if retry_after is not None:
+                delay = min(self.backoff_max, max(delay, retry_after))
+            until = time.monotonic() + delay
+            self._blocked_until[host] = max(self._blocked_until.get(host, 0.0), until)
+            return delay
+
+    def reward(self, host: str) -> None:
+        """成功一次就清空该域名的失败计数"""
+        with self._lock:
+            self._failures.pop(host, None)
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    # 只处理秒数形式，HTTP-date 形式就交给指数退避
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class Fetcher:
+    """
+    线程池并发抓取。requests.Session 不保证线程安全，所以每个线程一个 session。
+
+    用法:
+        fetcher = Fetcher(max_workers=16, per_host_rate=1.0)
+        for url, html in fetcher.fetch_many(urls):
+            ...
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 16,
+        per_host_rate: float = 1.0,
+        per_host_burst: int = 2,
+        retries: int = 3,
+        timeout: float = 10,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        headers: Optional[Dict[str, str]] = None,
+        verbose: bool = True,
+        cache=None,
+        offline: bool = False,
+    ):
+        self.max_workers = max_workers
+        self.retries = retries
+        self.timeout = timeout
+        self.headers = dict(HEADERS if headers is None else headers)
+        self.verbose = verbose
+        self.cache = cache
+        self.offline = offline
+        self.limiter = HostLimiter(
+            rate=per_host_rate,
+            burst=per_host_burst,
+            backoff_base=backoff_base,
+            backoff_max=backoff_max,
+        )
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        s = getattr(self._local, "session", None)
+        if s is None:
+            s = requests.Session()
+            s.headers.update(self.headers)
+            self._local.session = s
+        return s
+
+    def _log(self, msg: str) -> None:
+        if self.verbose:
+            print(msg)
+
+    def fetch(self, url: str) -> str:
+        """
+        抓单个 URL，失败返回空串。
+        - 只接受 text/html / application/xhtml+xml
+        - 429 / 5xx / 网络错误 → 该域名退避后重试
+        - 其它 4xx 直接放弃
+        - 有缓存时：新鲜条目直接返回；过期条目带 ETag / Last-Modified 重新验证；
+          offline 模式只读缓存，没命中就返回空串；重新验证失败时退回旧缓存
+        """
+        entry = self.cache.get(url) if self.cache is not None else None
+        if entry is not None and (self.offline or entry.is_fresh(self.cache.ttl)):
+            return entry.body
+        if self.offline:
+            return ""
+        cond_headers = entry.conditional_headers() if entry is not None else {}
+
+        host = urlparse(url).netloc
+        for _ in range(self.retries):
+            self.limiter.wait(host)
+            try:
+                resp = self._session().get(url, timeout=self.timeout, headers=cond_headers)
+            except Exception as e:
+                self._log(f"[error] Error fetching {url}: {e}")
+                self.limiter.penalize(host)
+                continue
+
+            if resp.status_code == 304 and entry is not None:
+                self.limiter.reward(host)
+                self.cache.touch(url, resp.headers)
+                return entry.body
+
+            if resp.status_code == 200:
+                self.limiter.reward(host)
+                ctype = resp.headers.get("Content-Type", "")
+                if not any(t in ctype for t in HTML_CONTENT_TYPES):
+                    self._log(f"[skip] non-HTML content for {url}: {ctype}")
+                    return ""
+                text = resp.text
+                if self.cache is not None:
+                    self.cache.put(url, text, resp.headers)
+                return text
+
+            self._log(f"[warn] {url} status {resp.status_code}")
+            if resp.status_code in RETRY_STATUS:
+                retry_after = _parse_retry_after(resp.headers.get("Retry-After"))
+                self.limiter.penalize(host, retry_after)
+                continue
+            return ""
+        # 重试用完：有旧缓存就先用旧的
+        return entry.body if entry is not None else ""
+
+    def fetch_many(self, urls: Iterable[str]) -> Iterator[Tuple[str, str]]:
+        """并发抓取，按完成顺序产出 (url, html)"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.fetch, url): url for url in urls}
+            for fut in as_completed(futures):
+                yield futures[fut], fut.result()
@@ -0,0 +1,271 @@
+# scripts/_http_cache.py
+"""
+磁盘 HTTP 响应缓存（默认放在 data/raw/http_cache/）
+
+- 以规范化后的 URL 为键；正文按 sha256 内容寻址，gzip 压缩后存到 objects/ 下，
+  相同正文只存一份
+- 记录 ETag / Last-Modified，过了 TTL 的条目用条件请求（If-None-Match /
+  If-Modified-Since）重新验证，304 就直接续期
+- 总大小超过上限时按最近访问时间（LRU）淘汰
+- offline 模式只从缓存读，不发任何网络请求
+"""
+
+import gzip
+import hashlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from _paths import RAW_DIR
+
+DEFAULT_CACHE_DIR = RAW_DIR / "http_cache"
+DEFAULT_TTL = 7 * 24 * 3600  # 秒
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+# 这些查询参数只是跟踪用的，不影响页面内容：按参数名整个匹配，前缀只认 utm_
+# （from / fromDate 之类的参数可能真的决定页面内容，不能去掉）
+_TRACKING_PARAMS = frozenset({"spm", "share_token"})
+_TRACKING_PREFIX = "utm_"
+
+
+def normalize_url(url: str) -> str:
+    """
+    规范化 URL 作为缓存键：
+    scheme/host 小写、去默认端口、去 #fragment、去跟踪参数、查询参数排序
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    port = parts.port
+    if port and not (
+        (scheme == "http" and port == 80) or (scheme == "https" and port == 443)
+    ):
+        host = f"{host}:{port}"
+    query = [
+        (k, v)
+        for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if k.lower() not in _TRACKING_PARAMS and not k.lower().startswith(_TRACKING_PREFIX)
+    ]
+    query.sort()
+    path = parts.path or "/"
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    body: str
+    etag: str
+    last_modified: str
+    content_type: str
+    fetched_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        return ttl is None or time.time() - self.fetched_at < ttl
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    线程安全（一把锁 + 一个 sqlite 连接），可以直接交给 _fetcher.Fetcher 多线程共用。
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = DEFAULT_CACHE_DIR,
+        ttl: Optional[float] = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.objects_dir = self.cache_dir / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            str(self.cache_dir / "index.sqlite"), check_same_thread=False
+        )
+        self._db.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                etag TEXT NOT NULL DEFAULT '',
+                last_modified TEXT NOT NULL DEFAULT '',
+                content_type TEXT NOT NULL DEFAULT '',
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS objects (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries(accessed_at);
+            CREATE INDEX IF NOT EXISTS idx_entries_digest ON entries(digest);
+            """
+        )
+        self._db.commit()
+
+    # ---------- 对象文件 ----------
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.gz"
+
+    def _write_object(self, body: bytes) -> str:
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._object_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_bytes(gzip.compress(body, compresslevel=6))
+            tmp.replace(path)
+            self._db.execute(
+                "INSERT OR REPLACE INTO objects(digest, size) VALUES (?, ?)",
+                (digest, path.stat().st_size),
+            )
+        return digest
+
+    def _read_object(self, digest: str) -> Optional[bytes]:
+        try:
+            return gzip.decompress(self._object_path(digest).read_bytes())
+        except (OSError, EOFError):
+            return None
+
+    def _drop_object_if_orphan(self, digest: str) -> None:
+        row = self._db.execute(
+            "SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)
+        ).fetchone()
+        if row is None:
+            self._object_path(digest).unlink(missing_ok=True)
+            self._db.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+
+    # ---------- 对外接口 ----------
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """取缓存（不管是否过期），没有就返回 None"""
+        key = normalize_url(url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, digest, etag, last_modified, content_type, fetched_at "
+                "FROM entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            body = self._read_object(row[1])
+            if body is None:
+                # 对象文件被手动删了之类，当作没缓存
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._db.commit()
+                self.misses += 1
+                return None
+            self._db.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._db.commit()
+            self.hits += 1
+        return CacheEntry(
+            url=row[0],
+            body=body.decode("utf-8"),
+            etag=row[2],
+            last_modified=row[3],
+            content_type=row[4],
+            fetched_at=row[5],
+        )
+
+    def put(self, url: str, body: str, headers=None) -> None:
+        headers = headers or {}
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            old = self._db.execute(
+                "SELECT digest FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            digest = self._write_object(body.encode("utf-8"))
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries"
+                "(key, url, digest, etag, last_modified, content_type, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    url,
+                    digest,
+                    headers.get("ETag", "") or "",
+                    headers.get("Last-Modified", "") or "",
+                    headers.get("Content-Type", "") or "",
+                    now,
+                    now,
+                ),
+            )
+            if old is not None and old[0] != digest:
+                self._drop_object_if_orphan(old[0])
+            self._evict()
+            self._db.commit()
+
+    def touch(self, url: str, headers=None) -> None:
+        """条件请求拿到 304：续期，顺便更新新的 ETag / Last-Modified"""
+        headers = headers or {}
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET fetched_at = ?, accessed_at = ?, "
+                "etag = COALESCE(NULLIF(?, ''), etag), "
+                "last_modified = COALESCE(NULLIF(?, ''), last_modified) "
+                "WHERE key = ?",
+                (now, now, headers.get("ETag", ""), headers.get("Last-Modified", ""), key),
+            )
+            self._db.commit()
+
+    def urls(self) -> list:
+        """缓存里所有条目的原始 URL（按最近访问时间从新到旧）"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT url FROM entries ORDER BY accessed_at DESC"
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+
+    def _evict(self) -> None:
+        # 调用方已持有锁
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute(
+            "SELECT key, digest FROM entries ORDER BY accessed_at ASC"
+        ).fetchall()
+        for key, digest in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            size_row = self._db.execute(
+                "SELECT size FROM objects WHERE digest = ?", (digest,)
+            ).fetchone()
+            self._drop_object_if_orphan(digest)
+            still_there = self._db.execute(
+                "SELECT 1 FROM objects WHERE digest = ?", (digest,)
+            ).fetchone()
+            if size_row and still_there is None:
+                total -= size_row[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,176 @@
+# scripts/_ingest.py
+"""
+盯着 weibo_output/ 增量读新数据（watch_weibo.py 用）
+
+- FolderWatcher.poll() 每次扫一遍目录（只 stat，不读文件），
+  只读新文件，或者老文件比上次多出来的那一段字节
+- 每个文件记住已经消费到的字节位置，状态存在 json 里，重启后接着读；
+  poll() 只更新内存里的位置，调用方处理完这批再 commit() 落盘。
+  调用方把 poll() 之后的位置（watcher.files）跟这批的结果一起存下来，
+  在 commit() 之前挂掉的话，重启时 recover() 把这些位置补回来，这批不会被重复处理
+- poll(max_bytes) 一次最多读这么多字节（按完整记录截断），积压很多时分几批读
+- 爬虫可能正写到一半：只消费到最后一个“完整记录”的换行为止
+  （换行前面的双引号个数是偶数才算，引号里的换行不算），剩下的下次再读
+- 文件变小了（被覆盖重写）就从头再读一遍；表头还没写完整（没有换行）的文件先不碰
+- 列名映射 / 编码沿用 merge_weibo 的 read_header + infer_mapping，输出同样的标准列
+
+不依赖 inotify：目录里文件数不多，轮询 stat 一次是毫秒级。
+"""
+
+import io
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from _paths import DATA_DIR, PROJECT_ROOT
+from merge_weibo import OUT_COLUMNS, infer_mapping, read_header, to_standard
+
+WATCH_DIR = PROJECT_ROOT / "weibo_output"
+STATE_PATH = DATA_DIR / ".weibo_ingest_state.json"
+
+
+def complete_prefix(data: bytes) -> int:
+    """data 里最后一个完整记录结束的位置（含换行），没有完整记录返回 0"""
+    end = len(data)
+    while True:
+        nl = data.rfind(b"\n", 0, end)
+        if nl < 0:
+            return 0
+        # 引号成对出现才是在引号外面，这个换行才是记录边界
+        if data.count(b'"', 0, nl) % 2 == 0:
+            return nl + 1
+        end = nl
+
+
+class FolderWatcher:
+    def __init__(self, folder: Path = WATCH_DIR, state_path: Optional[Path] = STATE_PATH):
+        self.folder = Path(folder)
+        self.state_path = Path(state_path) if state_path else None
+        # 文件名 -> {"offset": 已消费字节数, "size": 上次看到的大小}
+        self.files: Dict[str, dict] = {}
+        self._dirty = False
+        self._read_bytes = 0
+        # 上次 poll() 是不是因为 max_bytes 停下、目录里还有没读的
+        self.more = False
+        if self.state_path and self.state_path.exists():
+            try:
+                self.files = json.loads(self.state_path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                self.files = {}
+
+    def save(self) -> None:
+        if self.state_path is None:
+            return
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.files, ensure_ascii=False, indent=1), encoding="utf-8")
+        tmp.replace(self.state_path)
+
+    def _scan(self) -> List[os.DirEntry]:
+        if not self.folder.exists():
+            return []
+        return sorted(
+            (e for e in os.scandir(self.folder) if e.name.endswith(".csv") and e.is_file()),
+            key=lambda e: e.name,
+        )
+
+    def skip_existing(self) -> int:
+        """把目录里现有的内容都记为已消费（这些数据由批处理流程处理），返回文件数"""
+        n = 0
+        for entry in self._scan():
+            if entry.name not in self.files:
+                size = entry.stat().st_size
+                with open(entry.path, "rb") as f:
+                    data = f.read()
+                self.files[entry.name] = {"offset": complete_prefix(data), "size": size}
+                n += 1
+        self.save()
+        return n
+
+    def _read_new(self, entry: os.DirEntry, max_bytes: Optional[int]) -> Optional[pd.DataFrame]:
+        state = self.files.get(entry.name)
+        size = entry.stat().st_size
+        if state is not None and size < state["size"]:
+            print(f"[info] {entry.name} shrank, re-reading from the start")
+            state = None
+        if state is not None and size == state["offset"]:
+            return None
+
+        with open(entry.path, "rb") as f:
+            header = f.readline()
+            if not header.endswith(b"\n"):
+                # 表头还在写：不读也不记位置，等写完整了再说
+                return None
+            start = max(state["offset"], len(header)) if state else len(header)
+            f.seek(start)
+            want = size - start
+            data = f.read(want if max_bytes is None else min(want, max_bytes))
+            usable = complete_prefix(data)
+            if usable == 0 and len(data) < want:
+                # 一条记录就比 max_bytes 还大：把它整条读完
+                data += f.read(want - len(data))
+                usable = complete_prefix(data)
+            if len(data) < want:
+                self.more = True
+        self.files[entry.name] = {"offset": start + usable, "size": size}
+        self._dirty = True
+        if usable == 0:
+            return None
+
+        columns, enc = read_header(entry.path)
+        if columns is None:
+            return None
+        rename_map = infer_mapping(columns)
+        chunk = pd.read_csv(
+            io.BytesIO(header + data[:usable]),
+            usecols=list(rename_map) or [0],
+            dtype=str,
+            encoding=enc,
+            encoding_errors="replace",
+        )
+        self._read_bytes += usable
+        return to_standard(chunk, rename_map)
+
+    def commit(self) -> None:
+        """上次 poll() 读到的位置落盘"""
+        if self._dirty:
+            self.save()
+            self._dirty = False
+
+    def recover(self, files: Dict[str, dict]) -> int:
+        """
+        用和某批结果一起存下来的位置快照补上没来得及 commit() 的进度：
+        只往前推（快照里的 offset 比当前记录的大才用），返回推进了几个文件
+        """
+        n = 0
+        for name, snap in files.items():
+            cur = self.files.get(name)
+            if cur is None or snap["offset"] > cur["offset"]:
+                self.files[name] = dict(snap)
+                n += 1
+        if n:
+            self.save()
+        return n
+
+    def poll(self, max_bytes: Optional[int] = None) -> Tuple[pd.DataFrame, Dict[str, int]]:
+        """
+        返回 (新行, 每个文件读到的行数)；没有新数据时是空表。
+        给了 max_bytes 时读够这么多字节就停，剩下的留给下一次 poll（self.more 为 True）
+        """
+        frames, counts = [], {}
+        self._read_bytes = 0
+        self.more = False
+        for entry in self._scan():
+            budget = None if max_bytes is None else max_bytes - self._read_bytes
+            if budget is not None and budget <= 0:
+                self.more = True
+                break
+            chunk = self._read_new(entry, budget)
+            if chunk is not None and len(chunk):
+                frames.append(chunk)
+                counts[entry.name] = len(chunk)
+        if not frames:
+            return pd.DataFrame(columns=OUT_COLUMNS), counts
+        return pd.concat(frames, ignore_index=True), counts
@@ -0,0 +1,210 @@
+# scripts/_legacy_extract.py
+"""
+旧版 BeautifulSoup 解析链（_extract.py 之前的 crawl_news.parse_article），
+只留给 bench_extract.py 做速度对比和结果一致性检查，抓取流程里不再使用。
+"""
+
+import re
+from typing import Dict
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+
+
+def clean_text(text: str) -> str:
+    text = re.sub(r"\s+", " ", text)
+    return text.strip()
+
+
+def extract_date_generic(soup: BeautifulSoup) -> str:
+    """
+    兜底日期抽取：
+    1) <time> 标签
+    2) 常见 <meta> 发布时间字段
+    3) class 名里包含 time/date/pubtime 的元素
+    4) 在全页文本里用正则匹配 YYYY-MM-DD / 中文日期 / 英文月份
+    """
+    # 1) <time> 标签
+    time_tag = soup.find("time")
+    if time_tag:
+        dt = time_tag.get("datetime")
+        if dt:
+            return dt.strip()
+        txt = time_tag.get_text(strip=True)
+        if txt:
+            return txt
+
+    # 2) meta 标签
+    for prop in ("article:published_time", "og:published_time", "article:modified_time"):
+        meta = soup.find("meta", attrs={"property": prop})
+        if meta and meta.get("content"):
+            return meta["content"].strip()
+
+    for name in ("pubdate", "publishdate", "publish_time", "ptime", "date", "sailthru.date"):
+        meta = soup.find("meta", attrs={"name": name})
+        if meta and meta.get("content"):
+            return meta["content"].strip()
+
+    # 3) class 名里含 time/date/pubtime 的元素
+    class_patterns = (
+        "time",
+        "date",
+        "pubtime",
+        "pub_time",
+        "publish",
+        "article-time",
+        "news-time",
+        "time-source",
+    )
+    for pattern in class_patterns:
+        tag = soup.find(attrs={"class": re.compile(pattern, re.I)})
+        if tag:
+            txt = tag.get_text(" ", strip=True)
+            if txt:
+                return txt
+
+    # 4) 正则匹配整页文本
+    full_text = soup.get_text(" ", strip=True)
+
+    # 4.1 YYYY-MM-DD HH:MM:SS / YYYY-MM-DD HH:MM
+    m = re.search(
+        r"\d{4}[-/年]\d{1,2}[-/月]\d{1,2}(日)?\s*\d{0,2}:?\d{0,2}:?\d{0,2}?",
+        full_text,
+    )
+    if m:
+        return m.group(0)
+
+    # 4.2 仅日期 YYYY-MM-DD / YYYY年MM月DD日
+    m = re.search(r"\d{4}[-/年]\d{1,2}[-/月]\d{1,2}(日)?", full_text)
+    if m:
+        return m.group(0)
+
+    # 4.3 英文月份形式：March 12, 2025
+    m = re.search(
+        r"(January|February|March|April|May|June|July|August|September|October|November|December)"
+        r"\s+\d{1,2},\s+\d{4}",
+        full_text,
+    )
+    if m:
+        return m.group(0)
+
+    return ""
+
+
+# ------------------- 各网站解析函数（可按需慢慢扩展） -------------------
+
+
+def parse_people_cn(html: str) -> Dict:
+    """人民网正文，一般在 div#rwb_zw / .rm_txt_con 里"""
+    soup = BeautifulSoup(html, "lxml")
+    title_tag = soup.find("h1") or soup.find("h2")
+    date_tag = (
+        soup.find("span", class_="publish-time")
+        or soup.find("span", class_="date")
+        or soup.find("div", class_="sou")
+    )
+    content_div = (
+        soup.find("div", id="rwb_zw")
+        or soup.find("div", class_="rm_txt_con")
+        or soup.find("div", class_="article")
+    )
+
+    title = title_tag.get_text(strip=True) if title_tag else ""
+    date = date_tag.get_text(strip=True) if date_tag else ""
+    if not date:
+        date = extract_date_generic(soup)
+
+    if content_div:
+        ps = [p.get_text(" ", strip=True) for p in content_div.find_all("p")]
+        content = clean_text(" ".join(ps))
+    else:
+        content = ""
+
+    return {"title": title, "date": date, "content": content}
+
+
+def parse_globaltimes_cn(html: str) -> Dict:
+    """环球时报中文站正文"""
+    soup = BeautifulSoup(html, "lxml")
+    title_tag = soup.find("h1")
+    date_tag = soup.find("span", class_="pub_time") or soup.find(
+        "span", class_="time"
+    )
+    body_div = (
+        soup.find("div", class_="article-content")
+        or soup.find("div", class_="artical-content")
+    )
+
+    title = title_tag.get_text(strip=True) if title_tag else ""
+    date = date_tag.get_text(strip=True) if date_tag else ""
+    if not date:
+        date = extract_date_generic(soup)
+
+    if body_div:
+        ps = [p.get_text(" ", strip=True) for p in body_div.find_all("p")]
+        content = clean_text(" ".join(ps))
+    else:
+        content = ""
+
+    return {"title": title, "date": date, "content": content}
+
+
+def parse_reuters(html: str) -> Dict:
+    """Reuters 新闻正文"""
+    soup = BeautifulSoup(html, "lxml")
+    title_tag = soup.find("h1")
+    time_tag = soup.find("time")
+    body_div = soup.find("div", attrs={"data-testid": "article-body"})
+
+    title = title_tag.get_text(strip=True) if title_tag else ""
+    if time_tag:
+        date = time_tag.get_text(strip=True) or time_tag.get("datetime", "")
+    else:
+        date = ""
+    if not date:
+        date = extract_date_generic(soup)
+
+    if body_div:
+        ps = [p.get_text(" ", strip=True) for p in body_div.find_all("p")]
+        content = clean_text(" ".join(ps))
+    else:
+        content = ""
+
+    return {"title": title, "date": date, "content": content}
+
+
+def parse_generic(html: str) -> Dict:
+    """兜底：取第一个 <h1> / <title> + 所有 <p> 文本，并尽量猜测日期"""
+    soup = BeautifulSoup(html, "lxml")
+    title_tag = soup.find("h1") or soup.find("title")
+    ps = [p.get_text(" ", strip=True) for p in soup.find_all("p")]
+
+    title = title_tag.get_text(strip=True) if title_tag else ""
+    content = clean_text(" ".join(ps)) if ps else ""
+    date = extract_date_generic(soup)
+
+    return {"title": title, "date": date, "content": content}
+
+
+def parse_article(url: str, html: str) -> Dict:
+    """按域名选择解析函数"""
+    netloc = urlparse(url).netloc
+
+    if "people.com.cn" in netloc:
+        data = parse_people_cn(html)
+        source = "people"
+    elif "globaltimes.cn" in netloc:
+        data = parse_globaltimes_cn(html)
+        source = "globaltimes_cn"
+    elif "reuters.com" in netloc:
+        data = parse_reuters(html)
+        source = "reuters"
+    else:
+        # 其它网站统统走通用解析，source 记录原始域名方便后面分组分析
+        data = parse_generic(html)
+        source = netloc
+
+    data["source"] = source
+    data["url"] = url
+    return data
+
@@ -0,0 +1,249 @@
+# scripts/_sentiment_backends.py
+"""
+情感模型的推理后端（CPU 上主要看速度和内存）
+
+- torch     : 原来的 fp32 PyTorch
+- int8      : PyTorch 动态 int8 量化（nn.Linear 权重 int8，激活运行时量化）
+- onnx      : 导出成 ONNX，用 ONNX Runtime 跑
+- onnx-int8 : 在 onnx 的基础上再做 ONNX Runtime 动态 int8 量化
+
+量化 / 导出的产物缓存在 data/model_artifacts/<模型名>-<指纹>/ 下，只在第一次生成；
+指纹由模型版本（见 model_revision）+ torch / transformers 版本算出，模型换了自动重新导出。
+onnxruntime 是可选依赖，只有 onnx / onnx-int8 需要。
+
+所有后端都是同一个调用方式：runner(inputs) -> numpy logits，inputs 是 tokenizer.pad 出来的张量 dict。
+"""
+
+import copy
+import hashlib
+import re
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import torch
+
+from _paths import DATA_DIR
+
+BACKENDS = ("torch", "int8", "onnx", "onnx-int8")
+ARTIFACT_DIR = DATA_DIR / "model_artifacts"
+ONNX_OPSET = 18
+
+device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+
+@lru_cache(maxsize=None)
+def load_tokenizer(name, local_files_only=False):
+    # transformers 导入很慢，用到时才导入
+    from transformers import AutoTokenizer
+
+    return AutoTokenizer.from_pretrained(name, local_files_only=local_files_only)
+
+
+@lru_cache(maxsize=None)
+def load_model(name, local_files_only=False):
+    """加载 tokenizer + fp32 模型；同一进程里同一个模型只加载一次"""
+    from transformers import AutoModelForSequenceClassification
+
+    model = AutoModelForSequenceClassification.from_pretrained(
+        name, local_files_only=local_files_only
+    ).to(device)
+    model.eval()
+    return load_tokenizer(name, local_files_only), model
+
+
+# ------------------- 各后端的 runner -------------------
+
+
+class TorchRunner:
+    def __init__(self, model):
+        self.model = model.eval()
+        self.device = next(model.parameters()).device
+
+    def __call__(self, inputs):
+        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        with torch.no_grad():
+            logits = self.model(**inputs).logits
+        return logits.float().cpu().numpy()
+
+
+class OnnxRunner:
+    def __init__(self, path, threads=None):
+        import onnxruntime as ort
+
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = threads or torch.get_num_threads()
+        self.session = ort.InferenceSession(
+            str(path), sess_options=opts, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def __call__(self, inputs):
+        feed = {k: inputs[k].cpu().numpy() for k in self.input_names}
+        return self.session.run(None, feed)[0]
+
+
+def as_runner(model):
+    """predict_sentiment 也接受裸的 PyTorch 模型"""
+    return TorchRunner(model) if isinstance(model, torch.nn.Module) else model
+
+
+def softmax(logits):
+    logits = np.asarray(logits, dtype=np.float32)
+    e = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+# ------------------- 产物缓存 -------------------
+
+
+# 模型名 -> 版本，每个进程里每个模型只解析一次
+_REVISIONS = {}
+
+
+def model_revision(name, local_files_only=False):
+    """
+    模型版本：本地目录 → 文件名 + 大小 + 修改时间的哈希；
+    hub 模型 → 本地 HF 缓存里的 snapshot commit，还没下载过就问 hub 当前的 commit
+    （随后下载下来的就是这个 snapshot）；离线又没下载过才是 "latest"。
+    同一进程里只解析一次，下载前后拿到的是同一个值：结果缓存的查 / 写 / prune
+    和产物目录用的都是它，不会在第一次下载之后换一个键
+    """
+    if name in _REVISIONS:
+        return _REVISIONS[name]
+    path = Path(name)
+    if path.is_dir():
+        h = hashlib.sha1()
+        for f in sorted(p for p in path.rglob("*") if p.is_file()):
+            st = f.stat()
+            h.update(f"{f.relative_to(path)}|{st.st_size}|{st.st_mtime_ns}".encode())
+        revision = h.hexdigest()[:12]
+    else:
+        revision = _hub_revision(name, local_files_only)
+    _REVISIONS[name] = revision
+    return revision
+
+
+def _hub_revision(name, local_files_only):
+    try:
+        from huggingface_hub import HfApi, try_to_load_from_cache
+
+        cached = try_to_load_from_cache(name, "config.json")
+        if isinstance(cached, str):
+            return Path(cached).parent.name
+        if not local_files_only:
+            return HfApi().model_info(name).sha or "latest"
+    except Exception:
+        pass
+    return "latest"
+
+
+def _fingerprint(name, local_files_only=False):
+    """模型名 + 模型版本 + 库版本"""
+    import transformers
+
+    revision = model_revision(name, local_files_only)
+    key = f"{name}|{revision}|{torch.__version__}|{transformers.__version__}"
+    return hashlib.sha1(key.encode()).hexdigest()[:12]
+
+
+def artifact_dir(name, root=ARTIFACT_DIR, local_files_only=False):
+    slug = re.sub(r"[^\w.-]+", "--", str(name).strip("/"))[-80:]
+    return Path(root) / f"{slug}-{_fingerprint(name, local_files_only)}"
+
+
+def _quantized_torch(name, local_files_only, root):
+    path = artifact_dir(name, root, local_files_only) / "model_int8.pt"
+    if path.exists():
+        # 量化模型存的是整个 pickle（weights_only=False 会执行里面的代码）：
+        # 产物目录只放这里自己写出的文件，不要拷别人给的 model_int8.pt 进来
+        return torch.load(path, weights_only=False)
+    _, model = load_model(name, local_files_only)
+    # load_model 的结果是进程内共享的（lru_cache），量化一份拷贝，不动原来那个（可能在 GPU 上）
+    qmodel = torch.ao.quantization.quantize_dynamic(
+        copy.deepcopy(model).cpu(), {torch.nn.Linear}, dtype=torch.qint8
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    torch.save(qmodel, tmp)
+    tmp.replace(path)
+    print("[info] saved int8 model to", path)
+    return qmodel
+
+
+def _onnx_model(name, local_files_only, root, quantize=False):
+    out_dir = artifact_dir(name, root, local_files_only)
+    path = out_dir / "model.onnx"
+    if not path.exists():
+        from transformers import AutoModelForSequenceClassification
+
+        tokenizer = load_tokenizer(name, local_files_only)
+        # eager attention 导出的图才能正确处理动态 batch / 序列长度下的 padding mask
+        model = AutoModelForSequenceClassification.from_pretrained(
+            name, local_files_only=local_files_only, attn_implementation="eager"
+        ).eval()
+        sample = dict(tokenizer(["示例文本 sample text", "短"], padding=True, return_tensors="pt"))
+        batch, seq = torch.export.Dim("batch"), torch.export.Dim("seq")
+        out_dir.mkdir(parents=True, exist_ok=True)
+        tmp = out_dir / "model.onnx.tmp"
+        torch.onnx.export(
+            model,
+            (),
+            str(tmp),
+            kwargs=sample,
+            input_names=list(sample),
+            output_names=["logits"],
+            dynamic_shapes={k: {0: batch, 1: seq} for k in sample},
+            opset_version=ONNX_OPSET,
+            dynamo=True,
+            external_data=False,
+        )
+        tmp.replace(path)
+        print("[info] exported ONNX model to", path)
+    if not quantize:
+        return path
+
+    qpath = out_dir / "model_int8.onnx"
+    if not qpath.exists():
+        import onnx
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        # 导出器写进去的中间形状信息会让量化器的形状推断报错，去掉让它重新推
+        graph = onnx.load(str(path))
+        del graph.graph.value_info[:]
+        plain = out_dir / "model_plain.onnx.tmp"
+        onnx.save(graph, str(plain))
+        tmp = out_dir / "model_int8.onnx.tmp"
+        try:
+            quantize_dynamic(str(plain), str(tmp), weight_type=QuantType.QInt8)
+        finally:
+            plain.unlink(missing_ok=True)
+        tmp.replace(qpath)
+        print("[info] saved int8 ONNX model to", qpath)
+    return qpath
+
+
+@lru_cache(maxsize=None)
+def load_backend(name, backend="torch", local_files_only=False, root=ARTIFACT_DIR):
+    """返回 (tokenizer, runner)；同一进程里同一个 (模型, 后端) 只加载一次"""
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend {backend!r}, choose from {BACKENDS}")
+    if backend == "torch":
+        tokenizer, model = load_model(name, local_files_only)
+        return tokenizer, TorchRunner(model)
+    tokenizer = load_tokenizer(name, local_files_only)
+    if backend == "int8":
+        return tokenizer, TorchRunner(_quantized_torch(name, local_files_only, root))
+    path = _onnx_model(name, local_files_only, root, quantize=backend == "onnx-int8")
+    return tokenizer, OnnxRunner(path)
+
+
+def artifact_bytes(name, backend, root=ARTIFACT_DIR):
+    """某个后端在磁盘上的产物大小（torch 后端没有产物，返回 0）"""
+    files = {
+        "int8": ["model_int8.pt"],
+        "onnx": ["model.onnx"],
+        "onnx-int8": ["model_int8.onnx"],
+    }.get(backend, [])
+    d = artifact_dir(name, root)
+    return sum((d / f).stat().st_size for f in files if (d / f).exists())
@@ -0,0 +1,118 @@
+# scripts/_sentiment_cache.py
+"""
+情感结果的持久化缓存（默认 data/processed/sentiment_cache.sqlite）
+
+(模型键, 文本哈希) → (label, conf)。模型键 = 模型名 @ 版本 | 后端 | max_length，
+版本见 _sentiment_backends.model_revision：换了 CH_MODEL_NAME / EN_MODEL_NAME、
+本地模型文件变了、换了后端或截断长度，键就不一样，旧结果不会被误用。
+文本哈希和分词缓存一样用 _token_cache.text_digest（blake2b-128）。
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+from _paths import PROCESSED_DIR
+
+DEFAULT_CACHE_PATH = PROCESSED_DIR / "sentiment_cache.sqlite"
+
+# sqlite 单条语句的参数个数有限，批量查询按这个大小切
+_BATCH = 500
+
+
+def model_key(name: str, revision: str, backend: str, max_length: int) -> str:
+    return f"{name}@{revision}|{backend}|len={max_length}"
+
+
+class SentimentCache:
+    """
+    用法:
+        cache = SentimentCache()
+        hits = cache.get_many(key, digests)            # {digest: (label, conf)}
+        cache.put_many(key, [(digest, label, conf), ...])
+        print(cache.stats())
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS results (
+                model_key TEXT NOT NULL,
+                digest BLOB NOT NULL,
+                label INTEGER NOT NULL,
+                conf REAL NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (model_key, digest)
+            ) WITHOUT ROWID;
+            """
+        )
+        self._db.commit()
+
+    def get_many(self, key: str, digests: Iterable[bytes]) -> Dict[bytes, Tuple[int, float]]:
+        digests = list(dict.fromkeys(digests))
+        found: Dict[bytes, Tuple[int, float]] = {}
+        with self._lock:
+            for start in range(0, len(digests), _BATCH):
+                batch = digests[start:start + _BATCH]
+                marks = ",".join("?" * len(batch))
+                rows = self._db.execute(
+                    f"SELECT digest, label, conf FROM results "
+                    f"WHERE model_key = ? AND digest IN ({marks})",
+                    (key, *batch),
+                ).fetchall()
+                for digest, label, conf in rows:
+                    found[digest] = (label, conf)
+            self.hits += len(found)
+            self.misses += len(digests) - len(found)
+        return found
+
+    def put_many(self, key: str, items: Iterable[Tuple[bytes, int, float]]) -> None:
+        now = time.time()
+        rows = [(key, d, int(label), float(conf), now) for d, label, conf in items]
+        if not rows:
+            return
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO results(model_key, digest, label, conf, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._db.commit()
+
+    def model_keys(self) -> Dict[str, int]:
+        """缓存里各模型键的条目数"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT model_key, COUNT(*) FROM results GROUP BY model_key"
+            ).fetchall()
+        return dict(rows)
+
+    def prune(self, keep: Iterable[str]) -> int:
+        """删掉不在 keep 里的模型键（换模型之后清理旧结果），返回删除的条数"""
+        keep = list(keep)
+        marks = ",".join("?" * len(keep)) or "''"
+        with self._lock:
+            cur = self._db.execute(
+                f"DELETE FROM results WHERE model_key NOT IN ({marks})", keep
+            )
+            self._db.commit()
+        return cur.rowcount
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"hits={self.hits} misses={self.misses} ({rate:.1%} hit)"
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,116 @@
+# scripts/_sentiment_shards.py
+"""
+多进程分片推理：把每种语言的文本切成若干分片，交给固定线程数的 worker 进程
+
+- 总 worker 数按各语言的文本量分给 CN / US，两个语言各一个进程池，同时跑
+  （每个 worker 只加载自己语言的那个模型）
+- 每个 worker 启动时固定 torch.set_num_threads(threads)，避免多个进程各开满线程互相抢核
+- 文本按长度排序后轮流发牌到各分片，每个分片的工作量差不多
+- 结果按分片里记下的原下标放回，和单进程的顺序完全一致
+- 每个 worker 的处理条数 / 耗时都会记下来，最后打印各 worker 的吞吐量
+"""
+
+import math
+import multiprocessing as mp
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def _init_worker(threads):
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["MKL_NUM_THREADS"] = str(threads)
+    import torch
+
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+
+
+def _predict_shard(job):
+    """子进程：加载（或复用）模型，跑一个分片，返回 (分片号, 结果, 耗时, pid)"""
+    from _sentiment_backends import load_backend
+    from sentiment_bert import predict_sentiment
+
+    shard_id, spec, texts, opts = job
+    name, backend, offline, artifact_dir = spec
+    tokenizer, runner = load_backend(name, backend, local_files_only=offline, root=artifact_dir)
+    t0 = time.perf_counter()
+    res = predict_sentiment(texts, tokenizer, runner, **opts)
+    return shard_id, res, time.perf_counter() - t0, os.getpid()
+
+
+def split_workers(counts, workers):
+    """按文本量把 workers 个进程分给各语言，每种有文本的语言至少 1 个"""
+    langs = [l for l, n in counts.items() if n]
+    if not langs:
+        return {}
+    total = sum(counts[l] for l in langs)
+    alloc = {l: max(1, round(workers * counts[l] / total)) for l in langs}
+    # 四舍五入可能多分，从分得最多的语言里扣回来
+    while sum(alloc.values()) > max(workers, len(langs)):
+        big = max(alloc, key=alloc.get)
+        alloc[big] -= 1
+    return alloc
+
+
+def make_shards(texts, n_shards):
+    """按长度从长到短轮流发牌，返回 [[原下标, ...], ...]"""
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+    shards = [order[k::n_shards] for k in range(n_shards)]
+    return [s for s in shards if s]
+
+
+def run_sharded(
+    texts_by_lang, specs, workers, threads=None, shard_size=None, verbose=True, **opts
+):
+    """
+    texts_by_lang: {lang: [text, ...]}；specs: {lang: (模型路径, 后端, offline, 产物目录)}
+    返回 {lang: [(label, conf), ...]}，顺序与输入一致
+    """
+    counts = {l: len(t) for l, t in texts_by_lang.items()}
+    alloc = split_workers(counts, workers)
+    threads = threads or max(1, (os.cpu_count() or 1) // max(1, sum(alloc.values())))
+    ctx = mp.get_context("spawn")
+
+    pools, futures, shards = {}, {}, {}
+    try:
+        for lang, n_workers in alloc.items():
+            texts = texts_by_lang[lang]
+            size = shard_size or math.ceil(len(texts) / n_workers)
+            shards[lang] = make_shards(texts, max(1, math.ceil(len(texts) / size)))
+            if verbose:
+                print(
+                    f"[info] {lang}: {len(texts)} texts -> {len(shards[lang])} shards, "
+                    f"{n_workers} workers x {threads} threads"
+                )
+            pools[lang] = ProcessPoolExecutor(
+                max_workers=n_workers,
+                mp_context=ctx,
+                initializer=_init_worker,
+                initargs=(threads,),
+            )
+            for k, idx in enumerate(shards[lang]):
+                job = (k, specs[lang], [texts[i] for i in idx], opts)
+                futures[pools[lang].submit(_predict_shard, job)] = lang
+
+        out = {l: [(None, None)] * counts[l] for l in alloc}
+        stats = defaultdict(lambda: [0, 0.0])
+        for fut in as_completed(futures):
+            lang = futures[fut]
+            shard_id, res, seconds, pid = fut.result()
+            for i, r in zip(shards[lang][shard_id], res):
+                out[lang][i] = r
+            stats[(lang, pid)][0] += len(res)
+            stats[(lang, pid)][1] += seconds
+    finally:
+        for pool in pools.values():
+            pool.shutdown(cancel_futures=True)
+
+    if verbose:
+        for (lang, pid), (n, seconds) in sorted(stats.items()):
+            print(
+                f"[info] {lang} worker pid={pid}: {n} texts in {seconds:.1f}s "
+                f"({n / max(seconds, 1e-9):.1f} texts/s)"
+            )
+    return out
@@ -0,0 +1,375 @@
+# scripts/_store.py
+"""
+流水线中间产物的列式存储（Parquet），替代各阶段之间互相传 utf-8-sig CSV
+
+- 每个数据集一个名字：news_raw / weibo_raw / all_texts / all_texts_duplicates /
+  all_texts_clean / all_with_sentiment / all_with_clusters / us_news_topics
+- 写：按 COLUMN_TYPES 定好的显式 schema 写 Parquet（zstd 压缩），
+  country / source / source_type 存成分类（dictionary）列
+- 读：只读需要的列；没有 .parquet 时回退读同名 .csv（比如还在用旧流程产出的文件，
+  或者 crawl_news / merge_weibo 追加写的 raw csv）
+- 大文件用 iter_dataset 分块读；where 按列值过滤（Parquet 下推到读盘时做）
+- 只往已有数据集上加几列时用 write_with_columns，逐块读源文件、接上新列写出，
+  不必把 content / clean_content / tokens 整张读进内存
+- memory_report 打印每列占用的内存
+- 报告需要 CSV 时用 export_csv，或者 python scripts/export_csv.py
+
+没装 pyarrow 时写入自动退回 CSV，流程照样能跑。
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import pandas as pd
+
+from _paths import PROCESSED_DIR, RAW_DIR
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    HAS_ARROW = True
+except ImportError:  # pragma: no cover - 取决于环境
+    pa = None
+    pq = None
+    HAS_ARROW = False
+
+# write_part 的 meta 在 Parquet schema 元数据里的键
+_PART_META_KEY = b"part_meta"
+
+# 数据集名 -> 所在目录
+DATASETS: Dict[str, Path] = {
+    "news_raw": RAW_DIR,
+    "weibo_raw": RAW_DIR,
+    "all_texts": PROCESSED_DIR,
+    "all_texts_duplicates": PROCESSED_DIR,
+    "all_texts_clean": PROCESSED_DIR,
+    "all_with_sentiment": PROCESSED_DIR,
+    "all_with_clusters": PROCESSED_DIR,
+    "us_news_topics": PROCESSED_DIR,
+}
+
+# 列名 -> pandas dtype；不在表里的列按 pandas 推断出来的类型写
+COLUMN_TYPES: Dict[str, str] = {
+    "country": "category",
+    "source": "category",
+    "source_type": "category",
+    "date": "string",
+    "title": "string",
+    "content": "string",
+    "url": "string",
+    "user_name": "string",
+    "clean_content": "string",
+    "tokens": "string",
+    "sentiment_label": "Int8",
+    "sentiment_conf": "float32",
+    "cluster": "Int16",
+    "us_topic": "Int16",
+    "dup_cluster": "Int32",
+    "dup_count": "Int32",
+    "published_at": "datetime64[ns]",
+}
+
+# 每个数据集应有的列（CSV 回退读时按这里给 dtype；多出来的列照样读）
+_BASE_COLUMNS = ["country", "source", "source_type", "date", "title", "content", "url"]
+_TEXT_COLUMNS = _BASE_COLUMNS + ["published_at", "dup_cluster", "dup_count"]
+_CLEAN_COLUMNS = _TEXT_COLUMNS + ["clean_content", "tokens"]
+SCHEMAS: Dict[str, List[str]] = {
+    "news_raw": _BASE_COLUMNS,
+    "weibo_raw": _BASE_COLUMNS + ["user_name"],
+    "all_texts": _TEXT_COLUMNS,
+    # build_dataset 去重删掉的行：来源 + 所属的簇（对应 all_texts 里保留那行的 dup_cluster）
+    "all_texts_duplicates": ["dup_cluster", "source", "url", "title", "date", "published_at"],
+    "all_texts_clean": _CLEAN_COLUMNS,
+    "all_with_sentiment": _CLEAN_COLUMNS + ["sentiment_label", "sentiment_conf"],
+    "all_with_clusters": _CLEAN_COLUMNS + ["cluster"],
+    "us_news_topics": _CLEAN_COLUMNS + ["us_topic"],
+}
+
+# 分块读 / 写时每块的行数；写 Parquet 时 row group 也按这个大小切，
+# 分块读才真的是一块一块解码（一个 row group 只能整个读进来）
+CHUNK_ROWS = 20_000
+
+_ARROW_TYPES = {
+    "category": lambda: pa.dictionary(pa.int32(), pa.string()),
+    "string": lambda: pa.string(),
+    "Int8": lambda: pa.int8(),
+    "Int16": lambda: pa.int16(),
+    "Int32": lambda: pa.int32(),
+    "float32": lambda: pa.float32(),
+    "datetime64[ns]": lambda: pa.timestamp("ns"),
+}
+
+
+def dataset_path(name: str, fmt: str = "parquet") -> Path:
+    if name not in DATASETS:
+        raise KeyError(f"unknown dataset {name!r}, known: {sorted(DATASETS)}")
+    return DATASETS[name] / f"{name}.{fmt}"
+
+
+def exists(name: str) -> bool:
+    return dataset_path(name, "parquet").exists() or dataset_path(name, "csv").exists()
+
+
+def _coerce(df: pd.DataFrame) -> pd.DataFrame:
+    """按 COLUMN_TYPES 统一列类型（文本列只把缺失值统一成 NA，不转成 'nan' 字符串）"""
+    df = df.copy()
+    for col, dtype in COLUMN_TYPES.items():
+        if col not in df.columns:
+            continue
+        if dtype == "category":
+            df[col] = df[col].astype("string").astype("category")
+        elif dtype == "string":
+            df[col] = df[col].astype("string")
+        elif dtype.startswith("datetime64"):
+            df[col] = pd.to_datetime(df[col], errors="coerce", format="ISO8601").astype(dtype)
+        elif dtype in ("Int8", "Int16", "Int32"):
+            df[col] = pd.to_numeric(df[col], errors="coerce").round().astype(dtype)
+        else:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(dtype)
+    return df
+
+
+def arrow_schema(df: pd.DataFrame):
+    """按 COLUMN_TYPES 给已知列指定 Arrow 类型，其余列从数据推断"""
+    inferred = pa.Schema.from_pandas(df, preserve_index=False)
+    fields = []
+    for field in inferred:
+        dtype = COLUMN_TYPES.get(field.name)
+        if dtype is not None:
+            field = pa.field(field.name, _ARROW_TYPES[dtype](), nullable=True)
+        fields.append(field)
+    return pa.schema(fields)
+
+
+def write_dataset(df: pd.DataFrame, name: str, csv: bool = False) -> Path:
+    """
+    写 Parquet，返回路径。csv=True 时再额外导出一份 CSV（给报告 / Excel 用）。
+    没有 pyarrow 时只写 CSV。
+    """
+    df = _coerce(df)
+    if not HAS_ARROW:
+        print("[warn] pyarrow not installed, writing CSV instead of Parquet")
+        return _write_csv(df, name)
+
+    path = dataset_path(name, "parquet")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(df, schema=arrow_schema(df), preserve_index=False)
+    tmp = path.with_suffix(".parquet.tmp")
+    pq.write_table(table, tmp, compression="zstd", row_group_size=CHUNK_ROWS)
+    tmp.replace(path)
+    if csv:
+        _write_csv(df, name)
+    return path
+
+
+def write_part(
+    df: pd.DataFrame, folder: Path, name: str, meta: Optional[dict] = None
+) -> Path:
+    """
+    追加式数据集：一个目录下多个分片，每次写一个新分片（name.parquet），
+    不改已有文件；pd.read_parquet(folder) 一次读回全部分片。没有 pyarrow 时写 CSV。
+    meta（能 json 序列化的 dict）和分片一起落盘：Parquet 存在文件的 schema 元数据里，
+    跟数据一起原子地出现；CSV 分片先写 name.meta.json 再写数据。用 read_part_meta 读回。
+    """
+    df = _coerce(df)
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    if not HAS_ARROW:
+        path = folder / f"{name}.csv"
+        if meta is not None:
+            (folder / f"{name}.meta.json").write_text(
+                json.dumps(meta, ensure_ascii=False), encoding="utf-8"
+            )
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+        return path
+    path = folder / f"{name}.parquet"
+    table = pa.Table.from_pandas(df, schema=arrow_schema(df), preserve_index=False)
+    if meta is not None:
+        table = table.replace_schema_metadata(
+            {**(table.schema.metadata or {}), _PART_META_KEY: json.dumps(meta, ensure_ascii=False)}
+        )
+    # 先写临时文件（后缀不是 .parquet，读目录时不会被读到）再改名
+    tmp = folder / f".{name}.tmp"
+    pq.write_table(table, tmp, compression="zstd")
+    tmp.replace(path)
+    return path
+
+
+def read_part_meta(path: Path) -> Optional[dict]:
+    """write_part 存进分片的 meta；没有返回 None"""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        raw = (pq.read_schema(path).metadata or {}).get(_PART_META_KEY)
+    else:
+        side = path.with_name(f"{path.stem}.meta.json")
+        raw = side.read_bytes() if side.exists() else None
+    return json.loads(raw) if raw else None
+
+
+def _write_csv(df: pd.DataFrame, name: str) -> Path:
+    path = dataset_path(name, "csv")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(path, index=False, encoding="utf-8-sig")
+    return path
+
+
+def schema(name: str) -> Dict[str, str]:
+    """数据集的列 -> pandas dtype（只含 COLUMN_TYPES 里有的列）"""
+    dataset_path(name)
+    return {c: COLUMN_TYPES[c] for c in SCHEMAS.get(name, []) if c in COLUMN_TYPES}
+
+
+def dataset_columns(name: str) -> List[str]:
+    """数据集实际有哪些列（只读 Parquet schema / CSV 表头）"""
+    pq_path = dataset_path(name, "parquet")
+    if pq_path.exists():
+        return pq.read_schema(pq_path).names
+    return pd.read_csv(dataset_path(name, "csv"), nrows=0).columns.tolist()
+
+
+def _csv_dtypes(columns: Optional[List[str]]) -> Dict[str, str]:
+    # 分类 / 文本列在 read_csv 里直接给 dtype，不经过 object 列；数值列读完再 _coerce
+    return {
+        c: t
+        for c, t in COLUMN_TYPES.items()
+        if t in ("category", "string") and (columns is None or c in columns)
+    }
+
+
+def _parquet_filters(where: Optional[Dict[str, object]]):
+    return [(col, "==", value) for col, value in where.items()] if where else None
+
+
+def _read_columns(columns: Optional[List[str]], where: Optional[Dict[str, object]]):
+    """要过滤的列不在 columns 里时也得读出来，过滤完再丢掉"""
+    if columns is None or not where:
+        return columns
+    return columns + [c for c in where if c not in columns]
+
+
+def _apply_where(df: pd.DataFrame, where: Optional[Dict[str, object]]) -> pd.DataFrame:
+    if not where:
+        return df
+    mask = pd.Series(True, index=df.index)
+    for col, value in where.items():
+        mask &= (df[col].astype("string") == str(value)).fillna(False)
+    return df[mask].reset_index(drop=True)
+
+
+def read_dataset(
+    name: str,
+    columns: Optional[Iterable[str]] = None,
+    where: Optional[Dict[str, object]] = None,
+) -> pd.DataFrame:
+    """
+    读数据集，columns 指定只读哪些列，where={"country": "US"} 只留列值相等的行。
+    优先 Parquet，没有就读 CSV。两条路径读出来的列类型一致（都按 COLUMN_TYPES）。
+    """
+    columns = list(columns) if columns is not None else None
+    read_cols = _read_columns(columns, where)
+    pq_path = dataset_path(name, "parquet")
+    if pq_path.exists():
+        df = pd.read_parquet(pq_path, columns=read_cols, filters=_parquet_filters(where))
+        return df if read_cols == columns else df[columns]
+
+    csv_path = dataset_path(name, "csv")
+    if not csv_path.exists():
+        raise FileNotFoundError(f"dataset {name!r} not found: {pq_path} / {csv_path}")
+    df = pd.read_csv(csv_path, usecols=read_cols, dtype=_csv_dtypes(read_cols))
+    df = _apply_where(_coerce(df), where)
+    return df if read_cols == columns else df[columns]
+
+
+def iter_dataset(
+    name: str,
+    columns: Optional[Iterable[str]] = None,
+    chunksize: int = CHUNK_ROWS,
+    where: Optional[Dict[str, object]] = None,
+) -> Iterator[pd.DataFrame]:
+    """按块读数据集，每块最多 chunksize 行（列类型同 read_dataset）"""
+    columns = list(columns) if columns is not None else None
+    read_cols = _read_columns(columns, where)
+
+    pq_path = dataset_path(name, "parquet")
+    if pq_path.exists():
+        pf = pq.ParquetFile(pq_path)
+        for batch in pf.iter_batches(batch_size=chunksize, columns=read_cols):
+            chunk = _apply_where(_coerce(batch.to_pandas()), where)
+            yield chunk if read_cols == columns else chunk[columns]
+        return
+
+    csv_path = dataset_path(name, "csv")
+    if not csv_path.exists():
+        raise FileNotFoundError(f"dataset {name!r} not found: {pq_path} / {csv_path}")
+    reader = pd.read_csv(
+        csv_path, usecols=read_cols, dtype=_csv_dtypes(read_cols), chunksize=chunksize
+    )
+    for chunk in reader:
+        chunk = _apply_where(_coerce(chunk), where)
+        yield chunk if read_cols == columns else chunk[columns]
+
+
+def write_with_columns(src: str, dst: str, new_columns: Dict[str, Sequence]) -> Path:
+    """
+    dst = src 的所有列 + new_columns（长度和 src 行数相同、顺序一致）。
+    有 Parquet 时逐块读 src、逐块写 dst，内存里只有一块数据。
+    """
+    pq_path = dataset_path(src, "parquet")
+    if not (HAS_ARROW and pq_path.exists()):
+        df = read_dataset(src)
+        for col, values in new_columns.items():
+            df[col] = values
+        return write_dataset(df, dst)
+
+    pf = pq.ParquetFile(pq_path)
+    n_rows = pf.metadata.num_rows
+    new_columns = {c: pd.Series(v, name=c).reset_index(drop=True) for c, v in new_columns.items()}
+    for col, values in new_columns.items():
+        if len(values) != n_rows:
+            raise ValueError(f"column {col!r} has {len(values)} values, {src} has {n_rows} rows")
+
+    # 输出的 schema（含 pandas 元数据）用 0 行的表推出来，之后每块都留在 Arrow 里，不转 pandas
+    head = pf.schema_arrow.empty_table().to_pandas()
+    for col, values in new_columns.items():
+        head[col] = values.iloc[:0].to_numpy()
+    head = _coerce(head)
+    schema = pa.Table.from_pandas(head, schema=arrow_schema(head), preserve_index=False).schema
+    old_names = [n for n in pf.schema_arrow.names if n not in new_columns]
+    extra_fields = [schema.field(c) for c in new_columns]
+
+    path = dataset_path(dst, "parquet")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".parquet.tmp")
+    start = 0
+    with pq.ParquetWriter(tmp, schema, compression="zstd") as writer:
+        for batch in pf.iter_batches(batch_size=CHUNK_ROWS, columns=old_names):
+            stop = start + batch.num_rows
+            arrays = list(batch.columns)
+            for f in extra_fields:
+                part = _coerce(new_columns[f.name].iloc[start:stop].to_frame())[f.name]
+                arrays.append(pa.Array.from_pandas(part, type=f.type))
+            names = old_names + [f.name for f in extra_fields]
+            table = pa.Table.from_arrays(arrays, names=names).select(schema.names)
+            writer.write_table(table.cast(schema), row_group_size=CHUNK_ROWS)
+            start = stop
+    tmp.replace(path)
+    return path
+
+
+def memory_usage(df: pd.DataFrame) -> pd.Series:
+    """每列占用的内存（MB，按实际字符串长度算），最后一项是 total"""
+    mb = df.memory_usage(index=False, deep=True) / 1024 ** 2
+    return pd.concat([mb, pd.Series({"total": mb.sum()})])
+
+
+def memory_report(df: pd.DataFrame, label: str = "") -> None:
+    mb = memory_usage(df)
+    cols = ", ".join(f"{c} {v:.1f}" for c, v in mb.drop("total").items())
+    print(f"[info] memory {label}: {len(df)} rows, {mb['total']:.1f} MB ({cols})")
+
+
+def export_csv(name: str) -> Path:
+    """把 Parquet 数据集导出成 utf-8-sig CSV（和以前的输出文件同名同格式）"""
+    return _write_csv(read_dataset(name), name)
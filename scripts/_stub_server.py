@@ -0,0 +1,131 @@
+# scripts/_stub_server.py
+"""
+本地 HTTP 替身，给抓取相关的 benchmark 用。
+
+每个 StubHost 是一个独立端口上的 ThreadingHTTPServer，对抓取器来说就是一个独立域名
+（netloc 里带端口），可以分别设置延迟和错误率，用来模拟“快站 / 慢站 / 会限流的站”。
+"""
+
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+ARTICLE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<meta property="article:published_time" content="2025-03-12T08:00:00+08:00"></head>
+<body><h1>{title}</h1><time datetime="2025-03-12">March 12, 2025</time>
+<div class="article-content">{body}</div></body></html>"""
+
+
+def make_article_html(path: str, n_paragraphs: int = 8) -> str:
+    """按路径生成一篇确定性的假文章"""
+    rnd = random.Random(path)
+    words = ["chip", "export", "control", "AI", "Nvidia", "Huawei", "芯片", "出口", "管制"]
+    paras = "".join(
+        "<p>" + " ".join(rnd.choice(words) for _ in range(60)) + "</p>"
+        for _ in range(n_paragraphs)
+    )
+    return ARTICLE_TEMPLATE.format(title=f"Stub article {path}", body=paras)
+
+
+class StubHost:
+    """
+    一个本地假站点。
+    - latency: 每个请求的固定延迟（秒）
+    - error_rate: 以该概率返回 error_status（默认 503）
+    - pages: path -> html；没有命中时用 make_article_html 现生成
+    - 响应带 ETag，请求带匹配的 If-None-Match 时返回 304
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        pages: Optional[Dict[str, str]] = None,
+        page_factory: Callable[[str], str] = make_article_html,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.pages = pages or {}
+        self.page_factory = page_factory
+        self.requests = 0
+        self.errors = 0
+        self.not_modified = 0
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                    fail = stub._rnd.random() < stub.error_rate
+                    if fail:
+                        stub.errors += 1
+                if stub.latency > 0:
+                    time.sleep(stub.latency)
+                if fail:
+                    self.send_response(stub.error_status)
+                    self.send_header("Retry-After", "0")
+                    self.end_headers()
+                    return
+                html = stub.pages.get(self.path)
+                if html is None:
+                    html = stub.page_factory(self.path)
+                body = html.encode("utf-8")
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    with stub._lock:
+                        stub.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "StubHost":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def start_hosts(hosts: List[StubHost]) -> List[StubHost]:
+    return [h.start() for h in hosts]
+
+
+def stop_hosts(hosts: List[StubHost]) -> None:
+    for h in hosts:
+        h.stop()
@@ -0,0 +1,234 @@
+# scripts/_synth.py
+"""
+合成语料（benchmark 用）：任意规模的 CN / US 新闻和微博行，列和 all_texts 一样
+
+- 长度分布取自真实数据：新闻正文 / 标题长度按国家从 data/raw/news_raw.csv 里有放回地抽，
+  再乘一个 0.8~1.25 的随机系数（不会只有几十种长度）；微博正文长度取自 weibo_output/ 里的导出，
+  都没有时用内置的兜底分布
+- 正文由若干“主题”的词拼成（每篇一个主题，大约三分之一的词来自主题词表），
+  TF-IDF + KMeans 能聚出结构；中文不加空格，英文空格分词
+- date 按各来源真实的写法混着生成（ISO / 中文 / 英文月份 / 微博相对时间…），
+  微博正文里混进 @用户、链接、#话题#、“展开全文”，清洗规则都能走到
+- 给定 seed 结果完全确定，同一参数在不同 commit 上跑的是同一份语料
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from _paths import PROJECT_ROOT, RAW_DIR
+
+OUT_COLUMNS = ["country", "source", "source_type", "date", "title", "content", "url", "user_name"]
+N_TOPICS = 6
+
+_CN_TOPICS = [
+    "芯片 光刻机 制程 晶圆 台积电 中芯国际 良率 产能 封装 先进",
+    "英伟达 算力 GPU 数据中心 训练 推理 大模型 显卡 H20 服务器",
+    "华为 昇腾 鲲鹏 国产 替代 自主 可控 生态 供应链 突破",
+    "出口 管制 禁令 制裁 商务部 实体 清单 许可证 限制 政策",
+    "市场 股价 营收 财报 投资 资本 估值 增长 季度 利润",
+    "人工智能 应用 创新 企业 研发 人才 产业 发展 合作 未来",
+]
+_EN_TOPICS = [
+    "chip foundry wafer node yield tsmc lithography fab packaging capacity",
+    "nvidia gpu compute datacenter training inference model accelerator cloud demand",
+    "huawei ascend domestic substitute self-sufficiency ecosystem supply chain breakthrough",
+    "export controls ban sanctions commerce entity list license restrictions policy",
+    "market shares revenue earnings investors valuation growth quarter profit guidance",
+    "artificial intelligence startups research talent industry partnership innovation future",
+]
+_CN_COMMON = (
+    "的 是 在 了 和 对 与 也 将 从 这 一 中国 美国 记者 表示 认为 目前 已经 进一步 方面"
+).split()
+_EN_COMMON = (
+    "the of and to in a is that for on with as by at from it this said has will "
+    "be are was more than its their new also which"
+).split()
+_CN_SENT = "好 强劲 利好 看好 担忧 打压 失望 困难 风险 机遇".split()
+_WEIBO_NOISE = [
+    "展开全文", "转发微博", "#芯片#", "#英伟达#", "@科技观察", "@财经快讯", "http://t.cn/A6xyz"
+]
+
+_CN_SOURCES = [
+    "www.guancha.cn", "www.thepaper.cn", "news.qq.com", "www.21jingji.com", "www.sohu.com"
+]
+_US_SOURCES = ["apnews.com", "www.csis.org", "itif.org", "www.theguardian.com", "www.reuters.com"]
+
+# 没有真实数据可抽时的兜底长度（字符数）
+_FALLBACK_LENGTHS = {
+    "CN": [1465, 2205, 4641, 900, 3000, 6000, 12000],
+    "US": [4088, 12049, 34726, 2500, 8000, 20000],
+    "weibo": [60, 90, 120, 140, 180, 260, 500, 1200],
+    "title_CN": [27, 32, 40, 20, 50],
+    "title_US": [58, 65, 81, 40, 100],
+}
+
+
+def length_profile() -> Dict[str, np.ndarray]:
+    """各类文本的真实长度样本：CN / US 正文、title_CN / title_US 标题、weibo 正文"""
+    profile = {k: np.array(v) for k, v in _FALLBACK_LENGTHS.items()}
+    news_path = RAW_DIR / "news_raw.csv"
+    if news_path.exists():
+        news = pd.read_csv(news_path, usecols=["country", "title", "content"], dtype=str)
+        for country, group in news.groupby("country"):
+            content = group["content"].dropna().str.len()
+            title = group["title"].dropna().str.len()
+            if len(content):
+                profile[country] = content.to_numpy()
+            if len(title):
+                profile[f"title_{country}"] = title.to_numpy()
+
+    # 微博导出的列名不统一，沿用 merge_weibo 的列名推断
+    from merge_weibo import infer_mapping, read_header
+
+    lengths = []
+    for path in sorted((PROJECT_ROOT / "weibo_output").glob("*.csv")):
+        columns, enc = read_header(str(path))
+        if columns is None:
+            continue
+        content_col = [c for c, t in infer_mapping(columns).items() if t == "content"]
+        if content_col:
+            s = pd.read_csv(path, usecols=content_col, dtype=str, encoding=enc)[content_col[0]]
+            lengths.extend(s.dropna().str.len().tolist())
+    if lengths:
+        profile["weibo"] = np.array(lengths)
+    return profile
+
+
+def _sample_lengths(rng, samples, n, max_chars):
+    base = rng.choice(samples, size=n)
+    jitter = rng.uniform(0.8, 1.25, size=n)
+    return np.clip((base * jitter).astype(int), 10, max_chars)
+
+
+def _texts(rng, lengths, topics, lang, noise=False):
+    """按目标字符数拼文本：CN 按词拼接不加空格、每 10~30 个词一个句号；EN 空格分词"""
+    topic_words = _CN_TOPICS if lang == "CN" else _EN_TOPICS
+    topic_words = [t.split() for t in topic_words]
+    common = _CN_COMMON + _CN_SENT if lang == "CN" else _EN_COMMON
+    avg = 2.3 if lang == "CN" else 6.5
+    out = []
+    for n_chars, topic in zip(lengths, topics):
+        n_words = max(3, int(n_chars / avg))
+        words = rng.choice(common, size=n_words).astype(object)
+        words[::3] = rng.choice(topic_words[topic], size=len(words[::3]))
+        if lang == "CN":
+            stops = np.cumsum(rng.integers(10, 30, size=n_words // 10 + 1))
+            words[stops[stops < n_words]] += "。"
+            text = "".join(words)[:n_chars]
+        else:
+            text = " ".join(words)
+        if noise:
+            extra = rng.choice(_WEIBO_NOISE, size=rng.integers(0, 3), replace=False)
+            text = " ".join([text, *extra])
+        out.append(text)
+    return out
+
+
+_DATE_FORMATS = {
+    "CN": [
+        "%Y-%m-%d %H:%M:%S 字号： A- A A+ 来源：观察者网",
+        "%Y年%m月%d日 %H:%M",
+        "%Y-%m-%dT%H:%M:%S+08:00",
+    ],
+    "US": ["%B %d, %Y", "%Y-%m-%dT%H:%M:%S.000Z", "%d %b %Y"],
+}
+
+
+def _random_times(rng, n):
+    return pd.Timestamp("2025-01-01") + pd.to_timedelta(
+        rng.integers(0, 330 * 24 * 60, n), unit="min"
+    )
+
+
+def _news_dates(rng, n, country):
+    fmts = _DATE_FORMATS[country]
+    return [d.strftime(fmts[k]) for d, k in zip(_random_times(rng, n), rng.integers(0, 3, n))]
+
+
+def _weibo_dates(rng, n):
+    days = _random_times(rng, n)
+    kind = rng.integers(0, 10, n)
+    out = []
+    for d, k, m in zip(days, kind, rng.integers(1, 59, n)):
+        if k == 0:
+            out.append(f"{m}分钟前")
+        elif k == 1:
+            out.append(d.strftime("今天 %H:%M"))
+        elif k < 5:
+            out.append(d.strftime("%m-%d %H:%M"))
+        else:
+            out.append(d.strftime("%Y-%m-%d %H:%M"))
+    return out
+
+
+def synthetic_corpus(
+    cn_news: int,
+    us_news: int,
+    weibo: int,
+    seed: int = 0,
+    max_chars: int = 20_000,
+    profile: Optional[Dict[str, np.ndarray]] = None,
+) -> pd.DataFrame:
+    """
+    返回 cn_news + us_news + weibo 行的 DataFrame（列同 all_texts，外加 topic：生成时用的主题编号）。
+    max_chars 截断超长正文（news_raw 里有几十万字符的 US 页面）。
+    """
+    rng = np.random.default_rng(seed)
+    profile = profile if profile is not None else length_profile()
+    frames = []
+    for country, n, sources in (("CN", cn_news, _CN_SOURCES), ("US", us_news, _US_SOURCES)):
+        if n <= 0:
+            continue
+        topics = rng.integers(0, N_TOPICS, n)
+        source = rng.choice(sources, size=n)
+        title_len = _sample_lengths(rng, profile[f"title_{country}"], n, 200)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "country": country,
+                    "source": source,
+                    "source_type": "news",
+                    "date": _news_dates(rng, n, country),
+                    "title": _texts(rng, title_len, topics, country),
+                    "content": _texts(
+                        rng,
+                        _sample_lengths(rng, profile[country], n, max_chars),
+                        topics,
+                        country,
+                    ),
+                    "url": [
+                        f"https://{s}/article/{country.lower()}-{i}" for i, s in enumerate(source)
+                    ],
+                    "user_name": "",
+                    "topic": topics,
+                }
+            )
+        )
+    if weibo > 0:
+        topics = rng.integers(0, N_TOPICS, weibo)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "country": "CN",
+                    "source": "weibo",
+                    "source_type": "social",
+                    "date": _weibo_dates(rng, weibo),
+                    "title": "",
+                    "content": _texts(
+                        rng,
+                        _sample_lengths(rng, profile["weibo"], weibo, max_chars),
+                        topics,
+                        "CN",
+                        noise=True,
+                    ),
+                    "url": "",
+                    "user_name": [f"用户{u}" for u in rng.integers(0, max(weibo // 5, 1), weibo)],
+                    "topic": topics,
+                }
+            )
+        )
+    if not frames:
+        return pd.DataFrame(columns=OUT_COLUMNS + ["topic"])
+    return pd.concat(frames, ignore_index=True)
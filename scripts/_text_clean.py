@@ -0,0 +1,104 @@
+# scripts/_text_clean.py
+"""
+文本清洗引擎：把所有清洗规则融合成一个预编译正则，对整列一次替换完
+
+原来的 basic_clean 每行跑 4 次 re.sub（URL → @/# → HTML 实体 → 合并空白）。这里的做法：
+- 每条规则是一个正则片段，所有片段拼成一个交替式 (?:规则1|规则2|...)
+- 连着的“垃圾片段 + 空白”整体替换成一个空格，单纯的空白串也替换成一个空格，
+  所以合并空白不需要额外一遍
+- 加规则只是往字典里多加一个片段，不会多一遍扫描
+- 整列处理时走 pyarrow 字符串列的 RE2 正则替换（C++ 里循环，不经过 Python），
+  没有 pyarrow 时退回 Python re 逐行替换
+- 单条文本（clean）不用融合正则：Python re 碰到开头的 \s* 就用不上首字符的快速查找，
+  逐行调用反而比原来慢一倍。单条文本还是每条规则各 sub 一遍、最后合并空白
+  （默认规则下就是原来的 basic_clean），每个正则都能先按首字符跳着找
+
+规则用 Python re 的写法（\\s / \\S）。RE2 的 \\s 只认 ASCII 空白，所以交给 RE2 前
+把 \\s / \\S 换成与 Python \\s 完全一致的显式字符类（含全角空格 \\u3000、\\xa0），
+保证两个引擎的结果一样。
+"""
+
+import re
+from typing import Dict, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+
+    _STRING_DTYPE = "string[pyarrow]"
+except ImportError:  # pragma: no cover - 取决于环境
+    _STRING_DTYPE = None
+
+# Python re 里 \s 匹配的全部字符
+_WS_CHARS = (
+    "\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0"
+    "\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000"
+)
+_WS_CLASS = f"[{_WS_CHARS}]"
+_NON_WS_CLASS = f"[^{_WS_CHARS}]"
+_WS_RE = re.compile(r"\s+")
+
+# 基础规则：和原 basic_clean 一样
+CLEAN_RULES: Dict[str, str] = {
+    # URL
+    "url": r"http[s]?://\S+",
+    # @xxx 和 #话题#
+    "mention_topic": r"[@#]\S+",
+    # 英文 html 实体 &nbsp; 等
+    "html_entity": "&[a-z]+;",
+}
+
+# 微博导出里常见的样板文字，可以按需叠加到基础规则上
+WEIBO_RULES: Dict[str, str] = {
+    "weibo_expand": "展开全文c?",
+    "source_tag": r"来源[:：]\S*",
+    "zero_width": "[\u200b\u200c\u200d\u2060\ufeff]",
+}
+
+
+def build_pattern(rules: Dict[str, str]) -> str:
+    """把规则片段融合成一个正则：连续的垃圾片段（带两边空白）或纯空白串 → 一个空格"""
+    junk = "|".join(f"(?:{p})" for p in rules.values())
+    return rf"(?:\s*(?:{junk}))+\s*|\s+"
+
+
+def to_re2(pattern: str) -> str:
+    """\\s / \\S → 显式字符类，让 RE2 的空白语义和 Python re 一致"""
+    return pattern.replace(r"\S", _NON_WS_CLASS).replace(r"\s", _WS_CLASS)
+
+
+class TextCleaner:
+    """
+    用法:
+        cleaner = TextCleaner()                          # 基础规则
+        cleaner = TextCleaner({**CLEAN_RULES, **WEIBO_RULES})
+        cleaner.clean("某条文本")
+        cleaner.clean_series(df["content"])
+    """
+
+    def __init__(self, rules: Optional[Dict[str, str]] = None):
+        self.rules = dict(CLEAN_RULES if rules is None else rules)
+        self.pattern = build_pattern(self.rules)
+        self.re2_pattern = to_re2(self.pattern)
+        self.rule_regexes = [re.compile(p) for p in self.rules.values()]
+
+    def clean(self, text) -> str:
+        """单条文本：规则逐条替换再合并空白（一条垃圾片段的开头恰好被前一条规则删掉时，
+        结果可能和 clean_series 差一点，比如 "#http://x" 这里剩 "#"，和原 basic_clean 一样）"""
+        if not isinstance(text, str):
+            text = str(text)
+        for regex in self.rule_regexes:
+            text = regex.sub(" ", text)
+        return _WS_RE.sub(" ", text).strip()
+
+    def clean_series(self, s: pd.Series) -> pd.Series:
+        """整列清洗，返回同索引的字符串列；缺失值当作空串"""
+        s = s.fillna("")
+        if _STRING_DTYPE is not None:
+            out = s.astype(_STRING_DTYPE).str.replace(self.re2_pattern, " ", regex=True)
+            return out.str.strip(" ")
+        return s.astype(str).map(self.clean)
+
+
+DEFAULT_CLEANER = TextCleaner()
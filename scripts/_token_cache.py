@@ -0,0 +1,185 @@
+# scripts/_token_cache.py
+"""
+分词结果的持久化缓存（默认 data/processed/token_cache.sqlite）
+
+每天新增的文本只有几百条，没必要每次把整个 all_texts 重新跑一遍 jieba。
+这里把 (原文哈希, 语言, 分词器版本) → (clean_content, tokens) 存进 sqlite：
+
+- 原文哈希：blake2b-128(content)
+- 分词器版本：jieba 版本 + 词典文件哈希 / nltk 版本，再加上清洗正则的哈希；
+  换了词典、升级了库或改了清洗规则，旧条目自然不再命中
+- 记录命中 / 未命中次数
+- 总大小超过上限时按最近访问时间（LRU）淘汰，旧版本的条目也会这样慢慢被挤掉
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from _paths import PROCESSED_DIR
+
+DEFAULT_CACHE_PATH = PROCESSED_DIR / "token_cache.sqlite"
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+# sqlite 单条语句的参数个数有限，批量查询按这个大小切
+_BATCH = 500
+
+
+def text_digest(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _short_hash(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()[:12]
+
+
+def tokenizer_version(lang: str, clean_pattern: str = "") -> str:
+    """
+    分词器 + 词典 + 清洗规则的版本串。
+    CN：jieba 版本 + 当前词典文件内容的哈希；其余：nltk 版本
+    """
+    if lang == "CN":
+        import jieba
+
+        with jieba.dt.get_dict_file() as f:
+            dict_hash = _short_hash(f.read())
+        version = f"jieba-{jieba.__version__}-{dict_hash}"
+    else:
+        import nltk
+
+        version = f"nltk-{nltk.__version__}"
+    return f"{version}|clean-{_short_hash(clean_pattern.encode('utf-8'))}"
+
+
+class TokenCache:
+    """
+    用法:
+        cache = TokenCache()
+        hits = cache.get_many("CN", version, digests)      # {digest: (clean, tokens)}
+        cache.put_many("CN", version, [(digest, clean, tokens), ...])
+        print(cache.stats())
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS tokens (
+                digest BLOB NOT NULL,
+                lang TEXT NOT NULL,
+                version TEXT NOT NULL,
+                clean TEXT NOT NULL,
+                tokens TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (digest, lang, version)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_tokens_accessed ON tokens(accessed_at);
+            """
+        )
+        self._db.commit()
+
+    def get_many(
+        self, lang: str, version: str, digests: Iterable[bytes]
+    ) -> Dict[bytes, Tuple[str, str]]:
+        """批量查询，返回命中的 {digest: (clean, tokens)}，同时续期访问时间"""
+        digests = list(dict.fromkeys(digests))
+        found: Dict[bytes, Tuple[str, str]] = {}
+        now = time.time()
+        with self._lock:
+            for start in range(0, len(digests), _BATCH):
+                batch = digests[start:start + _BATCH]
+                marks = ",".join("?" * len(batch))
+                rows = self._db.execute(
+                    f"SELECT digest, clean, tokens FROM tokens "
+                    f"WHERE lang = ? AND version = ? AND digest IN ({marks})",
+                    (lang, version, *batch),
+                ).fetchall()
+                for digest, clean, tokens in rows:
+                    found[digest] = (clean, tokens)
+            self._db.executemany(
+                "UPDATE tokens SET accessed_at = ? WHERE digest = ? AND lang = ? AND version = ?",
+                [(now, d, lang, version) for d in found],
+            )
+            self._db.commit()
+            self.hits += len(found)
+            self.misses += len(digests) - len(found)
+        return found
+
+    def put_many(self, lang: str, version: str, items: Iterable[Tuple[bytes, str, str]]) -> None:
+        """items = [(digest, clean, tokens), ...]；写完检查一次总大小"""
+        now = time.time()
+        rows = [
+            (d, lang, version, c, t, len(c.encode("utf-8")) + len(t.encode("utf-8")), now)
+            for d, c, t in items
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO tokens"
+                "(digest, lang, version, clean, tokens, size, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._evict()
+            self._db.commit()
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM tokens").fetchone()[0]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM tokens").fetchone()[0]
+
+    def stats(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return (
+            f"hits={self.hits} misses={self.misses} ({rate:.1%} hit), "
+            f"entries={len(self)}, {self.total_bytes() / 1024 ** 2:.1f} MB, "
+            f"evicted={self.evicted}"
+        )
+
+    def _evict(self) -> None:
+        # 调用方已持有锁
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM tokens").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute(
+            "SELECT digest, lang, version, size FROM tokens ORDER BY accessed_at ASC"
+        )
+        victims: List[tuple] = []
+        for digest, lang, version, size in rows:
+            if total <= self.max_bytes:
+                break
+            victims.append((digest, lang, version))
+            total -= size
+        self._db.executemany(
+            "DELETE FROM tokens WHERE digest = ? AND lang = ? AND version = ?", victims
+        )
+        self.evicted += len(victims)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM tokens")
+            self._db.commit()
+            self._db.execute("VACUUM")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
@@ -1,51 +1,102 @@
 # scripts/analysis_traditional_nlp.py
-import pandas as pd
-from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
-from sklearn.feature_extraction.text import TfidfVectorizer
+import argparse
+
 import matplotlib.pyplot as plt
+import numpy as np
 
-from _paths import PROCESSED_DIR, FIG_DIR
+from _clustering import (
+    LARGE_CORPUS_ROWS,
+    cluster_top_terms,
+    fit_clusters,
+    pick_mode,
+    project_2d,
+    sweep_k,
+)
+from _features import load_features
+from _paths import FIG_DIR, PROCESSED_DIR
+from _store import memory_report, read_dataset, write_with_columns
 
+# 聚成 4 类，你可以按需要改 k（或者 --k 6，或者 --sweep 2 12 自动选）
+N_CLUSTERS = 4
 
-def main():
-    in_path = PROCESSED_DIR / "all_texts_clean.csv"
-    df = pd.read_csv(in_path)
+# TF-IDF 参数（特征存在 data/processed/features/clusters/，语料不变就直接读盘）
+TFIDF_PARAMS = {"max_features": 5000}
 
-    texts = df["tokens"].fillna("").tolist()
+# 大语料模式画图时最多画多少个点
+PLOT_MAX_POINTS = 50_000
 
-    # TF-IDF 向量
-    vectorizer = TfidfVectorizer(max_features=5000)
-    X = vectorizer.fit_transform(texts)
 
-    # 聚成 4 类，你可以按需要改 k
-    k = 4
-    kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-    df["cluster"] = kmeans.fit_predict(X)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TF-IDF + KMeans clustering")
+    parser.add_argument("--k", type=int, default=N_CLUSTERS, help="聚类数")
+    parser.add_argument(
+        "--mode",
+        choices=["auto", "small", "large"],
+        default="auto",
+        help=f"auto: 超过 {LARGE_CORPUS_ROWS} 行自动走稀疏 / MiniBatch 的大语料模式",
+    )
+    parser.add_argument(
+        "--sweep",
+        type=int,
+        nargs=2,
+        metavar=("KMIN", "KMAX"),
+        help="在 [KMIN, KMAX] 里并行扫描 k，按 silhouette 选最好的（忽略 --k）",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="--sweep 的并行进程数")
+    parser.add_argument("--refit-features", action="store_true", help="忽略特征缓存，重新 fit TF-IDF")
+    parser.add_argument(
+        "--hashing",
+        action="store_true",
+        help="用 HashingVectorizer（没有词表，新文本不用重新 fit；不打印簇的高频词）",
+    )
+    args = parser.parse_args(argv)
+
+    # 只读 tokens；写结果时再逐块把其余列从 all_texts_clean 接过来
+    df = read_dataset("all_texts_clean", columns=["tokens"])
+    memory_report(df, "all_texts_clean[tokens]")
 
-    terms = vectorizer.get_feature_names_out()
+    texts = df["tokens"].fillna("").tolist()
+
+    # TF-IDF 向量
+    features = load_features(
+        "clusters", texts, TFIDF_PARAMS, hashing=args.hashing, refit=args.refit_features
+    )
+    X = features.X
 
-    def print_cluster_top_terms(cluster_id, topn=20):
-        centroid = kmeans.cluster_centers_[cluster_id]
-        top_idx = centroid.argsort()[::-1][:topn]
-        top_terms = [terms[i] for i in top_idx]
-        print(f"\nCluster {cluster_id} top terms:")
-        print(", ".join(top_terms))
+    # hashing 有 2^18 列，toarray + PCA 吃不消，auto 时直接走稀疏的大语料模式
+    mode = "large" if args.hashing and args.mode == "auto" else pick_mode(X.shape[0], args.mode)
+    print(f"[info] {X.shape[0]} docs x {X.shape[1]} terms, {mode} mode")
+    if args.sweep:
+        kmin, kmax = args.sweep
+        table, k, kmeans, labels = sweep_k(
+            X, range(kmin, kmax + 1), mode=mode, workers=args.workers
+        )
+        print(table.to_string(index=False))
+        table.to_csv(PROCESSED_DIR / "k_sweep_clusters.csv", index=False, encoding="utf-8-sig")
+        print(f"[info] best k = {k}")
+    else:
+        k = args.k
+        kmeans, labels = fit_clusters(X, k, mode)
 
-    for c in range(k):
-        print_cluster_top_terms(c)
+    if features.hashing:
+        print("[info] hashing features have no vocabulary, top terms skipped")
+    else:
+        for c, top_terms in enumerate(cluster_top_terms(kmeans, features.terms)):
+            print(f"\nCluster {c} top terms:")
+            print(", ".join(top_terms))
 
-    out_csv = PROCESSED_DIR / "all_with_clusters.csv"
-    df.to_csv(out_csv, index=False, encoding="utf-8-sig")
-    print("Saved clustered data to", out_csv)
+    out_path = write_with_columns("all_texts_clean", "all_with_clusters", {"cluster": labels})
+    print("Saved clustered data to", out_path)
 
-    # 降维画图（小数据可以 toarray，大规模就不要这么干）
-    X_dense = X.toarray()
-    pca = PCA(n_components=2, random_state=42)
-    X_2d = pca.fit_transform(X_dense)
+    # 降维画图
+    X_2d = project_2d(X, mode)
+    colors = labels
+    if len(X_2d) > PLOT_MAX_POINTS:
+        keep = np.random.default_rng(42).choice(len(X_2d), PLOT_MAX_POINTS, replace=False)
+        X_2d, colors = X_2d[keep], colors[keep]
 
     plt.figure(figsize=(8, 6))
-    scatter = plt.scatter(X_2d[:, 0], X_2d[:, 1], c=df["cluster"], s=8)
+    scatter = plt.scatter(X_2d[:, 0], X_2d[:, 1], c=colors, s=8)
     plt.legend(*scatter.legend_elements(), title="Cluster")
     plt.xlabel("PC1")
     plt.ylabel("PC2")
@@ -0,0 +1,81 @@
+# scripts/bench_backends.py
+"""
+情感推理后端对比：torch(fp32) / int8 / onnx / onnx-int8
+
+每个后端在单独的子进程里跑（峰值内存互不干扰），报告：
+- 加载耗时（第一次会包含量化 / ONNX 导出，之后走 data/model_artifacts 缓存）
+- 吞吐量 texts/s、子进程峰值 RSS、产物大小
+- 与 fp32 torch 的标签一致率（parity check）
+
+用法:
+    python scripts/bench_backends.py --model /path/to/local/model --rows 500
+    python scripts/bench_backends.py --backends torch onnx --threads 4
+"""
+
+import argparse
+import multiprocessing as mp
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import torch
+
+from _sentiment_backends import BACKENDS, artifact_bytes, load_backend
+from bench_sentiment import load_texts
+from sentiment_bert import EN_MODEL_NAME, MAX_TOKENS, peak_rss_mb, predict_sentiment
+
+
+def run_backend(model, backend, texts, batch_size, max_tokens, threads):
+    if threads:
+        torch.set_num_threads(threads)
+    t0 = time.perf_counter()
+    tokenizer, runner = load_backend(model, backend)
+    t_load = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    res = predict_sentiment(texts, tokenizer, runner, batch_size=batch_size, max_tokens=max_tokens)
+    t_run = time.perf_counter() - t0
+    return res, t_load, t_run, peak_rss_mb()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=EN_MODEL_NAME, help="模型名或本地目录")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--max-chars", type=int, default=400, help="每条最多保留多少字符，0 = 不截")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--max-tokens", type=int, default=MAX_TOKENS)
+    parser.add_argument("--threads", type=int, default=None, help="每个后端用多少线程")
+    args = parser.parse_args()
+
+    texts = load_texts(args.rows, args.max_chars)
+    n_valid = sum(bool(t.strip()) for t in texts)
+    print(f"{len(texts)} texts ({n_valid} non-empty), model={args.model}")
+
+    results = {}
+    ctx = mp.get_context("spawn")
+    for backend in args.backends:
+        with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+            results[backend] = pool.submit(
+                run_backend,
+                args.model,
+                backend,
+                texts,
+                args.batch_size,
+                args.max_tokens,
+                args.threads,
+            ).result()
+
+    reference = results.get("torch", next(iter(results.values())))[0]
+    print(f"{'backend':10s} {'load s':>7s} {'texts/s':>8s} {'peak MB':>8s} {'disk MB':>8s} agree")
+    for backend, (res, t_load, t_run, rss) in results.items():
+        agree = sum(a[0] == b[0] for a, b in zip(reference, res) if a[0] is not None)
+        disk = artifact_bytes(args.model, backend) / 1024 ** 2
+        rss = f"{'n/a':>8s}" if rss is None else f"{rss:8.0f}"
+        print(
+            f"{backend:10s} {t_load:7.2f} {n_valid / t_run:8.1f} {rss} {disk:8.1f} "
+            f"{agree}/{n_valid} ({agree / max(n_valid, 1):.1%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# scripts/bench_cluster.py
+"""
+聚类在大语料上的耗时和内存：small 模式（KMeans + toarray/PCA） vs large 模式（MiniBatchKMeans + TruncatedSVD）
+
+合成语料：20000 个伪词，按 Zipf 分布抽词，每篇混入 1 个“主题”的高频词，篇长 20~100 个词。
+每个 (文档数, 模式) 在单独的子进程里跑，报告向量化 / 聚类 / 降维三段耗时和子进程峰值 RSS。
+small 模式要把 X 转成稠密矩阵（PCA 还要再中心化拷一份、做 SVD），按稠密矩阵的 3 倍估算，
+超过 --dense-limit-gb 就跳过，只打印预计需要的内存。
+
+用法:
+    python scripts/bench_cluster.py --docs 10000 100000 1000000
+"""
+
+import argparse
+import multiprocessing as mp
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from _clustering import fit_clusters, project_2d
+from analysis_traditional_nlp import N_CLUSTERS
+
+VOCAB = 20000
+N_TOPICS = 8
+MAX_FEATURES = 5000
+
+
+def synthetic_corpus(n_docs, seed=0):
+    rng = np.random.default_rng(seed)
+    words = np.array([f"w{i}" for i in range(VOCAB)])
+    topic_words = rng.choice(VOCAB, size=(N_TOPICS, 50), replace=False)
+    lengths = rng.integers(20, 100, size=n_docs)
+    topics = rng.integers(0, N_TOPICS, size=n_docs)
+    background = (rng.zipf(1.3, size=int(lengths.sum())) - 1) % VOCAB
+    docs, pos = [], 0
+    for n, t in zip(lengths, topics):
+        idx = background[pos:pos + n]
+        pos += n
+        # 大约三分之一的词换成这篇所属主题的词
+        idx[::3] = rng.choice(topic_words[t], size=len(idx[::3]))
+        docs.append(" ".join(words[idx]))
+    return docs
+
+
+def peak_rss_mb():
+    """同 sentiment_bert.peak_rss_mb；这里不 import sentiment_bert，免得子进程把 torch 也算进峰值"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 ** 2 if sys.platform == "darwin" else rss / 1024
+
+
+def run(n_docs, mode, k):
+    timings = {}
+    t0 = time.perf_counter()
+    docs = synthetic_corpus(n_docs)
+    timings["generate"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    X = TfidfVectorizer(max_features=MAX_FEATURES).fit_transform(docs)
+    timings["tfidf"] = time.perf_counter() - t0
+    del docs
+
+    t0 = time.perf_counter()
+    fit_clusters(X, k, mode)
+    timings["cluster"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    project_2d(X, mode)
+    timings["project"] = time.perf_counter() - t0
+    return timings, peak_rss_mb()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--modes", nargs="+", choices=["small", "large"], default=["small", "large"])
+    parser.add_argument("--k", type=int, default=N_CLUSTERS)
+    parser.add_argument("--dense-limit-gb", type=float, default=4.0)
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    print(f"{'docs':>9s} {'mode':6s} {'tfidf s':>8s} {'cluster s':>9s} {'project s':>9s} {'peak MB':>8s}")
+    for n in args.docs:
+        for mode in args.modes:
+            dense_gb = 3 * n * MAX_FEATURES * 8 / 1024 ** 3
+            if mode == "small" and dense_gb > args.dense_limit_gb:
+                print(f"{n:9d} {mode:6s} skipped: toarray + PCA needs ~{dense_gb:.0f} GB")
+                continue
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                timings, rss = pool.submit(run, n, mode, args.k).result()
+            rss = f"{'n/a':>8s}" if rss is None else f"{rss:8.0f}"
+            print(
+                f"{n:9d} {mode:6s} {timings['tfidf']:8.1f} {timings['cluster']:9.1f} "
+                f"{timings['project']:9.1f} {rss}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# scripts/bench_dedup.py
+"""
+近重复去重（_dedup.near_duplicates）的耗时和准确率
+
+合成语料：一半中文、一半英文的随机“原文”，其中 dup_rate 比例的行是某篇原文的转载：
+随机改掉零到几个字符（大约每 100 个字符至多 1 个）、前面加上“转发微博”之类的短前缀。
+报告每个规模的签名 / 分桶耗时、每千行耗时（看是否线性），
+以及按“是否属于同一篇原文”算的 pairwise precision / recall。
+
+用法:
+    python scripts/bench_dedup.py --rows 10000 100000
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from _dedup import DEDUP_THRESHOLD, NUM_PERM, SHINGLE_SIZE, MinHasher, cluster_signatures
+
+CN_CHARS = "中国美芯片产业制裁华为英伟达发布处理器市场政府出口管制国产替代人工智能算力数据中心投资"
+EN_WORDS = (
+    "chip export nvidia huawei market china us ai data center demand supply "
+    "policy revenue semiconductor tariff growth investors quarter record model"
+).split()
+PREFIXES = ["", "", "转发微博 ", "//@网友: ", "Reuters - ", "(AP) "]
+
+
+def _original(rng, i):
+    if i % 2 == 0:
+        return "".join(rng.choice(list(CN_CHARS), size=rng.integers(60, 200)))
+    return " ".join(rng.choice(EN_WORDS, size=rng.integers(30, 90))) + f" #{i}"
+
+
+def _repost(rng, text):
+    chars = list(text)
+    for _ in range(rng.integers(0, max(1, len(chars) // 100) + 1)):
+        chars[rng.integers(len(chars))] = rng.choice(list("的了,。 x"))
+    return rng.choice(PREFIXES) + "".join(chars)
+
+
+def synthetic_corpus(n_rows, dup_rate=0.3, seed=0):
+    """返回 (texts, source)：source[i] 是第 i 行对应的原文编号"""
+    rng = np.random.default_rng(seed)
+    n_orig = max(1, int(n_rows * (1 - dup_rate)))
+    originals = [_original(rng, i) for i in range(n_orig)]
+    texts, source = list(originals), list(range(n_orig))
+    for _ in range(n_rows - n_orig):
+        j = int(rng.integers(n_orig))
+        texts.append(_repost(rng, originals[j]))
+        source.append(j)
+    order = rng.permutation(n_rows)
+    return [texts[i] for i in order], np.asarray(source)[order]
+
+
+def _same_pairs(labels):
+    """属于同一组的行对数量"""
+    _, counts = np.unique(labels, return_counts=True)
+    return int((counts * (counts - 1) // 2).sum())
+
+
+def pair_scores(pred, truth):
+    """pairwise precision / recall：把“同一簇”当成对行的预测"""
+    both = _same_pairs(pred.astype(np.int64) * (truth.max() + 1) + truth)
+    pred_pairs, true_pairs = _same_pairs(pred), _same_pairs(truth)
+    precision = both / pred_pairs if pred_pairs else 1.0
+    recall = both / true_pairs if true_pairs else 1.0
+    return precision, recall
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[2_000, 10_000, 50_000])
+    parser.add_argument("--threshold", type=float, default=DEDUP_THRESHOLD)
+    parser.add_argument("--num-perm", type=int, default=NUM_PERM)
+    parser.add_argument("--shingle", type=int, default=SHINGLE_SIZE)
+    parser.add_argument("--dup-rate", type=float, default=0.3)
+    args = parser.parse_args()
+
+    hasher = MinHasher(args.num_perm, args.shingle)
+    print(
+        f"{'rows':>8s} {'sign s':>7s} {'lsh s':>6s} {'ms/1k':>6s} "
+        f"{'kept':>8s} {'precision':>9s} {'recall':>6s}"
+    )
+    for n in args.rows:
+        texts, truth = synthetic_corpus(n, args.dup_rate)
+        t0 = time.perf_counter()
+        sigs = hasher.signatures(texts)
+        t1 = time.perf_counter()
+        cluster = cluster_signatures(sigs, args.threshold)
+        t2 = time.perf_counter()
+        precision, recall = pair_scores(cluster, truth)
+        print(
+            f"{n:8d} {t1 - t0:7.1f} {t2 - t1:6.1f} {(t2 - t0) / n * 1e6:6.0f} "
+            f"{cluster.max() + 1:8d} {precision:9.3f} {recall:6.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# scripts/bench_extract.py
+"""
+正文抽取速度对比：旧 BeautifulSoup 解析链（_legacy_extract） vs _extract（lxml + 预编译 XPath）
+
+页面来源：
+- data/raw/http_cache 里缓存的真实页面（跑过 crawl_news.py 就有）
+- 再加上按现有几个站点版式生成的合成页面（人民网 / 环球时报 / Reuters / 通用站点，
+  其中通用站点只在正文里写日期，专门走兜底日期的最慢路径）
+
+输出每种实现的 pages/s，以及两者 title/date/content 不一致的页数。
+
+用法:
+    python scripts/bench_extract.py --synthetic 200 --repeat 3
+"""
+
+import argparse
+import random
+import time
+
+from _extract import extract_article
+from _http_cache import DEFAULT_CACHE_DIR, ResponseCache
+from _legacy_extract import parse_article as legacy_parse_article
+
+_NAV = "".join(f'<li><a href="/c{i}">频道 {i}</a></li>' for i in range(60))
+_WORDS = ["芯片", "出口", "管制", "英伟达", "华为", "chip", "export", "Nvidia", "AI", "policy"]
+
+_LAYOUTS = {
+    "http://world.people.com.cn/n1/2025/{i}.html": (
+        '<h1>{title}</h1><div class="col-1-1"><span class="date">2025年03月{d:02d}日08:00</span></div>'
+        '<div id="rwb_zw">{body}</div>'
+    ),
+    "https://www.globaltimes.cn/page/2025/{i}.shtml": (
+        '<h1>{title}</h1><span class="pub_time">2025-03-{d:02d} 09:10</span>'
+        '<div class="article-content">{body}</div>'
+    ),
+    "https://www.reuters.com/technology/article-{i}": (
+        '<h1>{title}</h1><time datetime="2025-03-{d:02d}T08:00:00Z">March {d}, 2025</time>'
+        '<div data-testid="article-body">{body}</div>'
+    ),
+    "https://www.example-news.com/story/{i}": (
+        '<div class="headline"><h1>{title}</h1></div><div class="byline">By staff</div>'
+        '<div class="story">{body}<p>Published 2025-03-{d:02d} 10:00</p></div>'
+    ),
+}
+
+
+def synthetic_pages(n: int, seed: int = 0):
+    rnd = random.Random(seed)
+    templates = list(_LAYOUTS.items())
+    pages = []
+    for i in range(n):
+        url_tpl, body_tpl = templates[i % len(templates)]
+        # 段落数大致对齐 news_raw.csv 里正文长度的中位数（几千字）
+        paras = "".join(
+            "<p>" + " ".join(rnd.choice(_WORDS) for _ in range(rnd.randint(20, 80))) + "</p>"
+            for _ in range(rnd.randint(5, 30))
+        )
+        body = body_tpl.format(title=f"Article {i}", d=1 + i % 28, body=paras)
+        html = (
+            f"<html><head><title>Article {i}</title>"
+            "<script>var x = 1;</script></head>"
+            f"<body><ul class='nav'>{_NAV}</ul>{body}<div class='footer'>© 2025</div></body></html>"
+        )
+        pages.append((url_tpl.format(i=i), html))
+    return pages
+
+
+def cached_pages(limit: int):
+    if not (DEFAULT_CACHE_DIR / "index.sqlite").exists():
+        return []
+    cache = ResponseCache()
+    pages = []
+    for url in cache.urls()[:limit]:
+        entry = cache.get(url)
+        if entry is not None:
+            pages.append((url, entry.body))
+    cache.close()
+    return pages
+
+
+def bench(fn, pages, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for url, html in pages:
+            fn(url, html)
+        best = min(best, time.perf_counter() - t0)
+    return len(pages) / best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--synthetic", type=int, default=200, help="合成页面数")
+    parser.add_argument("--cached", type=int, default=1000, help="最多取多少个缓存页面")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = cached_pages(args.cached) + synthetic_pages(args.synthetic)
+    print(f"{len(pages)} pages")
+
+    mismatch = 0
+    for url, html in pages:
+        old, new = legacy_parse_article(url, html), extract_article(url, html)
+        if any(old[k] != new[k] for k in ("title", "date", "content", "source")):
+            mismatch += 1
+    print(f"field mismatches: {mismatch}/{len(pages)}")
+
+    old_pps = bench(legacy_parse_article, pages, args.repeat)
+    new_pps = bench(extract_article, pages, args.repeat)
+    print(f"bs4 chain  : {old_pps:8.1f} pages/s")
+    print(f"lxml engine: {new_pps:8.1f} pages/s")
+    print(f"speedup    : {new_pps / old_pps:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+# scripts/bench_pipeline.py
+"""
+端到端 benchmark：合成语料上按流水线顺序跑一遍各阶段，每段的耗时 / 吞吐 / 峰值内存存成 JSON
+
+阶段（都在当前进程里按顺序跑，上一段的输出就是下一段的输入）：
+- crawl         : 本地假站点（_stub_server，可调延迟 / 错误率）上放好页面，
+                  crawl_news.crawl_from_url_file 并发抓取 + 解析 + 写 CSV
+- parse         : _extract.extract_article 解析同一批页面（不走网络）
+- dates         : _dates.normalize_dates
+- clean         : preprocess_texts.basic_clean 逐行调用（单条文本的清洗路径）
+- clean_column  : 同样的规则整列一次做完（_text_clean.DEFAULT_CLEANER.clean_series），
+                  和 clean 一起跑，--skip clean 两个都跳过
+- clean_tokenize: preprocess_texts.clean_and_tokenize（不用分词缓存，冷启动）
+- sentiment     : 现场搭一个很小的随机初始化 BERT（几十万参数，不联网），
+                  sentiment_bert.predict_sentiment 跑分桶 batch；量的是分词 / 组 batch / 推理框架的开销，
+                  不代表真实模型的绝对速度
+- cluster       : TF-IDF + KMeans（参数同 analysis_traditional_nlp），附带和生成主题的 ARI
+- stats         : _cube.Cube 建立方体 + stats.py 全部预设报表
+
+页面取 data/raw/http_cache 里缓存的真实页面（有的话）加上 bench_extract 的合成页面；
+语料由 _synth.synthetic_corpus 生成，长度分布取自 news_raw.csv，同样的参数每次都是同一份。
+结果 JSON 默认存到 data/bench/<时间>-<commit>.json（含 commit、参数、机器信息），
+--compare 给一个旧的 JSON，逐段打印新旧耗时比，慢了超过 --tolerance 的标出来。
+
+用法:
+    python scripts/bench_pipeline.py
+    python scripts/bench_pipeline.py --cn-news 20000 --us-news 5000 --weibo 100000 --skip crawl
+    python scripts/bench_pipeline.py --compare data/bench/20261001-120000-af40c97.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from _paths import DATA_DIR, PROJECT_ROOT
+from _synth import synthetic_corpus
+from sentiment_bert import peak_rss_mb
+
+BENCH_DIR = DATA_DIR / "bench"
+STAGES = (
+    "crawl", "parse", "dates", "clean", "clean_tokenize", "sentiment", "cluster", "stats"
+)
+# 慢了多少算退步（相对旧结果的耗时比例）
+TOLERANCE = 0.2
+
+
+class Recorder:
+    """每段一条记录：rows / seconds / rows_per_s / 到这一段为止的进程峰值 RSS，外加各段自己的指标"""
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name, rows):
+        """with rec.stage(name, rows) as entry: ...；各段自己的指标在块内外都可以写进 entry"""
+        entry = self.stages[name] = {"rows": int(rows), "seconds": None, "rows_per_s": None}
+        t0 = time.perf_counter()
+        yield entry
+        seconds = time.perf_counter() - t0
+        rss = peak_rss_mb()
+        entry.update(
+            seconds=round(seconds, 4),
+            rows_per_s=round(rows / seconds, 1) if seconds > 0 else None,
+            peak_rss_mb=None if rss is None else round(rss, 1),
+        )
+        print(f"[info] {name:15s} {rows:8d} rows {seconds:8.2f} s {entry['rows_per_s']:>10} rows/s")
+
+
+def git_info():
+    def git(*args):
+        return subprocess.run(
+            ["git", *args], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+    try:
+        commit = git("rev-parse", "--short", "HEAD")
+        return {"commit": commit, "dirty": bool(git("status", "--porcelain", "-uno"))}
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": "unknown", "dirty": None}
+
+
+# ------------------- 各阶段 -------------------
+
+
+def load_pages(n_synthetic, n_cached):
+    from bench_extract import cached_pages, synthetic_pages
+
+    return cached_pages(n_cached) + synthetic_pages(n_synthetic)
+
+
+def run_crawl(rec, pages, args, tmp):
+    from _crawl_state import CrawlState, CsvBatchWriter
+    from _fetcher import Fetcher
+    from _stub_server import StubHost, start_hosts, stop_hosts
+    from crawl_news import NEWS_COLUMNS, crawl_from_url_file
+
+    # 每个假站点一个端口（对抓取器来说是不同域名），延迟依次是 latency、2×latency …
+    hosts = start_hosts(
+        [
+            StubHost(latency=args.latency * (i + 1), error_rate=args.error_rate, seed=i)
+            for i in range(args.hosts)
+        ]
+    )
+    try:
+        urls = []
+        for i, (_, html) in enumerate(pages):
+            host = hosts[i % len(hosts)]
+            host.pages[f"/article/{i}"] = html
+            urls.append(f"{host.base_url}/article/{i}")
+        url_file = tmp / "urls.txt"
+        url_file.write_text("\n".join(urls), encoding="utf-8")
+        fetcher = Fetcher(
+            max_workers=args.crawl_workers,
+            per_host_rate=args.per_host_rate,
+            per_host_burst=max(1, int(args.per_host_rate)),
+            backoff_base=0.2,
+            verbose=False,
+        )
+        writer = CsvBatchWriter(tmp / "news_raw.csv", NEWS_COLUMNS, append=False)
+        state = CrawlState(tmp / "crawl_state.jsonl")
+        with rec.stage("crawl", len(urls)) as extra:
+            n_ok, n_failed = crawl_from_url_file(
+                url_file, "CN", writer, state, fetcher=fetcher, parse_workers=args.parse_workers
+            )
+            writer.flush()
+        extra.update(
+            ok=n_ok,
+            failed=n_failed,
+            requests=sum(h.requests for h in hosts),
+            injected_errors=sum(h.errors for h in hosts),
+        )
+    finally:
+        stop_hosts(hosts)
+
+
+def run_parse(rec, pages):
+    from _extract import extract_article
+
+    with rec.stage("parse", len(pages)) as extra:
+        chars = sum(len(extract_article(url, html)["content"]) for url, html in pages)
+    extra["content_chars"] = chars
+
+
+def run_dates(rec, df):
+    from _dates import normalize_dates
+
+    with rec.stage("dates", len(df)) as extra:
+        df["published_at"], report = normalize_dates(df["date"], df["source"])
+    extra["failed"] = int(report["failed"].sum())
+
+
+def run_clean(rec, df):
+    from _text_clean import DEFAULT_CLEANER
+    from preprocess_texts import basic_clean
+
+    texts = df["content"].astype(object)
+    with rec.stage("clean", len(df)) as extra:
+        cleaned = [basic_clean(t) for t in texts]
+    extra["empty"] = sum(c == "" for c in cleaned)
+    with rec.stage("clean_column", len(df)) as extra:
+        cleaned = DEFAULT_CLEANER.clean_series(texts)
+    extra["empty"] = int((cleaned == "").sum())
+
+
+def run_clean_tokenize(rec, df, workers):
+    from preprocess_texts import clean_and_tokenize
+
+    with rec.stage("clean_tokenize", len(df)) as extra:
+        cleaned, tokens = clean_and_tokenize(df["content"], df["country"], workers=workers)
+    df["clean_content"] = cleaned
+    df["tokens"] = tokens
+    extra["tokens"] = int(sum(t.count(" ") + 1 for t in tokens if t))
+
+
+def build_tiny_model(folder, seed=0):
+    """随机初始化的 2 层小 BERT + 按合成语料词表建的 WordPiece 分词器，存到 folder，返回路径"""
+    import torch
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+    import _synth
+
+    words = set()
+    for group in (_synth._CN_TOPICS, _synth._CN_COMMON, _synth._CN_SENT, _synth._WEIBO_NOISE):
+        for w in " ".join(group).split():
+            words.update(w)  # 中文按字切
+    for group in (_synth._EN_TOPICS, _synth._EN_COMMON):
+        words.update(" ".join(group).lower().split())
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "。", "，"] + sorted(words)
+
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    (folder / "vocab.txt").write_text("\n".join(dict.fromkeys(vocab)), encoding="utf-8")
+    tokenizer = BertTokenizerFast(vocab_file=str(folder / "vocab.txt"))
+    torch.manual_seed(seed)
+    config = BertConfig(
+        vocab_size=tokenizer.vocab_size,
+        hidden_size=64,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=128,
+        max_position_embeddings=512,
+        num_labels=2,
+    )
+    BertForSequenceClassification(config).save_pretrained(folder)
+    tokenizer.save_pretrained(folder)
+    return str(folder)
+
+
+def run_sentiment(rec, df, rows, tmp):
+    from _sentiment_backends import load_backend
+    from sentiment_bert import predict_sentiment
+
+    t0 = time.perf_counter()
+    tokenizer, runner = load_backend(build_tiny_model(tmp / "tiny-bert"), "torch", True)
+    load_s = time.perf_counter() - t0
+    texts = df["clean_content"].iloc[:rows].tolist()
+    with rec.stage("sentiment", len(texts)) as extra:
+        results = predict_sentiment(texts, tokenizer, runner)
+    labels = [label for label, _ in results]
+    df["sentiment_label"] = pd.array(labels + [None] * (len(df) - len(labels)), dtype="Int8")
+    extra["model_build_load_s"] = round(load_s, 3)
+
+
+def run_cluster(rec, df):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics import adjusted_rand_score
+
+    from _clustering import fit_clusters, pick_mode
+    from analysis_traditional_nlp import N_CLUSTERS, TFIDF_PARAMS
+
+    texts = df["tokens"].fillna("").tolist()
+    with rec.stage("cluster", len(texts)) as extra:
+        t0 = time.perf_counter()
+        X = TfidfVectorizer(**TFIDF_PARAMS).fit_transform(texts)
+        t1 = time.perf_counter()
+        mode = pick_mode(X.shape[0])
+        _, labels = fit_clusters(X, N_CLUSTERS, mode)
+        t2 = time.perf_counter()
+    df["cluster"] = labels
+    extra.update(
+        tfidf_s=round(t1 - t0, 4),
+        kmeans_s=round(t2 - t1, 4),
+        mode=mode,
+        terms=int(X.shape[1]),
+        ari_vs_topic=round(float(adjusted_rand_score(df["topic"], labels)), 3),
+    )
+
+
+def run_stats(rec, df):
+    from _cube import Cube
+    from stats import REPORTS
+
+    dims = [c for c in ("country", "source_type", "cluster", "sentiment_label") if c in df]
+    frame = df[dims].astype("category")
+    if "published_at" in df:
+        frame["period"] = df["published_at"].dt.to_period("W").astype("string").astype("category")
+    with rec.stage("stats", len(frame)) as extra:
+        cube = Cube.from_frame(frame)
+        n = 0
+        for reports in REPORTS.values():
+            for _, by, where, normalize in reports:
+                if cube.has(*by, *where):
+                    cube.slice(by, where, normalize)
+                    n += 1
+        if cube.has("period", "sentiment_label"):
+            cube.slice(["period", "sentiment_label"], {"country": "CN"}, normalize=True)
+            n += 1
+    extra.update(cells=int(len(cube.counts)), slices=n)
+
+
+# ------------------- 结果 -------------------
+
+
+def compare(current, baseline_path, tolerance):
+    base = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    print(f"\n[info] vs {baseline_path} (commit {base.get('commit')}):")
+    print(f"{'stage':15s} {'base s':>9s} {'now s':>9s} {'ratio':>7s}")
+    slower = []
+    for name, now in current["stages"].items():
+        old = base.get("stages", {}).get(name)
+        if old is None or not old.get("seconds"):
+            print(f"{name:15s} {'-':>9s} {now['seconds']:9.2f}")
+            continue
+        ratio = now["seconds"] / old["seconds"]
+        flag = "  <-- slower" if ratio > 1 + tolerance else ""
+        if flag:
+            slower.append(name)
+        print(f"{name:15s} {old['seconds']:9.2f} {now['seconds']:9.2f} {ratio:7.2f}{flag}")
+    if base.get("params") != current["params"]:
+        print("[warn] parameters differ from the baseline run, ratios are not like for like")
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end benchmark on a synthetic corpus")
+    parser.add_argument("--cn-news", type=int, default=1000, help="合成 CN 新闻行数")
+    parser.add_argument("--us-news", type=int, default=500, help="合成 US 新闻行数")
+    parser.add_argument("--weibo", type=int, default=3000, help="合成微博行数")
+    parser.add_argument("--max-chars", type=int, default=20_000, help="单条正文最多多少字符")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--pages", type=int, default=200, help="合成 HTML 页面数")
+    parser.add_argument("--cached-pages", type=int, default=200, help="最多再加多少个 http_cache 里的真实页面")
+    parser.add_argument("--hosts", type=int, default=3, help="假站点个数")
+    parser.add_argument("--latency", type=float, default=0.02, help="第 i 个假站点的延迟是 i × latency 秒")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="假站点返回 503 的概率")
+    parser.add_argument("--crawl-workers", type=int, default=16, help="抓取并发数")
+    parser.add_argument("--per-host-rate", type=float, default=50.0, help="每个假站点每秒请求数")
+    parser.add_argument("--parse-workers", type=int, default=0, help="抓取时的解析进程数，0 = 不开进程池")
+    parser.add_argument("--workers", type=int, default=1, help="分词进程数")
+    parser.add_argument("--sentiment-rows", type=int, default=1000, help="情感阶段最多跑多少行")
+    parser.add_argument("--skip", nargs="+", default=[], choices=STAGES, help="跳过这些阶段")
+    parser.add_argument("--out", help=f"结果 JSON 路径，默认 {BENCH_DIR}/<时间>-<commit>.json")
+    parser.add_argument("--compare", help="和这个旧结果 JSON 比较")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE, help="耗时超过旧结果多少比例算退步")
+    args = parser.parse_args(argv)
+    skip = set(args.skip)
+    if "clean_tokenize" in skip and "cluster" not in skip:
+        raise SystemExit("cluster needs the tokens from clean_tokenize, skip both or neither")
+
+    rec = Recorder()
+    t0 = time.perf_counter()
+    df = synthetic_corpus(args.cn_news, args.us_news, args.weibo, args.seed, args.max_chars)
+    print(f"[info] synthetic corpus: {len(df)} rows in {time.perf_counter() - t0:.1f} s, "
+          f"{int(df['content'].str.len().sum()) / 1e6:.1f}M chars")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        if not {"crawl", "parse"} <= skip:
+            pages = load_pages(args.pages, args.cached_pages)
+            if "crawl" not in skip:
+                run_crawl(rec, pages, args, tmp)
+            if "parse" not in skip:
+                run_parse(rec, pages)
+        if "dates" not in skip:
+            run_dates(rec, df)
+        if "clean" not in skip:
+            run_clean(rec, df)
+        if "clean_tokenize" not in skip:
+            run_clean_tokenize(rec, df, args.workers)
+            if "sentiment" not in skip:
+                run_sentiment(rec, df, args.sentiment_rows, tmp)
+        if "cluster" not in skip:
+            run_cluster(rec, df)
+        if "stats" not in skip:
+            run_stats(rec, df)
+
+    result = {
+        **git_info(),
+        "created": pd.Timestamp.now().isoformat(timespec="seconds"),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+        },
+        "params": {
+            k: v for k, v in vars(args).items() if k not in ("out", "compare", "tolerance")
+        },
+        "stages": rec.stages,
+    }
+    out = Path(args.out) if args.out else (
+        BENCH_DIR / f"{pd.Timestamp.now():%Y%m%d-%H%M%S}-{result['commit']}.json"
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, ensure_ascii=False, indent=1), encoding="utf-8")
+    print("Saved benchmark results to", out)
+
+    if args.compare:
+        slower = compare(result, args.compare, args.tolerance)
+        if slower:
+            print(f"[warn] slower than the baseline by more than {args.tolerance:.0%}: {slower}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# scripts/bench_sentiment.py
+"""
+情感推理吞吐量：旧写法（逐条、每条 pad 到 256） vs 按长度分桶的动态 batch
+
+语料取 all_texts_clean 的 clean_content（没有就用 all_texts 的 content），按行复制到 --rows 行；
+可以用 --max-chars 把每条截短，模拟微博短文本。同时比较两种写法的标签是否一致、置信度最大差多少。
+
+用法:
+    python scripts/bench_sentiment.py --model distilbert-base-uncased-finetuned-sst-2-english
+    python scripts/bench_sentiment.py --model /path/to/local/model --rows 500 --batch-size 32 64
+"""
+
+import argparse
+import time
+
+import torch
+from tqdm import tqdm
+
+from _sentiment_backends import device, load_model
+from _store import exists, read_dataset
+from sentiment_bert import EN_MODEL_NAME, MAX_LENGTH, MAX_TOKENS, predict_sentiment
+
+
+def legacy_predict(texts, tokenizer, model, max_length=MAX_LENGTH):
+    """原 predict_sentiment：逐条推理，每条都 pad 到 max_length"""
+    results = []
+    model.eval()
+    for t in tqdm(texts, desc="legacy"):
+        if not isinstance(t, str) or t.strip() == "":
+            results.append((None, None))
+            continue
+        with torch.no_grad():
+            inputs = tokenizer(
+                t,
+                truncation=True,
+                padding="max_length",
+                max_length=max_length,
+                return_tensors="pt",
+            ).to(device)
+            logits = model(**inputs).logits
+            prob = torch.softmax(logits, dim=-1).cpu().numpy()[0]
+            label = int(prob.argmax())
+            results.append((label, float(prob[label])))
+    return results
+
+
+def load_texts(rows: int, max_chars: int):
+    if exists("all_texts_clean"):
+        texts = read_dataset("all_texts_clean", columns=["clean_content"])["clean_content"]
+    else:
+        texts = read_dataset("all_texts", columns=["content"])["content"]
+    texts = texts.fillna("").astype(str).tolist()
+    reps = -(-rows // len(texts))
+    texts = (texts * reps)[:rows]
+    if max_chars:
+        # 每条截到不同长度，长短混在一起，更接近真实的微博 + 新闻语料
+        texts = [t[: 1 + (i * 37) % max_chars] for i, t in enumerate(texts)]
+    return texts
+
+
+def compare(a, b):
+    agree = sum(x[0] == y[0] for x, y in zip(a, b))
+    diff = max(
+        (abs(x[1] - y[1]) for x, y in zip(a, b) if x[1] is not None and y[1] is not None),
+        default=0.0,
+    )
+    return agree, diff
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=EN_MODEL_NAME, help="模型名或本地目录")
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--max-chars", type=int, default=400, help="每条最多保留多少字符，0 = 不截")
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[16, 32, 64])
+    parser.add_argument("--max-tokens", type=int, default=MAX_TOKENS)
+    parser.add_argument("--skip-legacy", action="store_true", help="不跑旧写法（很慢）")
+    args = parser.parse_args()
+
+    texts = load_texts(args.rows, args.max_chars)
+    tokenizer, model = load_model(args.model)
+    print(f"{len(texts)} texts, model={args.model}, device={device}, threads={torch.get_num_threads()}")
+
+    timings, baseline = {}, None
+    if not args.skip_legacy:
+        t0 = time.perf_counter()
+        baseline = legacy_predict(texts, tokenizer, model)
+        timings["legacy"] = time.perf_counter() - t0
+
+    for bs in args.batch_size:
+        t0 = time.perf_counter()
+        res = predict_sentiment(texts, tokenizer, model, batch_size=bs, max_tokens=args.max_tokens)
+        timings[f"bucketed/bs={bs}"] = time.perf_counter() - t0
+        if baseline is None:
+            baseline = res
+        agree, diff = compare(baseline, res)
+        print(f"bs={bs}: labels agree {agree}/{len(texts)}, max |conf diff| {diff:.2e}")
+
+    for label, dt in timings.items():
+        print(f"{label:18s}: {dt:7.2f}s  {len(texts) / dt:8.1f} texts/s")
+    if "legacy" in timings:
+        best = min(v for k, v in timings.items() if k != "legacy")
+        print(f"speedup (best vs legacy): {timings['legacy'] / best:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
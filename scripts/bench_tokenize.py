@@ -0,0 +1,52 @@
+# scripts/bench_tokenize.py
+"""
+分词吞吐量随进程数的变化：preprocess_texts.clean_and_tokenize 在不同 --workers 下的 rows/s
+
+语料取 all_texts（没有就用 news_raw），按行复制到 --rows 行。
+每个进程数跑一遍，结果和单进程比对，保证顺序和内容一致。
+
+用法:
+    python scripts/bench_tokenize.py --rows 20000 --workers 1 2 4 8
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from _store import exists, read_dataset
+from preprocess_texts import CHUNKSIZE, clean_and_tokenize
+
+
+def load_corpus(rows: int) -> pd.DataFrame:
+    name = "all_texts" if exists("all_texts") else "news_raw"
+    df = read_dataset(name, columns=["country", "content"]).dropna()
+    reps = -(-rows // len(df))
+    return pd.concat([df] * reps, ignore_index=True).iloc[:rows]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    args = parser.parse_args()
+
+    df = load_corpus(args.rows)
+    contents = df["content"].astype(str).tolist()
+    countries = df["country"].astype(str).tolist()
+    print(f"{len(df)} rows, {sum(map(len, contents)) / 1e6:.1f}M chars")
+
+    baseline = None
+    for w in args.workers:
+        t0 = time.perf_counter()
+        res = clean_and_tokenize(contents, countries, workers=w, chunksize=args.chunksize)
+        dt = time.perf_counter() - t0
+        if baseline is None:
+            baseline = res
+        same = "ok" if res == baseline else "MISMATCH"
+        print(f"workers={w:3d}: {dt:7.2f}s  {len(df) / dt:9.0f} rows/s  [{same}]")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,38 @@
 # scripts/build_dataset.py
+import argparse
+
 import pandas as pd
-from _paths import RAW_DIR, PROCESSED_DIR
+from _dates import FormatCache, normalize_dates
+from _dedup import DEDUP_THRESHOLD, NUM_PERM, SHINGLE_SIZE, near_duplicates
+from _store import dataset_path, exists, read_dataset, schema, write_dataset
 
+# content 不超过这么多字的行丢掉（新闻页抓错只剩几个字的）
+MIN_CONTENT_CHARS = 50
 
-def main():
-    news_path = RAW_DIR / "news_raw.csv"
-    weibo_path = RAW_DIR / "weibo_raw.csv"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="合并 news_raw / weibo_raw 成 all_texts")
+    parser.add_argument(
+        "--dedup-threshold",
+        type=float,
+        default=DEDUP_THRESHOLD,
+        help="近重复判定的 Jaccard 阈值（字符 shingle），越低删得越多",
+    )
+    parser.add_argument("--shingle", type=int, default=SHINGLE_SIZE, help="shingle 的字符数")
+    parser.add_argument("--num-perm", type=int, default=NUM_PERM, help="MinHash 签名长度")
+    parser.add_argument("--no-dedup", action="store_true", help="不做近重复去重")
+    parser.add_argument(
+        "--date-ref",
+        default=None,
+        help="解析“5分钟前”、没有年份的日期时用的参考时间（默认现在），例如 2025-11-25 12:00",
+    )
+    args = parser.parse_args(argv)
 
     dfs = []
 
     # ----------------- 读 news_raw -----------------
-    if news_path.exists():
-        news_df = pd.read_csv(news_path)
+    if exists("news_raw"):
+        news_df = read_dataset("news_raw")
 
         # 确保必要列存在
         if "country" not in news_df.columns:
@@ -24,11 +45,11 @@ def main():
         # 这几个列名是 crawl_news 里已经保证的：title, date, content, url
         dfs.append(news_df)
     else:
-        print("WARNING: news_raw.csv not found at", news_path)
+        print("WARNING: news_raw not found at", dataset_path("news_raw", "csv"))
 
     # ----------------- 读 weibo_raw（如存在） -----------------
-    if weibo_path.exists():
-        weibo_df = pd.read_csv(weibo_path)
+    if exists("weibo_raw"):
+        weibo_df = read_dataset("weibo_raw")
 
         # weibo_raw 里已经有 country / source / source_type
         if "country" not in weibo_df.columns:
@@ -66,7 +87,7 @@ def main():
     for col in ["country", "source", "source_type", "date", "title", "content", "url"]:
         if col not in all_df.columns:
             all_df[col] = ""
-        all_df[col] = all_df[col].astype(str).fillna("")
+        all_df[col] = all_df[col].astype("string").fillna("")
 
     # 只保留统一后的字段
     all_df = all_df[
@@ -74,13 +95,54 @@ def main():
     ]
 
     # 删掉内容太短的（比如新闻页抓错只有几个字的）
-    all_df = all_df[all_df["content"].astype(str).str.len() > 50].reset_index(
+    all_df = all_df[all_df["content"].astype(str).str.len() > MIN_CONTENT_CHARS].reset_index(
         drop=True
     )
 
-    out_path = PROCESSED_DIR / "all_texts.csv"
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    all_df.to_csv(out_path, index=False, encoding="utf-8-sig")
+    # date 是抓下来的原始文本，解析成 published_at（datetime64）；解析失败的是 NaT。
+    # 去重要按发布时间挑代表，所以先解析日期
+    all_df["published_at"], report = normalize_dates(
+        all_df["date"], all_df["source"], ref=args.date_ref, cache=FormatCache()
+    )
+    rows, failed = int(report["rows"].sum()), int(report["failed"].sum())
+    print(
+        f"[info] dates: parsed {rows - failed}/{rows} non-empty dates "
+        f"({failed / max(rows, 1):.1%} failed), formats cached per source"
+    )
+    for r in report[report["fail_rate"] > 0.5].itertuples():
+        print(f"[warn] dates: {r.source} {r.failed}/{r.rows} unparsed")
+
+    # 近重复去重：转发的微博、各站转载的同一篇通稿只留一条（published_at 最早的那条，
+    # 没有日期的排在最后，同一时间取文件里靠前的），
+    # dup_cluster 是簇号，dup_count 是这条代表了多少条原始文本；
+    # 删掉的行和它们的 dup_cluster 写到 all_texts_duplicates，能按簇号查回原始来源
+    dropped = all_df.iloc[:0]
+    if not args.no_dedup:
+        cluster, keep = near_duplicates(
+            all_df["content"].tolist(),
+            threshold=args.dedup_threshold,
+            num_perm=args.num_perm,
+            k=args.shingle,
+            rank=all_df["published_at"].to_numpy("datetime64[ns]"),
+        )
+        all_df["dup_cluster"] = cluster
+        all_df["dup_count"] = all_df.groupby("dup_cluster")["dup_cluster"].transform("size")
+        n_before = len(all_df)
+        dropped = all_df[~keep]
+        all_df = all_df[keep].reset_index(drop=True)
+        print(
+            f"[info] near-duplicate removal (threshold={args.dedup_threshold}): "
+            f"{n_before} -> {len(all_df)} rows, "
+            f"{int((all_df['dup_count'] > 1).sum())} clusters with duplicates"
+        )
+    # --no-dedup 时也写一份空的，免得留着上次的
+    dup_columns = list(schema("all_texts_duplicates"))
+    dup_path = write_dataset(
+        dropped.reindex(columns=dup_columns).reset_index(drop=True), "all_texts_duplicates"
+    )
+    print(f"[info] {len(dropped)} dropped duplicates saved to {dup_path}")
+
+    out_path = write_dataset(all_df, "all_texts")
     print("Saved unified dataset to", out_path)
     print(all_df.head())
 
@@ -1,6 +1,8 @@
-import pandas as pd
-df = pd.read_csv("data/processed/all_texts.csv")
+# scripts/cal.py
+"""旧入口，等同于 python scripts/stats.py --report cal"""
 
-print(df["country"].value_counts())
-print(df["source_type"].value_counts())
-print(df.groupby(["country", "source_type"]).size())
+from stats import main
+
+
+if __name__ == "__main__":
+    main(["--report", "cal"])
@@ -1,6 +1,8 @@
-import pandas as pd
-df = pd.read_csv("data/processed/all_with_clusters.csv")
+# scripts/cal2.py
+"""旧入口，等同于 python scripts/stats.py --report cal2"""
 
-cn = df[df["country"] == "CN"]
-print(cn["cluster"].value_counts())
-print(cn.groupby("source_type")["cluster"].value_counts(normalize=True))
+from stats import main
+
+
+if __name__ == "__main__":
+    main(["--report", "cal2"])
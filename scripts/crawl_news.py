@@ -3,312 +3,252 @@
 从 cn_urls.txt / us_urls.txt 批量抓取新闻正文，并保存到 data/raw/news_raw.csv
 
 依赖:
-    pip install requests beautifulsoup4 lxml pandas tqdm
+    pip install requests lxml pandas tqdm
+
+用法:
+    python scripts/crawl_news.py --workers 16 --per-host-rate 1.0
+    python scripts/crawl_news.py --offline      # 只用 data/raw/http_cache 里的缓存重新解析
+    python scripts/crawl_news.py --incremental  # 只抓新增 / 之前失败的 URL，追加写入
 """
 
-import re
-import time
-from typing import Dict
-from urllib.parse import urlparse
+import argparse
+from typing import Dict, Optional, Tuple
 
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 from tqdm import tqdm
 
+from _extract import extract_article
+from _crawl_state import CrawlState, CsvBatchWriter
+from _crawl_pipeline import iter_pipeline
+from _fetcher import Fetcher
+from _http_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES, DEFAULT_TTL, ResponseCache
 from _paths import CONFIG_DIR, RAW_DIR
 
-# ------------------- HTTP 会话与基础工具 -------------------
+# ------------------- HTTP 抓取 -------------------
+
+# 全局并发上限 / 每个域名每秒请求数（令牌桶），代替原来的固定 sleep
+MAX_WORKERS = 16
+PER_HOST_RATE = 1.0
+PER_HOST_BURST = 2
+
+# 输出列顺序与原来的 news_raw.csv 保持一致
+NEWS_COLUMNS = ["title", "date", "content", "source", "url", "country"]
+# 每个 URL 的抓取状态（增量 / 断点续跑用）
+STATE_PATH = RAW_DIR / "crawl_state.jsonl"
+BATCH_SIZE = 20
+MAX_RETRIES = 3
+# 解析进程数（None = CPU 核数）/ 抓取→解析之间的队列容量
+PARSE_WORKERS = None
+QUEUE_SIZE = 64
+
+_default_fetcher: Optional[Fetcher] = None
 
-HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/124.0 Safari/537.36"
-    )
-}
 
-session = requests.Session()
-session.headers.update(HEADERS)
+def get_fetcher() -> Fetcher:
+    global _default_fetcher
+    if _default_fetcher is None:
+        _default_fetcher = Fetcher(
+            max_workers=MAX_WORKERS,
+            per_host_rate=PER_HOST_RATE,
+            per_host_burst=PER_HOST_BURST,
+            cache=ResponseCache(),
+        )
+    return _default_fetcher
 
 
-def fetch_html(url: str, sleep: float = 1.0) -> str:
+def fetch_html(url: str) -> str:
     """
-    带简单重试的 HTML 获取。
+    带重试 / 限速的 HTML 获取（单条）。
     - 只接受 text/html / application/xhtml+xml
     - 遇到 PDF 等二进制内容直接跳过
+    - 429 / 5xx 按域名指数退避
     """
-    for _ in range(3):
-        try:
-            resp = session.get(url, timeout=10)
-            if resp.status_code == 200:
-                ctype = resp.headers.get("Content-Type", "")
-                if (
-                    "text/html" not in ctype
-                    and "application/xhtml+xml" not in ctype
-                ):
-                    print(f"[skip] non-HTML content for {url}: {ctype}")
-                    return ""
-                text = resp.text
-                if sleep > 0:
-                    time.sleep(sleep)
-                return text
-            else:
-                print(f"[warn] {url} status {resp.status_code}")
-        except Exception as e:
-            print(f"[error] Error fetching {url}: {e}")
-            time.sleep(2)
-    return ""
-
-
-def clean_text(text: str) -> str:
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
-
-
-def extract_date_generic(soup: BeautifulSoup) -> str:
-    """
-    兜底日期抽取：
-    1) <time> 标签
-    2) 常见 <meta> 发布时间字段
-    3) class 名里包含 time/date/pubtime 的元素
-    4) 在全页文本里用正则匹配 YYYY-MM-DD / 中文日期 / 英文月份
-    """
-    # 1) <time> 标签
-    time_tag = soup.find("time")
-    if time_tag:
-        dt = time_tag.get("datetime")
-        if dt:
-            return dt.strip()
-        txt = time_tag.get_text(strip=True)
-        if txt:
-            return txt
-
-    # 2) meta 标签
-    for prop in ("article:published_time", "og:published_time", "article:modified_time"):
-        meta = soup.find("meta", attrs={"property": prop})
-        if meta and meta.get("content"):
-            return meta["content"].strip()
-
-    for name in ("pubdate", "publishdate", "publish_time", "ptime", "date", "sailthru.date"):
-        meta = soup.find("meta", attrs={"name": name})
-        if meta and meta.get("content"):
-            return meta["content"].strip()
-
-    # 3) class 名里含 time/date/pubtime 的元素
-    class_patterns = (
-        "time",
-        "date",
-        "pubtime",
-        "pub_time",
-        "publish",
-        "article-time",
-        "news-time",
-        "time-source",
-    )
-    for pattern in class_patterns:
-        tag = soup.find(attrs={"class": re.compile(pattern, re.I)})
-        if tag:
-            txt = tag.get_text(" ", strip=True)
-            if txt:
-                return txt
-
-    # 4) 正则匹配整页文本
-    full_text = soup.get_text(" ", strip=True)
-
-    # 4.1 YYYY-MM-DD HH:MM:SS / YYYY-MM-DD HH:MM
-    m = re.search(
-        r"\d{4}[-/年]\d{1,2}[-/月]\d{1,2}(日)?\s*\d{0,2}:?\d{0,2}:?\d{0,2}?",
-        full_text,
-    )
-    if m:
-        return m.group(0)
-
-    # 4.2 仅日期 YYYY-MM-DD / YYYY年MM月DD日
-    m = re.search(r"\d{4}[-/年]\d{1,2}[-/月]\d{1,2}(日)?", full_text)
-    if m:
-        return m.group(0)
-
-    # 4.3 英文月份形式：March 12, 2025
-    m = re.search(
-        r"(January|February|March|April|May|June|July|August|September|October|November|December)"
-        r"\s+\d{1,2},\s+\d{4}",
-        full_text,
-    )
-    if m:
-        return m.group(0)
-
-    return ""
-
-
-# ------------------- 各网站解析函数（可按需慢慢扩展） -------------------
-
-
-def parse_people_cn(html: str) -> Dict:
-    """人民网正文，一般在 div#rwb_zw / .rm_txt_con 里"""
-    soup = BeautifulSoup(html, "lxml")
-    title_tag = soup.find("h1") or soup.find("h2")
-    date_tag = (
-        soup.find("span", class_="publish-time")
-        or soup.find("span", class_="date")
-        or soup.find("div", class_="sou")
-    )
-    content_div = (
-        soup.find("div", id="rwb_zw")
-        or soup.find("div", class_="rm_txt_con")
-        or soup.find("div", class_="article")
-    )
-
-    title = title_tag.get_text(strip=True) if title_tag else ""
-    date = date_tag.get_text(strip=True) if date_tag else ""
-    if not date:
-        date = extract_date_generic(soup)
-
-    if content_div:
-        ps = [p.get_text(" ", strip=True) for p in content_div.find_all("p")]
-        content = clean_text(" ".join(ps))
-    else:
-        content = ""
-
-    return {"title": title, "date": date, "content": content}
-
-
-def parse_globaltimes_cn(html: str) -> Dict:
-    """环球时报中文站正文"""
-    soup = BeautifulSoup(html, "lxml")
-    title_tag = soup.find("h1")
-    date_tag = soup.find("span", class_="pub_time") or soup.find(
-        "span", class_="time"
-    )
-    body_div = (
-        soup.find("div", class_="article-content")
-        or soup.find("div", class_="artical-content")
-    )
-
-    title = title_tag.get_text(strip=True) if title_tag else ""
-    date = date_tag.get_text(strip=True) if date_tag else ""
-    if not date:
-        date = extract_date_generic(soup)
-
-    if body_div:
-        ps = [p.get_text(" ", strip=True) for p in body_div.find_all("p")]
-        content = clean_text(" ".join(ps))
-    else:
-        content = ""
-
-    return {"title": title, "date": date, "content": content}
-
-
-def parse_reuters(html: str) -> Dict:
-    """Reuters 新闻正文"""
-    soup = BeautifulSoup(html, "lxml")
-    title_tag = soup.find("h1")
-    time_tag = soup.find("time")
-    body_div = soup.find("div", attrs={"data-testid": "article-body"})
-
-    title = title_tag.get_text(strip=True) if title_tag else ""
-    if time_tag:
-        date = time_tag.get_text(strip=True) or time_tag.get("datetime", "")
-    else:
-        date = ""
-    if not date:
-        date = extract_date_generic(soup)
-
-    if body_div:
-        ps = [p.get_text(" ", strip=True) for p in body_div.find_all("p")]
-        content = clean_text(" ".join(ps))
-    else:
-        content = ""
+    return get_fetcher().fetch(url)
 
-    return {"title": title, "date": date, "content": content}
 
-
-def parse_generic(html: str) -> Dict:
-    """兜底：取第一个 <h1> / <title> + 所有 <p> 文本，并尽量猜测日期"""
-    soup = BeautifulSoup(html, "lxml")
-    title_tag = soup.find("h1") or soup.find("title")
-    ps = [p.get_text(" ", strip=True) for p in soup.find_all("p")]
-
-    title = title_tag.get_text(strip=True) if title_tag else ""
-    content = clean_text(" ".join(ps)) if ps else ""
-    date = extract_date_generic(soup)
-
-    return {"title": title, "date": date, "content": content}
+# ------------------- 正文解析 -------------------
+# 各站点规则在 _extract.py 的注册表里（按域名后缀匹配），新站点用 _extract.register 加
 
 
 def parse_article(url: str, html: str) -> Dict:
-    """按域名选择解析函数"""
-    netloc = urlparse(url).netloc
-
-    if "people.com.cn" in netloc:
-        data = parse_people_cn(html)
-        source = "people"
-    elif "globaltimes.cn" in netloc:
-        data = parse_globaltimes_cn(html)
-        source = "globaltimes_cn"
-    elif "reuters.com" in netloc:
-        data = parse_reuters(html)
-        source = "reuters"
-    else:
-        # 其它网站统统走通用解析，source 记录原始域名方便后面分组分析
-        data = parse_generic(html)
-        source = netloc
-
-    data["source"] = source
-    data["url"] = url
-    return data
+    """按域名选择抽取规则，返回 title / date / content / source / url"""
+    return extract_article(url, html)
 
 
 # ------------------- 主抓取逻辑 -------------------
 
 
-def crawl_from_url_file(path, country: str) -> pd.DataFrame:
-    """
-    从一个 URL 列表文件中逐条抓取。
-    - path: 文本文件，每行一个 URL，可用 # 开头做注释
-    - country: "CN" / "US" 等，用于后续分析打标签
-    """
-    rows = []
+def read_url_file(path) -> list:
+    """读 URL 列表文件：每行一个 URL，可用 # 开头做注释；去重但保持原有顺序"""
+    urls = []
     with open(path, "r", encoding="utf-8") as f:
-        urls = []
         for line in f:
             line = line.strip()
             if not line or line.startswith("#"):
                 continue
             urls.append(line)
-        # 去重但保持原有顺序
-        urls = list(dict.fromkeys(urls))
-
-    for url in tqdm(urls, desc=f"Crawling {country} news"):
-        html = fetch_html(url)
-        if not html:
+    return list(dict.fromkeys(urls))
+
+
+def crawl_from_url_file(
+    path,
+    country: str,
+    writer: CsvBatchWriter,
+    state: CrawlState,
+    fetcher: Optional[Fetcher] = None,
+    incremental: bool = False,
+    max_retries: int = 3,
+    parse_workers: Optional[int] = PARSE_WORKERS,
+    queue_size: int = QUEUE_SIZE,
+) -> Tuple[int, int]:
+    """
+    从一个 URL 列表文件中并发抓取，解析结果按批追加写入 writer。
+    - path: 文本文件，每行一个 URL，可用 # 开头做注释
+    - country: "CN" / "US" 等，用于后续分析打标签
+    - incremental: 跳过 state 里已经成功的 URL；失败过的 URL 在重试次数
+      没超过 max_retries 前会被再抓一次
+    - parse_workers / queue_size: 解析进程数（None = CPU 核数）与抓取→解析队列容量，
+      见 _crawl_pipeline.iter_pipeline
+    返回 (成功条数, 失败条数)。行按完成顺序写出。
+    """
+    fetcher = fetcher or get_fetcher()
+    urls = read_url_file(path)
+    if incremental:
+        urls = [
+            u for u in urls
+            if not state.is_done(u) and state.retries(u) < max_retries
+        ]
+        print(f"[info] {country}: {len(urls)} urls to crawl (new or failed)")
+
+    n_ok = n_failed = 0
+    results = iter_pipeline(
+        urls,
+        fetch_fn=fetcher.fetch,
+        parse_fn=extract_article,
+        fetch_workers=fetcher.max_workers,
+        parse_workers=parse_workers,
+        queue_size=queue_size,
+    )
+    for url, info in tqdm(results, total=len(urls), desc=f"Crawling {country} news"):
+        if info is None:
+            state.mark_failed(url, country)
+            n_failed += 1
             continue
-        info = parse_article(url, html)
         info["country"] = country
-        rows.append(info)
+        writer.add(info)
+        state.mark_done(url, country)
+        n_ok += 1
+    return n_ok, n_failed
 
-    if not rows:
-        return pd.DataFrame(columns=["title", "date", "content", "source", "url", "country"])
-    return pd.DataFrame(rows)
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl CN / US news into news_raw.csv")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="全局并发上限")
+    parser.add_argument(
+        "--per-host-rate", type=float, default=PER_HOST_RATE, help="每个域名每秒请求数"
+    )
+    parser.add_argument(
+        "--per-host-burst", type=int, default=PER_HOST_BURST, help="每个域名允许的突发请求数"
+    )
+    parser.add_argument(
+        "--cache-dir", default=str(DEFAULT_CACHE_DIR), help="HTTP 响应缓存目录"
+    )
+    parser.add_argument(
+        "--cache-ttl", type=float, default=DEFAULT_TTL, help="缓存有效期（秒），过期后发条件请求"
+    )
+    parser.add_argument(
+        "--cache-max-mb", type=float, default=DEFAULT_MAX_BYTES / 1024 ** 2, help="缓存大小上限（MB）"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="不读也不写缓存")
+    parser.add_argument("--offline", action="store_true", help="只从缓存读，不发网络请求")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="只抓 news_raw.csv 里还没有的 URL 和之前失败的 URL，结果追加写入",
+    )
+    parser.add_argument(
+        "--max-retries", type=int, default=MAX_RETRIES, help="增量模式下一个 URL 最多跨几次运行重试"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=BATCH_SIZE, help="每攒多少行落一次盘"
+    )
+    parser.add_argument(
+        "--parse-workers", type=int, default=PARSE_WORKERS, help="解析进程数，默认 CPU 核数，0 表示不开进程池"
+    )
+    parser.add_argument(
+        "--queue-size", type=int, default=QUEUE_SIZE, help="抓取→解析队列容量（背压）"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    global _default_fetcher
+    args = parse_args(argv)
+    cache = None
+    if not args.no_cache:
+        cache = ResponseCache(
+            cache_dir=args.cache_dir,
+            ttl=args.cache_ttl,
+            max_bytes=int(args.cache_max_mb * 1024 ** 2),
+        )
+    elif args.offline:
+        raise SystemExit("--offline needs the cache, drop --no-cache")
+    _default_fetcher = Fetcher(
+        max_workers=args.workers,
+        per_host_rate=args.per_host_rate,
+        per_host_burst=args.per_host_burst,
+        cache=cache,
+        offline=args.offline,
+    )
+
+    out_path = RAW_DIR / "news_raw.csv"
+    state = CrawlState(STATE_PATH)
+    if args.incremental:
+        if len(state) == 0 and out_path.exists():
+            # 第一次用增量模式：用已有 news_raw.csv 的 url 列初始化状态
+            done = pd.read_csv(out_path, usecols=["url"])["url"].dropna()
+            print(f"[info] Seeded crawl state with {state.seed_done(done)} urls from {out_path}")
+            state.flush()
+    else:
+        state.reset()
+
+    writer = CsvBatchWriter(
+        out_path,
+        NEWS_COLUMNS,
+        batch_size=args.batch_size,
+        append=args.incremental,
+        on_flush=state.flush,
+    )
 
-def main():
     cn_url_file = CONFIG_DIR / "cn_urls.txt"
     us_url_file = CONFIG_DIR / "us_urls.txt"
 
-    print(f"[info] Loading CN urls from {cn_url_file}")
-    cn_df = crawl_from_url_file(cn_url_file, country="CN")
-
-    print(f"[info] Loading US urls from {us_url_file}")
-    us_df = crawl_from_url_file(us_url_file, country="US")
-
-    all_df = pd.concat([cn_df, us_df], ignore_index=True)
-    out_path = RAW_DIR / "news_raw.csv"
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    all_df.to_csv(out_path, index=False, encoding="utf-8-sig")
-
-    print("Saved news to", out_path)
-    print(all_df.head())
+    results = {}
+    try:
+        for country, url_file in (("CN", cn_url_file), ("US", us_url_file)):
+            print(f"[info] Loading {country} urls from {url_file}")
+            results[country] = crawl_from_url_file(
+                url_file,
+                country=country,
+                writer=writer,
+                state=state,
+                incremental=args.incremental,
+                max_retries=args.max_retries,
+                parse_workers=args.parse_workers,
+                queue_size=args.queue_size,
+            )
+    finally:
+        # Ctrl-C / 异常时也把已经解析好的行和状态落盘
+        writer.flush()
+
+    for country, (n_ok, n_failed) in results.items():
+        print(f"[info] {country}: ok={n_ok} failed={n_failed}")
+    print(f"Saved {writer.written} news rows to", out_path)
+    if cache is not None:
+        print(f"[info] http cache hits={cache.hits} misses={cache.misses}")
+    failed = state.failed_urls()
+    if failed:
+        print(f"[info] {len(failed)} failed urls recorded in {STATE_PATH}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,61 @@
+# scripts/export_csv.py
+"""
+把 Parquet 中间产物导出成 utf-8-sig CSV（写报告 / 用 Excel 打开时用）
+
+用法:
+    python scripts/export_csv.py all_with_sentiment all_with_clusters
+    python scripts/export_csv.py --all
+    python scripts/export_csv.py --stats all_texts_clean   # 对比两种格式的文件大小和读取耗时
+    python scripts/export_csv.py --memory all_texts_clean  # 读进内存后每列占多少 MB
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from _store import DATASETS, dataset_path, export_csv, memory_report, read_dataset
+
+
+def show_stats(name: str) -> None:
+    pq_path, csv_path = dataset_path(name, "parquet"), dataset_path(name, "csv")
+    if not (pq_path.exists() and csv_path.exists()):
+        print(f"{name}: need both {pq_path.name} and {csv_path.name} for --stats")
+        return
+    t0 = time.perf_counter()
+    pd.read_csv(csv_path)
+    t_csv = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    read_dataset(name)
+    t_pq = time.perf_counter() - t0
+    print(
+        f"{name}: csv {csv_path.stat().st_size / 1024:.0f} KB / {t_csv * 1000:.0f} ms, "
+        f"parquet {pq_path.stat().st_size / 1024:.0f} KB / {t_pq * 1000:.0f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("names", nargs="*", help=f"数据集名：{', '.join(DATASETS)}")
+    parser.add_argument("--all", action="store_true", help="导出所有已有的 Parquet 数据集")
+    parser.add_argument("--stats", action="store_true", help="只比较 CSV / Parquet 的大小和读取耗时")
+    parser.add_argument("--memory", action="store_true", help="只打印读进内存后每列占用的内存")
+    args = parser.parse_args()
+
+    names = args.names
+    if args.all:
+        names = [n for n in DATASETS if dataset_path(n, "parquet").exists()]
+    if not names:
+        parser.error("give dataset names or --all")
+
+    for name in names:
+        if args.stats:
+            show_stats(name)
+        elif args.memory:
+            memory_report(read_dataset(name), name)
+        else:
+            print("Exported", export_csv(name))
+
+
+if __name__ == "__main__":
+    main()
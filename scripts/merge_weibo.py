@@ -1,12 +1,162 @@
 # scripts/merge_weibo.py
+"""
+合并 weibo_output 下所有 csv 到 data/raw/weibo_raw.csv（流式、并行）
+
+- 每个文件只读表头，按表头签名推断 content / date / user_name 对应哪一列，
+  同一种表头只推断一次（不同爬虫工具导出的列名不一样）
+- 真正读数据时用 usecols 只读映射到的列、按 chunksize 分块读，
+  多个文件在进程池里并行读，各自写成分片，最后按文件顺序追加拼到 weibo_raw.csv
+  （用进程不用线程：除了 C 解析器，改列 / fillna / to_csv 都要拿 GIL，线程并行不起来）
+- 峰值内存只跟 chunksize × 并行数有关，跟导出总量无关
+
+用法:
+    python scripts/merge_weibo.py --workers 4 --chunksize 50000
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from glob import glob
+from pathlib import Path
+from typing import Dict, Optional, Tuple
 
 import pandas as pd
 
 from _paths import RAW_DIR, PROJECT_ROOT
 
-
-def merge_weibo():
+OUT_COLUMNS = ["country", "source", "source_type", "date", "user_name", "content"]
+CHUNKSIZE = 50_000
+# 依次尝试的编码：utf-8-sig 同时兼容带 / 不带 BOM 的 utf-8，gb18030 覆盖 Excel 导出的中文 csv
+ENCODINGS = ("utf-8-sig", "gb18030")
+
+
+def _is_content_col(col_str: str, low: str) -> bool:
+    # 典型：content, 微博内容, 微博正文, 正文, 内容
+    return (
+        low == "text"
+        or low == "content"
+        or "content" in low
+        or "微博内容" in col_str
+        or "微博正文" in col_str
+        or (col_str == "正文")
+        or (col_str.endswith("内容") and "转发" not in col_str)
+    )
+
+
+def _is_date_col(col_str: str, low: str) -> bool:
+    # 典型：created_at, publish_time, 发布时间, 发表时间
+    return (
+        low == "created_at"
+        or low == "publish_time"
+        or "time" in low
+        or "date" in low
+        or "发布时间" in col_str
+        or "发表时间" in col_str
+        or col_str == "时间"
+    )
+
+
+def _is_user_col(col_str: str, low: str) -> bool:
+    # 典型：user_name, username, screen_name, 用户昵称, 用户名, 微博作者, 博主昵称
+    return (
+        "user_name" in low
+        or "username" in low
+        or "screen_name" in low
+        or "用户昵称" in col_str
+        or ("昵称" in col_str and "id" not in low)
+        or "微博作者" in col_str
+        or "博主昵称" in col_str
+        or "作者名" in col_str
+    )
+
+
+_RULES = (("content", _is_content_col), ("date", _is_date_col), ("user_name", _is_user_col))
+
+
+@lru_cache(maxsize=None)
+def infer_mapping(columns: Tuple[str, ...]) -> Dict[str, str]:
+    """
+    根据列名做宽松匹配，返回 {原列名: 标准列名}。
+    每列按 content → date → user_name 的顺序判断；每个标准列只取第一个匹配到的原列。
+    以表头元组为键缓存，同一种导出格式在每个进程里只推断一次。
+    """
+    rename_map = {}
+    taken = set()
+    for col in columns:
+        col_str = str(col)
+        low = col_str.lower()
+        for target, rule in _RULES:
+            if rule(col_str, low):
+                if target not in taken:
+                    rename_map[col] = target
+                    taken.add(target)
+                break
+    return rename_map
+
+
+def read_header(path: str) -> Tuple[Optional[Tuple[str, ...]], Optional[str]]:
+    """只读表头，顺便确定文件编码；读不了返回 (None, None)"""
+    for enc in ENCODINGS:
+        try:
+            cols = pd.read_csv(path, nrows=0, encoding=enc).columns
+            return tuple(str(c) for c in cols), enc
+        except UnicodeDecodeError:
+            continue
+        except Exception as e:
+            print("Error reading", path, e)
+            return None, None
+    return None, None
+
+
+def to_standard(chunk: pd.DataFrame, rename_map: Dict[str, str]) -> pd.DataFrame:
+    """导出文件的一块 → OUT_COLUMNS 标准列"""
+    chunk = chunk.rename(columns=rename_map).reindex(columns=OUT_COLUMNS)
+    chunk["country"] = "CN"
+    chunk["source"] = "weibo"
+    chunk["source_type"] = "social"
+    for c in ("date", "user_name", "content"):
+        chunk[c] = chunk[c].fillna("")
+    return chunk
+
+
+def _write_part(path: str, part_path: Path, chunksize: int) -> int:
+    """把一个导出文件按块转换成标准列，写进分片文件（无表头），返回行数"""
+    columns, enc = read_header(path)
+    if columns is None:
+        return 0
+    rename_map = infer_mapping(columns)
+    print("Loaded", path, "rename_map =", rename_map)
+    for c in ("date", "user_name", "content"):
+        if c not in rename_map.values():
+            print(f"[warn] {path}: column '{c}' not found, filled with empty string.")
+
+    n = 0
+    try:
+        reader = pd.read_csv(
+            path,
+            usecols=list(rename_map) or [0],
+            dtype=str,
+            chunksize=chunksize,
+            encoding=enc,
+            encoding_errors="replace",
+        )
+        with open(part_path, "w", encoding="utf-8", newline="") as out:
+            for chunk in reader:
+                chunk = to_standard(chunk, rename_map)
+                chunk.to_csv(out, index=False, header=False)
+                n += len(chunk)
+    except Exception as e:
+        # 一个导出文件坏了（比如最后一行引号没闭合）只跳过这个文件，不影响其余文件的合并
+        print("Error reading", path, e)
+        part_path.unlink(missing_ok=True)
+        return 0
+    return n
+
+
+def merge_weibo(workers: Optional[int] = None, chunksize: int = CHUNKSIZE):
     """
     合并 weibo_output 下所有 csv，并抽取：
     - date      : 微博发布时间
@@ -17,106 +167,56 @@ def merge_weibo():
     country, source, source_type, date, user_name, content
     """
     weibo_dir = PROJECT_ROOT / "weibo_output"
-    files = glob(str(weibo_dir / "*.csv"))
+    files = sorted(glob(str(weibo_dir / "*.csv")))
 
     if not files:
         print("No weibo csv found in", weibo_dir, "— you can skip this step.")
         return
 
-    dfs = []
-    for f in files:
-        try:
-            # 默认读取，如果报错再换编码
-            try:
-                df = pd.read_csv(f)
-            except Exception:
-                df = pd.read_csv(f, encoding="utf-8-sig", errors="ignore")
-            print("Loaded", f, "columns:", list(df.columns))
-            dfs.append(df)
-        except Exception as e:
-            print("Error reading", f, e)
-
-    if not dfs:
+    workers = workers or min(len(files), os.cpu_count() or 1)
+    out_path = RAW_DIR / "weibo_raw.csv"
+    tmp_out = out_path.with_suffix(".csv.tmp")
+
+    total = 0
+    try:
+        with tempfile.TemporaryDirectory(dir=RAW_DIR) as tmp_dir:
+            parts = [Path(tmp_dir) / f"part-{i:05d}.csv" for i in range(len(files))]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(_write_part, f, p, chunksize) for f, p in zip(files, parts)
+                ]
+
+                # 按文件顺序把分片追加到输出；后面的文件可以边读边等前面的拼接
+                with open(tmp_out, "w", encoding="utf-8-sig", newline="") as out:
+                    out.write(",".join(OUT_COLUMNS) + "\n")
+                    for fut, part in zip(futures, parts):
+                        n = fut.result()
+                        if n == 0:
+                            continue
+                        with open(part, "r", encoding="utf-8", newline="") as src:
+                            shutil.copyfileobj(src, out)
+                        part.unlink()
+                        total += n
+        if total > 0:
+            tmp_out.replace(out_path)
+    finally:
+        # 没有有效数据或者中途出错：不留半截的 weibo_raw.csv.tmp
+        tmp_out.unlink(missing_ok=True)
+
+    if total == 0:
         print("No valid weibo csv.")
         return
 
-    weibo_df = pd.concat(dfs, ignore_index=True)
-
-    # ---------- 根据实际列名做更宽松的匹配 ---------- #
-    rename_map = {}
-
-    for col in weibo_df.columns:
-        col_str = str(col)
-        low = col_str.lower()
-
-        # 1) 正文 / 内容列
-        # 典型：content, 微博内容, 微博正文, 正文, 内容
-        if (
-            low == "text"
-            or low == "content"
-            or "content" in low
-            or "微博内容" in col_str
-            or "微博正文" in col_str
-            or (col_str == "正文")
-            or (col_str.endswith("内容") and "转发" not in col_str)  # 排除“转发内容”之类也没关系，其实也算内容
-        ):
-            rename_map[col] = "content"
-            continue
-
-        # 2) 时间 / 日期列
-        # 典型：created_at, publish_time, 发布时间, 发表时间
-        if (
-            low == "created_at"
-            or low == "publish_time"
-            or "time" in low
-            or "date" in low
-            or "发布时间" in col_str
-            or "发表时间" in col_str
-            or col_str == "时间"
-        ):
-            rename_map[col] = "date"
-            continue
-
-        # 3) 用户名 / 昵称列
-        # 典型：user_name, username, screen_name, 用户昵称, 用户名, 微博作者, 博主昵称
-        if (
-            "user_name" in low
-            or "username" in low
-            or "screen_name" in low
-            or "用户昵称" in col_str
-            or ("昵称" in col_str and "id" not in low)
-            or "微博作者" in col_str
-            or "博主昵称" in col_str
-            or "作者名" in col_str
-        ):
-            rename_map[col] = "user_name"
-            continue
-
-    print("rename_map =", rename_map)
-    weibo_df = weibo_df.rename(columns=rename_map)
-
-    # ---------- 补充来源信息 ---------- #
-    weibo_df["country"] = "CN"
-    weibo_df["source"] = "weibo"
-    weibo_df["source_type"] = "social"
-
-    # 确保三列存在（如果真没匹配到就留空）
-    for c in ["date", "user_name", "content"]:
-        if c not in weibo_df.columns:
-            print(f"[warn] column '{c}' not found, filled with empty string.")
-            weibo_df[c] = ""
-
-    cols = ["country", "source", "source_type", "date", "user_name", "content"]
-    weibo_df = weibo_df[cols]
-
-    out_path = RAW_DIR / "weibo_raw.csv"
-    weibo_df.to_csv(out_path, index=False, encoding="utf-8-sig")
-    print("Saved merged weibo to", out_path)
-    print(weibo_df.head())
+    print(f"Saved {total} merged weibo rows to", out_path)
+    print(pd.read_csv(out_path, nrows=5))
 
 
 def main():
-    merge_weibo()
+    parser = argparse.ArgumentParser(description="Merge weibo_output/*.csv into weibo_raw.csv")
+    parser.add_argument("--workers", type=int, default=None, help="并行读取的文件数")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE, help="每块读多少行")
+    args = parser.parse_args()
+    merge_weibo(workers=args.workers, chunksize=args.chunksize)
 
 
 if __name__ == "__main__":
@@ -1,12 +1,17 @@
 # scripts/preprocess_texts.py
-import re
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
 
 import jieba
 import nltk
 import pandas as pd
 from nltk.tokenize import word_tokenize
 
-from _paths import PROCESSED_DIR
+from _store import read_dataset, write_dataset
+from _text_clean import CLEAN_RULES, DEFAULT_CLEANER, WEIBO_RULES, TextCleaner
+from _token_cache import DEFAULT_CACHE_PATH, DEFAULT_MAX_BYTES, TokenCache
+from _token_cache import text_digest, tokenizer_version
 
 # 第一次跑需要下载 punkt，后面如果已经有就不会再下
 try:
@@ -16,19 +21,8 @@ except LookupError:
 
 
 def basic_clean(text: str) -> str:
-    """非常基础的清洗：去 URL、@、#话题、HTML 实体、多余空白"""
-    if not isinstance(text, str):
-        text = str(text)
-
-    # 去 URL
-    text = re.sub(r"http[s]?://\S+", " ", text)
-    # 去 @xxx 和 #话题#
-    text = re.sub(r"[@#]\S+", " ", text)
-    # 英文 html 实体 &nbsp; 等
-    text = re.sub(r"&[a-z]+;", " ", text)
-    # 合并空白
-    text = re.sub(r"\s+", " ", text)
-    return text.strip()
+    """非常基础的清洗：去 URL、@、#话题、HTML 实体、多余空白（单条文本版，规则见 _text_clean）"""
+    return DEFAULT_CLEANER.clean(text)
 
 
 def tokenize_cn(text: str) -> str:
@@ -41,9 +35,129 @@ def tokenize_en(text: str) -> str:
     return " ".join(words)
 
 
-def main():
-    in_path = PROCESSED_DIR / "all_texts.csv"
-    df = pd.read_csv(in_path)
+# ------------------- 多进程分词 -------------------
+
+# 分词进程数（None = CPU 核数）/ 每个任务多少行
+WORKERS = None
+CHUNKSIZE = 2000
+
+
+def _init_worker():
+    """每个子进程启动时把 jieba 词典和 punkt 各加载一次，后面的任务直接复用"""
+    jieba.setLogLevel(60)
+    jieba.initialize()
+    word_tokenize("warm up")
+
+
+def _process_chunk(task):
+    """一个任务 = 同一种语言的一批已清洗文本，返回分词结果列表"""
+    lang, texts = task
+    tokenize = tokenize_cn if lang == "CN" else tokenize_en
+    return [tokenize(t) for t in texts]
+
+
+def _tokenize_all(cleaned, langs, workers, chunksize):
+    """对 cleaned 里非空的行分词，返回等长的 tokens 列表（空行为空串）"""
+    tasks, index_chunks = [], []
+    for lang in ("CN", "EN"):
+        idx = [i for i, l in enumerate(langs) if l == lang and cleaned[i]]
+        for start in range(0, len(idx), chunksize):
+            chunk = idx[start:start + chunksize]
+            tasks.append((lang, [cleaned[i] for i in chunk]))
+            index_chunks.append(chunk)
+
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(tasks)) if tasks else 1
+    if workers <= 1:
+        results = map(_process_chunk, tasks)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+        results = pool.map(_process_chunk, tasks)
+
+    tokens = [""] * len(cleaned)
+    try:
+        for chunk, res in zip(index_chunks, results):
+            for i, tok in zip(chunk, res):
+                tokens[i] = tok
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return tokens
+
+
+def clean_and_tokenize(
+    contents,
+    countries,
+    workers=WORKERS,
+    chunksize=CHUNKSIZE,
+    cleaner=DEFAULT_CLEANER,
+    cache=None,
+):
+    """
+    清洗 + 分词，返回 (cleaned, tokens) 两个与输入等长、同顺序的列表。
+    - 清洗对整列一次做完（cleaner.clean_series），清洗后为空的行不分词
+    - CN 行走 jieba，其余走 nltk；按语言分组后切成 chunksize 行的任务
+    - workers > 1 时用进程池并行，每个进程只加载一次词典；workers = 1 就在当前进程里跑
+    - 传入 cache（_token_cache.TokenCache）时，命中的行直接用缓存结果，
+      只有没见过的文本才清洗 + 分词，算完再写回缓存
+    """
+    contents = [c if isinstance(c, str) else str(c) for c in contents]
+    langs = ["CN" if str(c).upper() == "CN" else "EN" for c in countries]
+    n = len(contents)
+    cleaned, tokens = [""] * n, [""] * n
+
+    todo = list(range(n))
+    if cache is not None:
+        digests = [text_digest(c) for c in contents]
+        versions = {l: tokenizer_version(l, cleaner.pattern) for l in set(langs)}
+        hits = {
+            l: cache.get_many(l, v, (digests[i] for i in todo if langs[i] == l))
+            for l, v in versions.items()
+        }
+        todo = []
+        for i in range(n):
+            hit = hits[langs[i]].get(digests[i])
+            if hit is None:
+                todo.append(i)
+            else:
+                cleaned[i], tokens[i] = hit
+
+    if todo:
+        sub_clean = cleaner.clean_series(pd.Series([contents[i] for i in todo], dtype=object))
+        sub_clean = sub_clean.tolist()
+        sub_tokens = _tokenize_all(sub_clean, [langs[i] for i in todo], workers, chunksize)
+        for i, c, t in zip(todo, sub_clean, sub_tokens):
+            cleaned[i], tokens[i] = c, t
+
+    if cache is not None:
+        for l, v in versions.items():
+            cache.put_many(
+                l, v, ((digests[i], cleaned[i], tokens[i]) for i in todo if langs[i] == l)
+            )
+    return cleaned, tokens
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clean and tokenize all_texts")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="分词进程数，默认 CPU 核数")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE, help="每个分词任务的行数")
+    parser.add_argument(
+        "--weibo-rules", action="store_true", help="额外去掉“展开全文”“来源：”等微博样板文字"
+    )
+    parser.add_argument(
+        "--token-cache", default=str(DEFAULT_CACHE_PATH), help="分词缓存（sqlite）路径"
+    )
+    parser.add_argument(
+        "--token-cache-max-mb",
+        type=float,
+        default=DEFAULT_MAX_BYTES / 1024 ** 2,
+        help="分词缓存大小上限，超过按最近访问时间淘汰",
+    )
+    parser.add_argument("--no-token-cache", action="store_true", help="不读写分词缓存，全部重算")
+    args = parser.parse_args(argv)
+
+    df = read_dataset("all_texts")
 
     # 保证有 content / country 两列
     if "content" not in df.columns:
@@ -53,36 +167,33 @@ def main():
         df["country"] = "CN"
 
     # 统一转成字符串，去掉 NaN
-    df["content"] = df["content"].astype(str).fillna("")
-    df["country"] = df["country"].astype(str).fillna("")
-
-    cleaned = []
-    tokens = []
-
-    for content, country in zip(df["content"], df["country"]):
-        txt = basic_clean(content)
-        # 如果清洗后完全空，就直接记空
-        if not txt:
-            cleaned.append("")
-            tokens.append("")
-            continue
-
-        if country.upper() == "CN":
-            tok = tokenize_cn(txt)
-        else:
-            tok = tokenize_en(txt)
-
-        cleaned.append(txt)
-        tokens.append(tok)
-
+    df["content"] = df["content"].astype("string").fillna("")
+    df["country"] = df["country"].astype("string").fillna("")
+
+    cleaner = TextCleaner({**CLEAN_RULES, **WEIBO_RULES}) if args.weibo_rules else DEFAULT_CLEANER
+    cache = None
+    if not args.no_token_cache:
+        cache = TokenCache(args.token_cache, max_bytes=int(args.token_cache_max_mb * 1024 ** 2))
+    try:
+        cleaned, tokens = clean_and_tokenize(
+            df["content"],
+            df["country"],
+            workers=args.workers,
+            chunksize=args.chunksize,
+            cleaner=cleaner,
+            cache=cache,
+        )
+    finally:
+        if cache is not None:
+            print("[info] token cache:", cache.stats())
+            cache.close()
     df["clean_content"] = cleaned
     df["tokens"] = tokens
 
     # 删掉清洗后仍然是空的行
     df = df[df["clean_content"] != ""].reset_index(drop=True)
 
-    out_path = PROCESSED_DIR / "all_texts_clean.csv"
-    df.to_csv(out_path, index=False, encoding="utf-8-sig")
+    out_path = write_dataset(df, "all_texts_clean")
     print("Saved cleaned texts to", out_path)
     print(df[["country", "clean_content", "tokens"]].head())
 
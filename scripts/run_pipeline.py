@@ -0,0 +1,365 @@
+# scripts/run_pipeline.py
+"""
+一键跑整条流水线，输入没变的阶段自动跳过
+
+每个阶段声明：脚本、输入、输出、参数。阶段指纹 = sha256(
+    脚本源码 + 它 import 的 scripts/_*.py 辅助模块源码 + 参数 + 所有输入文件的内容哈希)。
+指纹和上次一样、输出文件也和上次跑完时一样，就跳过这个阶段。
+上游重跑后输出内容没变（哈希相同）时，下游也不会被牵连重跑。
+互不依赖的阶段（比如情感分析和聚类）并行跑。
+
+状态存在 data/.pipeline_state.json，每个阶段的输出日志在 data/processed/logs/<阶段>.log。
+
+用法:
+    python scripts/run_pipeline.py                       # 跑所有需要跑的阶段
+    python scripts/run_pipeline.py --dry-run             # 只看哪些阶段会跑
+    python scripts/run_pipeline.py --set analysis_traditional_nlp.k=6
+    python scripts/run_pipeline.py sentiment_bert --force
+    python scripts/run_pipeline.py crawl_news merge_weibo build_dataset   # 抓取只在点名时跑
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from _paths import CONFIG_DIR, DATA_DIR, FIG_DIR, PROCESSED_DIR, PROJECT_ROOT, RAW_DIR
+from _store import dataset_path
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+STATE_PATH = DATA_DIR / ".pipeline_state.json"
+LOG_DIR = PROCESSED_DIR / "logs"
+
+
+def ds(name: str) -> Path:
+    """Parquet 数据集路径（_store 写出的文件）"""
+    return dataset_path(name, "parquet")
+
+
+@dataclass
+class Stage:
+    name: str
+    script: str
+    inputs: List[Path] = field(default_factory=list)
+    outputs: List[Path] = field(default_factory=list)
+    # 参数：键会变成 --键 值 传给脚本，None 表示用脚本里的默认值
+    params: Dict[str, object] = field(default_factory=dict)
+    # 只打印统计结果的阶段：日志本身就是输出
+    report: bool = False
+    # 要联网 / 很贵的阶段：只有在命令行点名时才跑，否则把它的输出当作现成的输入
+    manual: bool = False
+
+    @property
+    def log_path(self) -> Path:
+        return LOG_DIR / f"{self.name}.log"
+
+    def all_outputs(self) -> List[Path]:
+        return self.outputs + ([self.log_path] if self.report else [])
+
+    def argv(self) -> List[str]:
+        args = []
+        for key, value in sorted(self.params.items()):
+            if value is None:
+                continue
+            args += [f"--{key.replace('_', '-')}", str(value)]
+        return args
+
+
+STAGES: List[Stage] = [
+    Stage(
+        "crawl_news",
+        "crawl_news.py",
+        inputs=[CONFIG_DIR / "cn_urls.txt", CONFIG_DIR / "us_urls.txt"],
+        outputs=[RAW_DIR / "news_raw.csv"],
+        manual=True,
+    ),
+    Stage(
+        "merge_weibo",
+        "merge_weibo.py",
+        inputs=[PROJECT_ROOT / "weibo_output"],
+        outputs=[RAW_DIR / "weibo_raw.csv"],
+    ),
+    Stage(
+        "build_dataset",
+        "build_dataset.py",
+        inputs=[RAW_DIR / "news_raw.csv", RAW_DIR / "weibo_raw.csv"],
+        outputs=[ds("all_texts"), ds("all_texts_duplicates")],
+        params={"dedup_threshold": None, "date_ref": None},
+    ),
+    Stage(
+        "preprocess_texts",
+        "preprocess_texts.py",
+        inputs=[ds("all_texts")],
+        outputs=[ds("all_texts_clean")],
+    ),
+    Stage(
+        "sentiment_bert",
+        "sentiment_bert.py",
+        inputs=[ds("all_texts_clean")],
+        outputs=[ds("all_with_sentiment")],
+        params={"ch_model": None, "en_model": None, "backend": None},
+    ),
+    Stage(
+        "analysis_traditional_nlp",
+        "analysis_traditional_nlp.py",
+        inputs=[ds("all_texts_clean")],
+        outputs=[ds("all_with_clusters"), FIG_DIR / "clusters_pca.png"],
+        params={"k": None},
+    ),
+    Stage(
+        "us_topic_mini",
+        "us_topic_mini.py",
+        inputs=[ds("all_texts_clean")],
+        outputs=[ds("us_news_topics"), dataset_path("us_news_topics", "csv")],
+        params={"k": None},
+    ),
+    Stage(
+        "stats",
+        "stats.py",
+        inputs=[ds("all_texts"), ds("all_with_clusters"), ds("all_with_sentiment")],
+        report=True,
+    ),
+]
+
+
+# ------------------- 哈希 -------------------
+
+
+class Hasher:
+    """文件内容哈希，按 (size, mtime_ns) 缓存，没改过的大文件不重复读"""
+
+    def __init__(self, cache: Optional[dict] = None):
+        self.cache = cache or {}
+
+    def file(self, path: Path) -> str:
+        if path.is_dir():
+            h = hashlib.sha256()
+            for p in sorted(path.rglob("*")):
+                if p.is_file():
+                    h.update(str(p.relative_to(path)).encode("utf-8"))
+                    h.update(self.file(p).encode("ascii"))
+            return h.hexdigest()
+        if not path.exists():
+            return "missing"
+        st = path.stat()
+        key = str(path)
+        sig = [st.st_size, st.st_mtime_ns]
+        cached = self.cache.get(key)
+        if cached and cached[0] == sig:
+            return cached[1]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        digest = h.hexdigest()
+        self.cache[key] = [sig, digest]
+        return digest
+
+
+_LOCAL_IMPORT_RE = re.compile(r"^\s*(?:from|import)\s+(_\w+)", re.M)
+
+
+def code_deps(script: str) -> List[Path]:
+    """脚本本身 + 递归 import 到的 scripts/_*.py 辅助模块"""
+    seen, todo = [], [SCRIPTS_DIR / script]
+    while todo:
+        path = todo.pop()
+        if path in seen or not path.exists():
+            continue
+        seen.append(path)
+        for mod in _LOCAL_IMPORT_RE.findall(path.read_text(encoding="utf-8")):
+            todo.append(SCRIPTS_DIR / f"{mod}.py")
+    return sorted(seen)
+
+
+def fingerprint(stage: Stage, hasher: Hasher) -> str:
+    h = hashlib.sha256()
+    for path in code_deps(stage.script):
+        h.update(path.name.encode("utf-8"))
+        h.update(hasher.file(path).encode("ascii"))
+    h.update(json.dumps(stage.params, sort_keys=True, default=str).encode("utf-8"))
+    for path in stage.inputs:
+        h.update(str(path.relative_to(PROJECT_ROOT)).encode("utf-8"))
+        h.update(hasher.file(path).encode("ascii"))
+    return h.hexdigest()
+
+
+def output_hashes(stage: Stage, hasher: Hasher) -> Dict[str, str]:
+    return {str(p.relative_to(PROJECT_ROOT)): hasher.file(p) for p in stage.all_outputs()}
+
+
+# ------------------- 调度 -------------------
+
+
+def dependencies(stages: List[Stage]) -> Dict[str, List[str]]:
+    """某阶段的输入是另一个阶段的输出，就依赖它"""
+    producer = {p: s.name for s in stages for p in s.all_outputs()}
+    return {
+        s.name: sorted({producer[p] for p in s.inputs if p in producer and producer[p] != s.name})
+        for s in stages
+    }
+
+
+def run_stage(stage: Stage) -> Tuple[int, float]:
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    cmd = [sys.executable, str(SCRIPTS_DIR / stage.script)] + stage.argv()
+    t0 = time.perf_counter()
+    with open(stage.log_path, "w", encoding="utf-8") as log:
+        proc = subprocess.run(cmd, cwd=PROJECT_ROOT, stdout=log, stderr=subprocess.STDOUT)
+    return proc.returncode, time.perf_counter() - t0
+
+
+def load_state() -> dict:
+    if STATE_PATH.exists():
+        try:
+            return json.loads(STATE_PATH.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            pass
+    return {"stages": {}, "hashes": {}}
+
+
+def save_state(state: dict) -> None:
+    tmp = STATE_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=1, ensure_ascii=False), encoding="utf-8")
+    tmp.replace(STATE_PATH)
+
+
+def run_pipeline(
+    selected: Optional[List[str]] = None,
+    force: bool = False,
+    dry_run: bool = False,
+    jobs: int = 4,
+    overrides: Optional[Dict[str, Dict[str, str]]] = None,
+) -> bool:
+    stages = {s.name: s for s in STAGES}
+    for name, params in (overrides or {}).items():
+        stages[name].params.update(params)
+
+    selected = set(selected or [n for n, s in stages.items() if not s.manual])
+    deps = dependencies(list(stages.values()))
+    state = load_state()
+    hasher = Hasher(state.get("hashes"))
+
+    done: Dict[str, str] = {}  # 阶段名 -> "ran" / "skipped" / "failed" / "would-run"
+    pending = [n for n in stages if n in selected]
+    running = {}
+    ok = True
+
+    def ready(name: str) -> bool:
+        return all(d in done or d not in selected for d in deps[name])
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while pending or running:
+            for name in [n for n in pending if ready(n)]:
+                pending.remove(name)
+                stage = stages[name]
+                if any(done.get(d) == "failed" for d in deps[name]):
+                    print(f"[skip] {name}: upstream failed")
+                    done[name] = "failed"
+                    continue
+                if any(done.get(d) == "would-run" for d in deps[name]):
+                    # dry-run 里上游没真跑，输入还是旧的，指纹说明不了什么：上游要跑，它也算要跑
+                    print(f"[would run] {name}: upstream would run")
+                    done[name] = "would-run"
+                    continue
+                fp = fingerprint(stage, hasher)
+                prev = state["stages"].get(name, {})
+                fresh = (
+                    prev.get("fingerprint") == fp
+                    and prev.get("outputs") == output_hashes(stage, hasher)
+                )
+                if fresh and not force:
+                    print(f"[up-to-date] {name}")
+                    done[name] = "skipped"
+                    continue
+                if dry_run:
+                    print(f"[would run] {name}")
+                    done[name] = "would-run"
+                    continue
+                print(f"[run] {name} {' '.join(stage.argv())}".rstrip())
+                running[pool.submit(run_stage, stage)] = (name, fp)
+
+            if not running:
+                if pending and any(ready(n) for n in pending):
+                    continue
+                break
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in finished:
+                name, fp = running.pop(fut)
+                stage = stages[name]
+                code, dt = fut.result()
+                if code != 0:
+                    ok = False
+                    done[name] = "failed"
+                    print(f"[failed] {name} (exit {code}, {dt:.1f}s), see {stage.log_path}")
+                    continue
+                done[name] = "ran"
+                state["stages"][name] = {
+                    "fingerprint": fp,
+                    "outputs": output_hashes(stage, hasher),
+                    "seconds": round(dt, 2),
+                    "finished": time.strftime("%Y-%m-%d %H:%M:%S"),
+                }
+                state["hashes"] = hasher.cache
+                save_state(state)
+                print(f"[done] {name} ({dt:.1f}s)")
+
+    if not dry_run:
+        state["hashes"] = hasher.cache
+        save_state(state)
+    return ok
+
+
+def parse_overrides(items: List[str]) -> Dict[str, Dict[str, str]]:
+    overrides: Dict[str, Dict[str, str]] = {}
+    names = {s.name for s in STAGES}
+    for item in items:
+        key, _, value = item.partition("=")
+        stage, _, param = key.partition(".")
+        if stage not in names or not param or not _:
+            raise SystemExit(f"bad --set {item!r}, expected <stage>.<param>=<value>")
+        overrides.setdefault(stage, {})[param] = value
+    return overrides
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the pipeline, skipping unchanged stages")
+    parser.add_argument("stages", nargs="*", help="只跑这些阶段（默认全部）")
+    parser.add_argument("--force", action="store_true", help="选中的阶段不管指纹都重跑")
+    parser.add_argument("--dry-run", action="store_true", help="只打印哪些阶段会跑")
+    parser.add_argument("--jobs", type=int, default=4, help="最多同时跑几个阶段")
+    parser.add_argument(
+        "--set", action="append", default=[], metavar="STAGE.PARAM=VALUE", help="覆盖阶段参数"
+    )
+    parser.add_argument("--list", action="store_true", help="列出所有阶段及依赖")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        deps = dependencies(STAGES)
+        for s in STAGES:
+            after = f"  (after {', '.join(deps[s.name])})" if deps[s.name] else ""
+            print(f"{s.name:26s} {s.script}{after}")
+        return
+
+    unknown = set(args.stages) - {s.name for s in STAGES}
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    ok = run_pipeline(
+        selected=args.stages or None,
+        force=args.force,
+        dry_run=args.dry_run,
+        jobs=args.jobs,
+        overrides=parse_overrides(args.set),
+    )
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,28 @@
 # scripts/sentiment_bert.py
-import pandas as pd
-import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+import argparse
+import os
+import sys
+from pathlib import Path
+
 from tqdm import tqdm
 
-from _paths import PROCESSED_DIR
+from _sentiment_backends import (
+    ARTIFACT_DIR,
+    BACKENDS,
+    as_runner,
+    load_backend,
+    model_revision,
+    softmax,
+)
+from _sentiment_cache import DEFAULT_CACHE_PATH, SentimentCache, model_key
+from _sentiment_shards import run_sharded
+from _store import read_dataset, write_dataset
+from _token_cache import text_digest
 
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+# 推理后端：torch / int8 / onnx / onnx-int8（见 _sentiment_backends）
+BACKEND = "torch"
+# 推理进程数；1 = 在当前进程里跑（见 _sentiment_shards）
+WORKERS = 1
 
 
 # ====== 根据自己需要换成别的模型 ====== #
@@ -14,61 +30,277 @@ CH_MODEL_NAME = "uer/roberta-base-finetuned-jd-binary-chinese"
 EN_MODEL_NAME = "distilbert-base-uncased-finetuned-sst-2-english"
 # ================================== #
 
-print("Loading CN model:", CH_MODEL_NAME)
-ch_tokenizer = AutoTokenizer.from_pretrained(CH_MODEL_NAME)
-ch_model = AutoModelForSequenceClassification.from_pretrained(CH_MODEL_NAME).to(device)
 
-print("Loading EN model:", EN_MODEL_NAME)
-en_tokenizer = AutoTokenizer.from_pretrained(EN_MODEL_NAME)
-en_model = AutoModelForSequenceClassification.from_pretrained(EN_MODEL_NAME).to(device)
+# 离线机器：把模型提前下载到这个目录，子目录名 = 模型名里的 "/" 换成 "--"
+# （例如 models/uer--roberta-base-finetuned-jd-binary-chinese），找到就不联网
+MODEL_DIR = os.environ.get("SENTIMENT_MODEL_DIR")
+
+
+def resolve_model(name, model_dir=MODEL_DIR):
+    """模型名 → 实际加载路径：本身就是目录就直接用，其次找 model_dir 下的同名目录，否则原样返回"""
+    if Path(name).is_dir():
+        return str(name)
+    if model_dir:
+        local = Path(model_dir) / name.replace("/", "--")
+        if local.is_dir():
+            return str(local)
+    return name
+
+
+class ModelRegistry:
+    """
+    语言 → 模型名，第一次 get(lang) 时才加载。
+    CN-only 的数据只会加载中文模型，US-only 只会加载英文模型。
+    """
+
+    def __init__(
+        self, names, model_dir=MODEL_DIR, offline=False, backend=BACKEND, artifact_dir=ARTIFACT_DIR
+    ):
+        self.names = dict(names)
+        self.model_dir = model_dir
+        self.offline = offline
+        self.backend = backend
+        self.artifact_dir = artifact_dir
+        self.loaded = []
+        self.revisions = {}
+
+    def get(self, lang):
+        """返回 (tokenizer, runner)"""
+        path = resolve_model(self.names[lang], self.model_dir)
+        self.revision(lang)
+        if path not in self.loaded:
+            print(f"Loading {lang} model ({self.backend}):", path)
+            self.loaded.append(path)
+        return load_backend(
+            path, self.backend, local_files_only=self.offline, root=self.artifact_dir
+        )
+
+    def spec(self, lang):
+        """交给分片 worker 进程的加载参数：(模型路径, 后端, offline, 产物目录)"""
+        path = resolve_model(self.names[lang], self.model_dir)
+        if path not in self.loaded:
+            self.loaded.append(path)
+        return path, self.backend, self.offline, self.artifact_dir
+
+    def revision(self, lang):
+        """
+        模型版本，每种语言只解析一次（在加载模型之前）：之后下载模型也不会变，
+        缓存的查 / 写 / prune 和量化 / ONNX 产物目录都用这一个
+        """
+        if lang not in self.revisions:
+            path = resolve_model(self.names[lang], self.model_dir)
+            self.revisions[lang] = model_revision(path, local_files_only=self.offline)
+        return self.revisions[lang]
+
+    def cache_key(self, lang, max_length):
+        """结果缓存用的模型键：模型名 @ 版本 | 后端 | max_length（不需要加载模型）"""
+        return model_key(self.names[lang], self.revision(lang), self.backend, max_length)
+
+
+def peak_rss_mb():
+    """进程峰值 RSS（MB）；没有 resource 模块（Windows）时返回 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss 在 Linux 上单位是 KB，macOS 上是字节
+    return rss / 1024 ** 2 if sys.platform == "darwin" else rss / 1024
+
 
+# 每批最多多少条 / 每批 padding 后最多多少个 token（batch 行数 × 本批最长长度）
+MAX_LENGTH = 256
+BATCH_SIZE = 32
+MAX_TOKENS = 8192
 
-def predict_sentiment(texts, tokenizer, model):
+
+def make_batches(lengths, batch_size=BATCH_SIZE, max_tokens=MAX_TOKENS):
+    """
+    按长度从长到短排好，再顺序切批：条数到 batch_size，或者 padding 后的 token 数
+    （条数 × 本批最长）超过 max_tokens 就开新的一批。返回 [[下标, ...], ...]
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True)
+    batches, cur, cur_max = [], [], 0
+    for i in order:
+        longest = max(cur_max, lengths[i])
+        if cur and (len(cur) >= batch_size or (len(cur) + 1) * longest > max_tokens):
+            batches.append(cur)
+            cur, longest = [], lengths[i]
+        cur.append(i)
+        cur_max = longest
+    if cur:
+        batches.append(cur)
+    return batches
+
+
+def predict_sentiment(
+    texts,
+    tokenizer,
+    runner,
+    batch_size=BATCH_SIZE,
+    max_tokens=MAX_TOKENS,
+    max_length=MAX_LENGTH,
+):
     """
-    返回 [(label, prob), ...]
+    返回 [(label, prob), ...]，与 texts 等长、同顺序；空文本返回 (None, None)
     label 一般 0=负向, 1=正向（具体看模型文档）
+
+    先一次性分词（截断到 max_length，不 padding），按长度分桶组 batch，
+    每批只 pad 到本批最长的那条，算完再按原顺序放回。
+    runner 是 _sentiment_backends 里的任一后端，也可以直接传 PyTorch 模型。
     """
-    results = []
-    model.eval()
-    for t in tqdm(texts, desc="Sentiment predicting"):
-        if not isinstance(t, str) or t.strip() == "":
-            results.append((None, None))
-            continue
-        with torch.no_grad():
-            inputs = tokenizer(
-                t,
-                truncation=True,
-                padding="max_length",
-                max_length=256,
-                return_tensors="pt",
-            ).to(device)
-            logits = model(**inputs).logits
-            prob = torch.softmax(logits, dim=-1).cpu().numpy()[0]
-            label = int(prob.argmax())
-            results.append((label, float(prob[label])))
+    results = [(None, None)] * len(texts)
+    valid = [i for i, t in enumerate(texts) if isinstance(t, str) and t.strip() != ""]
+    if not valid:
+        return results
+
+    enc = tokenizer(
+        [texts[i] for i in valid], truncation=True, max_length=max_length, padding=False
+    )
+    features = [{k: enc[k][j] for k in enc.keys()} for j in range(len(valid))]
+    lengths = [len(f["input_ids"]) for f in features]
+
+    runner = as_runner(runner)
+    with tqdm(total=len(valid), desc="Sentiment predicting") as bar:
+        for batch in make_batches(lengths, batch_size, max_tokens):
+            inputs = tokenizer.pad([features[j] for j in batch], return_tensors="pt")
+            prob = softmax(runner(dict(inputs)))
+            labels = prob.argmax(axis=-1)
+            for j, label, p in zip(batch, labels, prob):
+                results[valid[j]] = (int(label), float(p[label]))
+            bar.update(len(batch))
     return results
 
 
-def main():
-    in_path = PROCESSED_DIR / "all_texts_clean.csv"
-    df = pd.read_csv(in_path)
+def cached_lookup(texts, lang, registry, cache, max_length=MAX_LENGTH):
+    """
+    查结果缓存，返回 (results, todo)：results 里命中的已经填好、空文本是 (None, None)，
+    todo 是还需要送进模型的下标
+    """
+    results = [(None, None)] * len(texts)
+    todo = [i for i, t in enumerate(texts) if isinstance(t, str) and t.strip() != ""]
+    if cache is None or not todo:
+        return results, todo
+    digests = {i: text_digest(texts[i]) for i in todo}
+    hits = cache.get_many(registry.cache_key(lang, max_length), digests.values())
+    remaining = []
+    for i in todo:
+        hit = hits.get(digests[i])
+        if hit is None:
+            remaining.append(i)
+        else:
+            results[i] = hit
+    return results, remaining
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="BERT sentiment for CN / US texts")
+    parser.add_argument("--ch-model", default=CH_MODEL_NAME, help="中文情感模型")
+    parser.add_argument("--en-model", default=EN_MODEL_NAME, help="英文情感模型")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="每批最多多少条")
+    parser.add_argument(
+        "--max-tokens", type=int, default=MAX_TOKENS, help="每批 padding 后最多多少个 token"
+    )
+    parser.add_argument("--max-length", type=int, default=MAX_LENGTH, help="单条截断长度")
+    parser.add_argument(
+        "--model-dir", default=MODEL_DIR, help="本地模型目录（也可以用环境变量 SENTIMENT_MODEL_DIR）"
+    )
+    parser.add_argument("--offline", action="store_true", help="只从本地 / HF 缓存加载模型，不联网")
+    parser.add_argument("--backend", choices=BACKENDS, default=BACKEND, help="推理后端")
+    parser.add_argument(
+        "--artifact-dir", default=str(ARTIFACT_DIR), help="量化 / ONNX 导出产物的缓存目录"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=WORKERS, help="推理进程数，>1 时分片并行、CN / US 同时跑"
+    )
+    parser.add_argument(
+        "--threads", type=int, default=None, help="每个推理进程的 torch 线程数，默认 CPU 核数 / 进程数"
+    )
+    parser.add_argument(
+        "--shard-size", type=int, default=None, help="每个分片多少条，默认每个进程一个分片"
+    )
+    parser.add_argument(
+        "--cache", default=str(DEFAULT_CACHE_PATH), help="情感结果缓存（sqlite）路径"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="不读写结果缓存，全部重算")
+    parser.add_argument(
+        "--prune-cache", action="store_true", help="删掉缓存里不是当前模型 / 后端的旧结果"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    df = read_dataset("all_texts_clean")
+    country = df["country"].astype("string").str.upper()
+    masks = {"CN": country == "CN", "US": country == "US"}
+    print("CN texts:", int(masks["CN"].sum()), "US texts:", int(masks["US"].sum()))
 
-    cn_mask = df["country"].str.upper() == "CN"
-    us_mask = df["country"].str.upper() == "US"
+    df["sentiment_label"] = None
+    df["sentiment_conf"] = None
+    registry = ModelRegistry(
+        {"CN": args.ch_model, "US": args.en_model},
+        model_dir=args.model_dir,
+        offline=args.offline,
+        backend=args.backend,
+        artifact_dir=Path(args.artifact_dir),
+    )
+    opts = dict(batch_size=args.batch_size, max_tokens=args.max_tokens, max_length=args.max_length)
+    cache = None if args.no_cache else SentimentCache(args.cache)
+    try:
+        # 1) 查缓存，得到每种语言还要送进模型的文本
+        pending = {}
+        for lang, mask in masks.items():
+            texts = df.loc[mask, "clean_content"].fillna("").tolist()
+            if not any(t.strip() for t in texts):
+                # 这种语言没有要打分的文本，就不加载它的模型
+                continue
+            results, todo = cached_lookup(texts, lang, registry, cache, args.max_length)
+            pending[lang] = (mask, texts, results, todo)
 
-    cn_texts = df.loc[cn_mask, "clean_content"].fillna("").tolist()
-    us_texts = df.loc[us_mask, "clean_content"].fillna("").tolist()
+        # 2) 只对没命中的文本推理：单进程逐语言跑，或者多进程分片、CN / US 同时跑
+        todo_texts = {
+            lang: [texts[i] for i in todo] for lang, (_, texts, _, todo) in pending.items() if todo
+        }
+        if args.workers > 1 and todo_texts:
+            preds = run_sharded(
+                todo_texts,
+                {lang: registry.spec(lang) for lang in todo_texts},
+                workers=args.workers,
+                threads=args.threads,
+                shard_size=args.shard_size,
+                **opts,
+            )
+        else:
+            preds = {}
+            for lang, texts in todo_texts.items():
+                tokenizer, runner = registry.get(lang)
+                preds[lang] = predict_sentiment(texts, tokenizer, runner, **opts)
 
-    print("CN texts:", len(cn_texts), "US texts:", len(us_texts))
+        # 3) 合并结果、写回缓存
+        for lang, (mask, texts, results, todo) in pending.items():
+            for i, res in zip(todo, preds.get(lang, [])):
+                results[i] = res
+            if cache is not None:
+                key = registry.cache_key(lang, args.max_length)
+                cache.put_many(key, ((text_digest(texts[i]), *results[i]) for i in todo))
+            df.loc[mask, ["sentiment_label", "sentiment_conf"]] = results
 
-    cn_res = predict_sentiment(cn_texts, ch_tokenizer, ch_model)
-    us_res = predict_sentiment(us_texts, en_tokenizer, en_model)
+        if cache is not None:
+            print("[info] sentiment cache:", cache.stats())
+            if args.prune_cache:
+                keep = [registry.cache_key(lang, args.max_length) for lang in masks]
+                print(f"[info] pruned {cache.prune(keep)} stale cached results")
+    finally:
+        if cache is not None:
+            cache.close()
 
-    df.loc[cn_mask, ["sentiment_label", "sentiment_conf"]] = cn_res
-    df.loc[us_mask, ["sentiment_label", "sentiment_conf"]] = us_res
+    rss = peak_rss_mb()
+    rss = "n/a" if rss is None else f"{rss:.0f} MB"
+    print(f"[info] models loaded: {len(registry.loaded)}, peak RSS {rss}")
 
-    out_path = PROCESSED_DIR / "all_with_sentiment.csv"
-    df.to_csv(out_path, index=False, encoding="utf-8-sig")
+    out_path = write_dataset(df, "all_with_sentiment")
     print("Saved sentiment results to", out_path)
 
     # 你可以顺手看一下中美情绪分布
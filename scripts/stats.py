@@ -0,0 +1,131 @@
+# scripts/stats.py
+"""
+统计报表（cal.py / cal2.py / cal_us.py / sent_stats.py 现在都只是调用这里的 --report）
+
+数据只读一次：country / source_type / cluster / sentiment_label 四列建成 group-by 立方体（_cube.py），
+所有报表和自定义切片都在立方体上算。cal 和原来一样按 all_texts 计数，单独读一次那两列。
+
+用法:
+    python scripts/stats.py                                  # 全部预设报表
+    python scripts/stats.py --report cal_us sent_stats       # 只看某几个
+    python scripts/stats.py --by source_type cluster --where country=CN --normalize
+    python scripts/stats.py --by country sentiment_label --export data/processed/sent_by_country.csv
+    python scripts/stats.py --cube data/processed/stats_cube.csv   # 导出整个立方体
+    python scripts/stats.py --period W --by period sentiment_label --where country=CN --normalize
+"""
+
+import argparse
+
+from _cube import DIMENSIONS, Cube
+from _store import exists
+
+# 预设报表：名字 -> [(标题, by, where, normalize), ...]，和原来四个脚本打印的内容一一对应
+# （数字相同；计数按维度值排序，不再按个数从多到少）
+REPORTS = {
+    "cal": [
+        ("country", ["country"], {}, False),
+        ("source_type", ["source_type"], {}, False),
+        ("country x source_type", ["country", "source_type"], {}, False),
+    ],
+    "cal2": [
+        ("CN cluster", ["cluster"], {"country": "CN"}, False),
+        ("CN source_type -> cluster (share)", ["source_type", "cluster"], {"country": "CN"}, True),
+    ],
+    "cal_us": [
+        ("US 新闻条数", [], {"country": "US"}, False),
+        ("US 按 cluster 计数", ["cluster"], {"country": "US"}, False),
+        ("US 按 cluster 占比", ["cluster"], {"country": "US"}, True),
+        ("US 情感 label 分布", ["sentiment_label"], {"country": "US"}, False),
+        ("US 情感 label 占比", ["sentiment_label"], {"country": "US"}, True),
+    ],
+    "sent_stats": [
+        (f"{name} {kind}", ["sentiment_label"], where, normalize)
+        for name, where in [
+            ("CN overall", {"country": "CN"}),
+            ("US overall", {"country": "US"}),
+            ("CN news", {"country": "CN", "source_type": "news"}),
+            ("CN social", {"country": "CN", "source_type": "social"}),
+        ]
+        for kind, normalize in [("count", False), ("share", True)]
+    ],
+}
+
+
+# 不用默认立方体（all_with_clusters + 情感）的报表：名字 -> 数据集
+REPORT_DATASETS = {"cal": "all_texts"}
+
+
+def parse_where(items):
+    where = {}
+    for item in items:
+        dim, sep, value = item.partition("=")
+        if not sep or dim not in DIMENSIONS:
+            raise SystemExit(f"bad --where {item!r}, expected <dim>=<value>, dim in {DIMENSIONS}")
+        where[dim] = value
+    return where
+
+
+def show(cube, title, by, where, normalize):
+    needed = list(by) + list(where)
+    if not cube.has(*needed):
+        print(f"\n[skip] {title}: cube has no {[d for d in needed if not cube.has(d)]}")
+        return
+    print(f"\n【{title}】")
+    print(cube.slice(by, where, normalize).to_string())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="country / source_type / cluster / sentiment 统计")
+    parser.add_argument(
+        "--report", nargs="+", choices=sorted(REPORTS), help="预设报表（默认全部，给了 --by 就不打印）"
+    )
+    parser.add_argument("--by", nargs="+", choices=DIMENSIONS, help="自定义切片：按这些维度分组")
+    parser.add_argument("--where", nargs="+", default=[], metavar="DIM=VALUE", help="过滤条件")
+    parser.add_argument("--normalize", action="store_true", help="按 --by 最后一维算占比")
+    parser.add_argument("--export", help="把 --by 的切片另存为 CSV")
+    parser.add_argument("--cube", help="把整个立方体存为 CSV")
+    parser.add_argument(
+        "--period", help="按 published_at 加一维时间段（pandas 频率：D / W / M ...）"
+    )
+    args = parser.parse_args(argv)
+
+    cubes = {}
+
+    def load(dataset=None):
+        if dataset not in cubes:
+            cube = cubes[dataset] = Cube.load(args.period, dataset)
+            print(
+                f"[info] {dataset or 'default'}: {cube.n_rows} rows, "
+                f"cube {len(cube.counts)} cells over {cube.dims}"
+            )
+        return cubes[dataset]
+
+    if args.cube or args.by:
+        cube = load()
+    if args.cube:
+        cube.to_frame().to_csv(args.cube, index=False, encoding="utf-8-sig")
+        print("Saved cube to", args.cube)
+
+    if args.by:
+        where = parse_where(args.where)
+        out = cube.slice(args.by, where, args.normalize)
+        print(out.to_string())
+        if args.export:
+            out.reset_index().to_csv(args.export, index=False, encoding="utf-8-sig")
+            print("Saved slice to", args.export)
+        if not args.report:
+            return
+
+    for name in args.report or REPORTS:
+        dataset = REPORT_DATASETS.get(name)
+        if dataset is not None and not exists(dataset):
+            print(f"\n[skip] {name}: {dataset} not found (run build_dataset first)")
+            continue
+        cube = load(dataset)
+        print(f"\n========== {name} ==========")
+        for title, by, where, normalize in REPORTS[name]:
+            show(cube, title, by, where, normalize)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,42 @@
 # scripts/us_topic_mini.py
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
+import argparse
 
+from _clustering import cluster_top_terms, fit_clusters, sweep_k
+from _features import load_features
 from _paths import PROCESSED_DIR
+from _store import memory_report, read_dataset, write_dataset
 
+N_TOPICS = 2
 
-def main():
-    df = pd.read_csv(PROCESSED_DIR / "all_texts_clean.csv")
+TFIDF_PARAMS = {
+    "max_features": 1000,
+    "ngram_range": (1, 2),
+    "stop_words": "english",  # 关键改这里
+}
 
-    us_news = df[(df["country"] == "US") & (df["source_type"] == "news")].copy()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TF-IDF + KMeans topics for US news")
+    parser.add_argument("--k", type=int, default=N_TOPICS, help="主题数")
+    parser.add_argument(
+        "--sweep",
+        type=int,
+        nargs=2,
+        metavar=("KMIN", "KMAX"),
+        help="在 [KMIN, KMAX] 里并行扫描主题数，按 silhouette 选最好的（忽略 --k）",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="--sweep 的并行进程数")
+    parser.add_argument("--refit-features", action="store_true", help="忽略特征缓存，重新 fit TF-IDF")
+    parser.add_argument(
+        "--hashing",
+        action="store_true",
+        help="用 HashingVectorizer（没有词表，新文本不用重新 fit；不打印主题词）",
+    )
+    args = parser.parse_args(argv)
+
+    # 过滤在读盘时做，只有美国新闻这些行进内存
+    us_news = read_dataset("all_texts_clean", where={"country": "US", "source_type": "news"})
+    memory_report(us_news, "all_texts_clean[US news]")
     print(f"美国新闻条数: {len(us_news)}")
     if len(us_news) == 0:
         print("没有筛到美国新闻，检查一下 country 和 source_type 字段。")
@@ -17,30 +44,32 @@ def main():
 
     texts = us_news["tokens"].fillna("").tolist()
 
-    vectorizer = TfidfVectorizer(
-        max_features=1000,
-        ngram_range=(1, 2),
-        stop_words='english',  # 关键改这里
+    features = load_features(
+        "us_news_topics", texts, TFIDF_PARAMS, hashing=args.hashing, refit=args.refit_features
     )
-    X = vectorizer.fit_transform(texts)
-    terms = vectorizer.get_feature_names_out()
-
-    k = 2
-    kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-    us_news["us_topic"] = kmeans.fit_predict(X)
+    X = features.X
 
-    def print_topic_top_terms(topic_id, topn=15):
-        centroid = kmeans.cluster_centers_[topic_id]
-        top_idx = centroid.argsort()[::-1][:topn]
-        top_terms = [terms[i] for i in top_idx]
-        print(f"\nTopic {topic_id} top terms:")
-        print(", ".join(top_terms))
+    if args.sweep:
+        kmin, kmax = args.sweep
+        table, k, kmeans, us_news["us_topic"] = sweep_k(
+            X, range(kmin, kmax + 1), mode="small", workers=args.workers
+        )
+        print(table.to_string(index=False))
+        table.to_csv(PROCESSED_DIR / "k_sweep_us_topics.csv", index=False, encoding="utf-8-sig")
+        print(f"[info] best k = {k}")
+    else:
+        k = args.k
+        kmeans, us_news["us_topic"] = fit_clusters(X, k, "small")
 
-    for t in range(k):
-        print_topic_top_terms(t)
+    if features.hashing:
+        print("[info] hashing features have no vocabulary, top terms skipped")
+    else:
+        for t, top_terms in enumerate(cluster_top_terms(kmeans, features.terms, topn=15)):
+            print(f"\nTopic {t} top terms:")
+            print(", ".join(top_terms))
 
-    out_path = PROCESSED_DIR / "us_news_topics.csv"
-    us_news.to_csv(out_path, index=False, encoding="utf-8-sig")
+    # 这张表直接进报告，顺手导出一份 CSV
+    out_path = write_dataset(us_news, "us_news_topics", csv=True)
     print("\n已保存美国新闻聚类结果到：", out_path)
 
 
@@ -0,0 +1,238 @@
+# scripts/watch_weibo.py
+"""
+微博增量入库：盯着 weibo_output/，有新文件或者老文件追加了新行，
+就按微批跑 合并 → 日期 → 清洗分词 → 情感，几秒内看到结果，不用重跑整套批处理
+
+- 模型、分词词典、各种缓存只在启动时加载一次，之后每个微批直接用
+- 每个微批：
+    1) FolderWatcher.poll() 读新行（_ingest，标准列同 merge_weibo）
+    2) content 长度过滤（同 build_dataset）、date → published_at（_dates）
+    3) clean_and_tokenize（同 preprocess_texts，带分词缓存），清洗后为空的丢掉
+    4) 情感：先查结果缓存，没命中的才送进模型（同 sentiment_bert）
+    5) 写成 data/processed/weibo_stream/batch-*.parquet，一个微批一个分片，
+       pd.read_parquet(目录) 一次读回全部；分片里同时存着读完这批之后各文件的字节位置
+    6) country × source × sentiment_label 的计数立方体（_cube）增量累加，
+       存到 weibo_stream_stats.csv，打印最新的情感占比
+- 分片写完、读取位置还没 commit 就挂了的话，重启时用最后一个分片里的位置补上，
+  这批不会再处理一遍；累计统计启动时从分片重新算，和分片始终一致
+- 默认第一次启动时把目录里已有的内容记为已消费（那些走批处理流程），
+  --backfill 则从头全部处理一遍
+- 近重复去重（_dedup）要看全量数据，流式模式不做，批处理时再做
+
+用法:
+    python scripts/watch_weibo.py --offline                  # 常驻，每 5 秒看一次
+    python scripts/watch_weibo.py --backfill --once          # 把现有的处理一遍就退出
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from _cube import Cube
+from _dates import FormatCache, normalize_dates
+from _ingest import STATE_PATH, WATCH_DIR, FolderWatcher
+from _paths import PROCESSED_DIR
+from _sentiment_backends import ARTIFACT_DIR, BACKENDS
+from _sentiment_cache import DEFAULT_CACHE_PATH, SentimentCache
+from _store import read_part_meta, write_part
+from _token_cache import DEFAULT_CACHE_PATH as TOKEN_CACHE_PATH
+from _token_cache import TokenCache, text_digest
+from build_dataset import MIN_CONTENT_CHARS
+from preprocess_texts import clean_and_tokenize
+from sentiment_bert import (
+    BACKEND,
+    CH_MODEL_NAME,
+    MAX_LENGTH,
+    MODEL_DIR,
+    ModelRegistry,
+    cached_lookup,
+    predict_sentiment,
+)
+
+STREAM_DIR = PROCESSED_DIR / "weibo_stream"
+STATS_PATH = PROCESSED_DIR / "weibo_stream_stats.csv"
+STATS_DIMS = ["country", "source", "sentiment_label"]
+# 每隔几秒看一次目录
+INTERVAL = 5.0
+# 每个微批最多读多少字节（按完整记录截断），积压很多时分几批处理，单批延迟不会跟着积压量涨
+BATCH_BYTES = 1024 ** 2
+
+
+def list_parts():
+    parts = [*STREAM_DIR.glob("batch-*.parquet"), *STREAM_DIR.glob("batch-*.csv")]
+    return sorted(parts, key=lambda p: p.name)
+
+
+class StreamProcessor:
+    """一个微批的处理流程；模型 / 缓存 / 累计统计在实例上，跨批复用"""
+
+    def __init__(self, registry, token_cache, sent_cache, max_length=MAX_LENGTH):
+        self.registry = registry
+        self.token_cache = token_cache
+        self.sent_cache = sent_cache
+        self.max_length = max_length
+        self.date_formats = FormatCache()
+        self.parts = list_parts()
+        self.next_batch = int(self.parts[-1].stem.split("-")[1]) + 1 if self.parts else 0
+        self.stats = self._load_stats()
+
+    def _load_stats(self):
+        """累计统计从已有分片重新算（只读 STATS_DIMS 三列），不依赖上次存下的 csv"""
+        stats = None
+        for path in self.parts:
+            if path.suffix == ".parquet":
+                df = pd.read_parquet(path, columns=STATS_DIMS)
+            else:
+                df = pd.read_csv(path, usecols=STATS_DIMS)
+            batch = Cube.from_frame(df.astype("string"), dims=STATS_DIMS)
+            stats = batch if stats is None else stats.add(batch)
+        return stats
+
+    def warm_up(self):
+        """启动时先加载中文模型和 jieba 词典，第一个微批不用等"""
+        self.registry.get("CN")
+        clean_and_tokenize(["预热"], ["CN"], workers=1)
+
+    def process(self, raw: pd.DataFrame, positions: dict) -> dict:
+        """
+        处理一个微批，返回每一步的耗时（秒）和行数。
+        positions 是读完这批之后各文件的读取位置（FolderWatcher.files），跟分片一起存下
+        """
+        timings = {"rows_in": len(raw)}
+        t0 = time.perf_counter()
+
+        df = raw[raw["content"].astype(str).str.len() > MIN_CONTENT_CHARS].reset_index(drop=True)
+        df["published_at"], _ = normalize_dates(
+            df["date"], df["source"], cache=self.date_formats
+        )
+        t1 = time.perf_counter()
+        timings["filter+dates"] = t1 - t0
+
+        cleaned, tokens = clean_and_tokenize(
+            df["content"], df["country"], workers=1, cache=self.token_cache
+        )
+        df["clean_content"] = cleaned
+        df["tokens"] = tokens
+        df = df[df["clean_content"] != ""].reset_index(drop=True)
+        t2 = time.perf_counter()
+        timings["clean+tokenize"] = t2 - t1
+
+        texts = df["clean_content"].tolist()
+        results, todo = cached_lookup(
+            texts, "CN", self.registry, self.sent_cache, self.max_length
+        )
+        if todo:
+            tokenizer, runner = self.registry.get("CN")
+            preds = predict_sentiment(
+                [texts[i] for i in todo], tokenizer, runner, max_length=self.max_length
+            )
+            for i, res in zip(todo, preds):
+                results[i] = res
+            if self.sent_cache is not None:
+                key = self.registry.cache_key("CN", self.max_length)
+                self.sent_cache.put_many(
+                    key, ((text_digest(texts[i]), *results[i]) for i in todo)
+                )
+        df["sentiment_label"] = [label for label, _ in results]
+        df["sentiment_conf"] = [conf for _, conf in results]
+        t3 = time.perf_counter()
+        timings["sentiment"] = t3 - t2
+        timings["model_rows"] = len(todo)
+
+        if len(df):
+            write_part(df, STREAM_DIR, f"batch-{self.next_batch:06d}", meta={"files": positions})
+            self.next_batch += 1
+            batch = Cube.from_frame(df[STATS_DIMS].astype("string"), dims=STATS_DIMS)
+            self.stats = batch if self.stats is None else self.stats.add(batch)
+            self.stats.to_frame().to_csv(STATS_PATH, index=False, encoding="utf-8-sig")
+        timings["write+stats"] = time.perf_counter() - t3
+        timings["rows_out"] = len(df)
+        return timings
+
+    def report(self, timings: dict) -> None:
+        stages = ("filter+dates", "clean+tokenize", "sentiment", "write+stats")
+        total = sum(timings[k] for k in stages)
+        print(
+            f"[info] batch {timings['rows_in']} rows in -> {timings['rows_out']} out "
+            f"({timings['model_rows']} through the model), {total * 1000:.0f} ms: "
+            + ", ".join(f"{k} {timings[k] * 1000:.0f} ms" for k in stages)
+        )
+        if self.stats is not None:
+            share = self.stats.slice(["country", "sentiment_label"], normalize=True)
+            print(f"[info] running sentiment share over {self.stats.n_rows} rows:")
+            print(share.to_string())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream new weibo exports through the pipeline")
+    parser.add_argument("--folder", default=str(WATCH_DIR), help="盯着的导出目录")
+    parser.add_argument("--interval", type=float, default=INTERVAL, help="每隔几秒看一次目录")
+    parser.add_argument(
+        "--batch-mb", type=float, default=BATCH_BYTES / 1024 ** 2, help="每个微批最多读多少 MB"
+    )
+    parser.add_argument("--once", action="store_true", help="只看一次，处理完就退出")
+    parser.add_argument(
+        "--backfill", action="store_true", help="第一次启动时把目录里已有的内容也处理一遍"
+    )
+    parser.add_argument("--ch-model", default=CH_MODEL_NAME, help="中文情感模型")
+    parser.add_argument("--max-length", type=int, default=MAX_LENGTH, help="单条截断长度")
+    parser.add_argument(
+        "--model-dir", default=MODEL_DIR, help="本地模型目录（也可以用环境变量 SENTIMENT_MODEL_DIR）"
+    )
+    parser.add_argument("--offline", action="store_true", help="只从本地 / HF 缓存加载模型，不联网")
+    parser.add_argument("--backend", choices=BACKENDS, default=BACKEND, help="推理后端")
+    parser.add_argument(
+        "--artifact-dir", default=str(ARTIFACT_DIR), help="量化 / ONNX 导出产物的缓存目录"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="不读写分词 / 情感结果缓存")
+    args = parser.parse_args(argv)
+
+    watcher = FolderWatcher(Path(args.folder), STATE_PATH)
+    parts = list_parts()
+    meta = read_part_meta(parts[-1]) if parts else None
+    if meta and watcher.recover(meta["files"]):
+        print(f"[info] restored read positions from {parts[-1].name} (batch was not committed)")
+    if not watcher.files and not args.backfill:
+        n = watcher.skip_existing()
+        print(f"[info] first start: {n} existing file(s) marked as consumed, "
+              "use --backfill to process them")
+
+    registry = ModelRegistry(
+        {"CN": args.ch_model},
+        model_dir=args.model_dir,
+        offline=args.offline,
+        backend=args.backend,
+        artifact_dir=Path(args.artifact_dir),
+    )
+    token_cache = None if args.no_cache else TokenCache(TOKEN_CACHE_PATH)
+    sent_cache = None if args.no_cache else SentimentCache(DEFAULT_CACHE_PATH)
+    proc = StreamProcessor(registry, token_cache, sent_cache, args.max_length)
+    t0 = time.perf_counter()
+    proc.warm_up()
+    print(f"[info] models loaded in {time.perf_counter() - t0:.1f} s, watching {watcher.folder}")
+
+    try:
+        while True:
+            new, counts = watcher.poll(int(args.batch_mb * 1024 ** 2))
+            if counts:
+                print(f"[info] new rows: {counts}")
+                proc.report(proc.process(new, {k: dict(v) for k, v in watcher.files.items()}))
+            watcher.commit()
+            if watcher.more:
+                # 积压还没读完，接着读下一批
+                continue
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("\n[info] stopped")
+    finally:
+        for cache in (token_cache, sent_cache):
+            if cache is not None:
+                cache.close()
+
+
+if __name__ == "__main__":
+    main()
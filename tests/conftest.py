@@ -0,0 +1,6 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+# scripts/ 不是包，脚本之间按顶层模块互相 import
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
@@ -0,0 +1,106 @@
+# tests/test_stats_reports.py
+"""stats.py 的预设报表和原来 cal.py / cal2.py / cal_us.py / sent_stats.py 算出的数字一致"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import _store
+import stats
+from _cube import Cube
+
+
+@pytest.fixture
+def datasets(tmp_path, monkeypatch):
+    """all_texts 比 all_with_clusters 多几行（预处理丢掉的），cluster / sentiment_label 有缺失值"""
+    for name in ("all_texts", "all_with_clusters", "all_with_sentiment"):
+        monkeypatch.setitem(_store.DATASETS, name, tmp_path)
+    rng = np.random.default_rng(0)
+    n = 60
+    base = pd.DataFrame(
+        {
+            "country": rng.choice(["CN", "US"], n),
+            "source_type": rng.choice(["news", "social"], n),
+        }
+    )
+    clusters = base.assign(cluster=pd.array(rng.integers(0, 4, n), dtype="Int16"))
+    clusters.loc[rng.random(n) < 0.15, "cluster"] = pd.NA
+    sentiment = base.assign(sentiment_label=pd.array(rng.integers(0, 3, n), dtype="Int8"))
+    sentiment.loc[rng.random(n) < 0.2, "sentiment_label"] = pd.NA
+    extra = pd.DataFrame({"country": ["CN", "US", "CN"], "source_type": ["news", "news", "social"]})
+
+    _store.write_dataset(pd.concat([base, extra], ignore_index=True), "all_texts")
+    _store.write_dataset(clusters, "all_with_clusters")
+    _store.write_dataset(sentiment, "all_with_sentiment")
+
+
+def baseline_outputs():
+    """原来四个脚本打印的每一项（逻辑照抄，只是从 _store 读）"""
+    texts = _store.read_dataset("all_texts")
+    clusters = _store.read_dataset("all_with_clusters")
+    sent = _store.read_dataset("all_with_sentiment")
+
+    cn = clusters[clusters["country"] == "CN"]
+    us = clusters[clusters["country"] == "US"]
+    us_sent = sent[sent["country"] == "US"]
+    sent_stats = []
+    for sub in (
+        sent[sent["country"] == "CN"],
+        sent[sent["country"] == "US"],
+        sent[(sent["country"] == "CN") & (sent["source_type"] == "news")],
+        sent[(sent["country"] == "CN") & (sent["source_type"] == "social")],
+    ):
+        sent_stats += [
+            sub["sentiment_label"].value_counts(),
+            sub["sentiment_label"].value_counts(normalize=True),
+        ]
+    return {
+        "cal": [
+            texts["country"].value_counts(),
+            texts["source_type"].value_counts(),
+            texts.groupby(["country", "source_type"], observed=True).size(),
+        ],
+        "cal2": [
+            cn["cluster"].value_counts(),
+            cn.groupby("source_type", observed=True)["cluster"].value_counts(normalize=True),
+        ],
+        "cal_us": [
+            len(us),
+            us["cluster"].value_counts(),
+            us["cluster"].value_counts(normalize=True),
+            us_sent["sentiment_label"].value_counts(),
+            us_sent["sentiment_label"].value_counts(normalize=True),
+        ],
+        "sent_stats": sent_stats,
+    }
+
+
+def as_dict(result):
+    """Series -> {(各层取值的字符串, ...): 值}，不管索引类型和排序"""
+    if not isinstance(result, pd.Series):
+        return {("total",): result}
+    out = {}
+    for key, value in result[result != 0].items():
+        key = key if isinstance(key, tuple) else (key,)
+        out[tuple(str(k) for k in key)] = value
+    return out
+
+
+@pytest.mark.parametrize("name", sorted(stats.REPORTS))
+def test_report_matches_baseline(datasets, name):
+    cube = Cube.load(dataset=stats.REPORT_DATASETS.get(name))
+    expected = baseline_outputs()[name]
+    assert len(expected) == len(stats.REPORTS[name])
+    for (title, by, where, normalize), want in zip(stats.REPORTS[name], expected):
+        got = as_dict(cube.slice(by, where, normalize))
+        want = as_dict(want)
+        assert got.keys() == want.keys(), title
+        for key in want:
+            assert got[key] == pytest.approx(want[key]), (title, key)
+
+
+def test_main_runs_all_reports(datasets, capsys):
+    stats.main([])
+    out = capsys.readouterr().out
+    assert "[skip]" not in out
+    assert "all_texts: 63 rows" in out